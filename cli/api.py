@@ -9,12 +9,14 @@ import api
 from api.can_api_definition import RegionSummaryWithTimeseries
 from api.can_api_definition import AggregateRegionSummaryWithTimeseries
 from libs import update_readme_schemas
-from libs.pipelines import api_pipeline
-from libs.datasets import combined_datasets
 from libs.datasets.dataset_utils import REPO_ROOT
 from libs.datasets.dataset_utils import AggregationLevel
 from libs.datasets.dataset_utils import AggregationLevel
 from libs.enums import Intervention
+from libs.lazy_import import lazy_import
+
+api_pipeline = lazy_import("libs.pipelines.api_pipeline")
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
 
 PROD_BUCKET = "data.covidactnow.org"
 
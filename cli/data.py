@@ -4,24 +4,19 @@ import logging
 import pathlib
 
 import click
-import gspread
-
-from libs import google_sheet_helpers, wide_dates_df
-from libs.datasets.combined_datasets import (
-    build_from_sources,
-    ALL_TIMESERIES_FEATURE_DEFINITION,
-    US_STATES_FILTER,
-    ALL_FIELDS_FEATURE_DEFINITION,
-)
+
+from libs import wide_dates_df
 from libs.datasets.latest_values_dataset import LatestValuesDataset
-from libs.qa import dataset_summary
-from libs.qa import data_availability
 from libs.datasets.timeseries import TimeseriesDataset
 from libs.datasets import dataset_utils
-from libs.datasets import combined_dataset_utils
-from libs.datasets import combined_datasets
-from libs.datasets.combined_dataset_utils import DatasetType
 from libs.datasets.dataset_utils import AggregationLevel
+from libs.lazy_import import lazy_import
+
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+combined_dataset_utils = lazy_import("libs.datasets.combined_dataset_utils")
+data_availability = lazy_import("libs.qa.data_availability")
+dataset_summary = lazy_import("libs.qa.dataset_summary")
+google_sheet_helpers = lazy_import("libs.google_sheet_helpers")
 
 PROD_BUCKET = "data.covidactnow.org"
 
@@ -50,8 +45,8 @@ def update(summary_filename, wide_dates_filename):
 
     data_source_classes = set(
         chain(
-            chain.from_iterable(ALL_FIELDS_FEATURE_DEFINITION.values()),
-            chain.from_iterable(ALL_TIMESERIES_FEATURE_DEFINITION.values()),
+            chain.from_iterable(combined_datasets.ALL_FIELDS_FEATURE_DEFINITION.values()),
+            chain.from_iterable(combined_datasets.ALL_TIMESERIES_FEATURE_DEFINITION.values()),
         )
     )
     data_sources = {
@@ -59,10 +54,16 @@ def update(summary_filename, wide_dates_filename):
         for data_source_cls in data_source_classes
     }
     timeseries_dataset = combined_datasets.build_from_sources(
-        TimeseriesDataset, data_sources, ALL_TIMESERIES_FEATURE_DEFINITION, filter=US_STATES_FILTER
+        TimeseriesDataset,
+        data_sources,
+        combined_datasets.ALL_TIMESERIES_FEATURE_DEFINITION,
+        filter=combined_datasets.US_STATES_FILTER,
     )
     latest_dataset = combined_datasets.build_from_sources(
-        LatestValuesDataset, data_sources, ALL_FIELDS_FEATURE_DEFINITION, filter=US_STATES_FILTER,
+        LatestValuesDataset,
+        data_sources,
+        combined_datasets.ALL_FIELDS_FEATURE_DEFINITION,
+        filter=combined_datasets.US_STATES_FILTER,
     )
     _, timeseries_pointer = combined_dataset_utils.update_data_public_head(
         path_prefix, latest_dataset, timeseries_dataset
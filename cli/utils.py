@@ -9,12 +9,15 @@ import git
 
 from covidactnow.datapublic import common_df
 from libs import github_utils
-from libs.datasets import combined_datasets
+from libs import import_profile as import_profile_lib
 from libs.datasets import dataset_utils
+from libs.lazy_import import lazy_import
 
 from libs.git_lfs_object_helpers import read_data_for_commit
 from libs.qa.common_df_diff import DatasetDiff
 
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+
 _logger = logging.getLogger(__name__)
 
 
@@ -112,3 +115,30 @@ def csv_diff(csv_path_or_rev_left, csv_path_right):
     print(differ_l)
     print(f"File: {csv_path_right}")
     print(differ_r)
+
+
+@main.command()
+@click.argument("module", default="run")
+@click.option("--top", default=25, show_default=True, help="Number of modules to report.")
+@click.option(
+    "--sort",
+    type=click.Choice(["cumulative", "self"]),
+    default="cumulative",
+    show_default=True,
+    help="Report the modules with the largest cumulative or self import time.",
+)
+def import_profile(module, top, sort):
+    """Report the import time of MODULE (default: the run.py entry point) per module."""
+    timings = import_profile_lib.profile_imports(module)
+    print(f"Importing {module} took {import_profile_lib.total_us(timings) / 1e6:.2f}s")
+
+    print(f"\nTop {top} modules by {sort} import time:")
+    key = (lambda t: t.cumulative_us) if sort == "cumulative" else (lambda t: t.self_us)
+    print(f"{'self [ms]':>10} {'cumulative [ms]':>16}  module")
+    for timing in sorted(timings, key=key, reverse=True)[:top]:
+        print(f"{timing.self_us / 1e3:>10.1f} {timing.cumulative_us / 1e3:>16.1f}  {timing.module}")
+
+    print(f"\nTop {top} packages by self import time:")
+    by_package = import_profile_lib.self_us_by_package(timings)
+    for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        print(f"{self_us / 1e3:>10.1f}  {package}")
@@ -1,14 +1,27 @@
 import enum
-
-
-from libs.datasets.sources.jhu_dataset import JHUDataset
-from libs.datasets.sources.nytimes_dataset import NYTimesDataset
-from libs.datasets.sources.dh_beds import DHBeds
-from libs.datasets.sources.covid_tracking_source import CovidTrackingDataSource
-from libs.datasets.sources.cds_dataset import CDSDataset
-from libs.datasets.sources.covid_care_map import CovidCareMapBeds
-from libs.datasets.sources.fips_population import FIPSPopulation
-from libs.datasets.sources.nha_hospitalization import NevadaHospitalAssociationData
+import importlib
 
 from libs.datasets.common_fields import CommonFields
 from libs.datasets.dataset_utils import AggregationLevel
+
+# Dataset sources are imported on first use, importing all of them is slow.
+_SOURCE_MODULES = {
+    "JHUDataset": "libs.datasets.sources.jhu_dataset",
+    "NYTimesDataset": "libs.datasets.sources.nytimes_dataset",
+    "DHBeds": "libs.datasets.sources.dh_beds",
+    "CovidTrackingDataSource": "libs.datasets.sources.covid_tracking_source",
+    "CDSDataset": "libs.datasets.sources.cds_dataset",
+    "CovidCareMapBeds": "libs.datasets.sources.covid_care_map",
+    "FIPSPopulation": "libs.datasets.sources.fips_population",
+    "NevadaHospitalAssociationData": "libs.datasets.sources.nha_hospitalization",
+}
+
+
+def __getattr__(name):
+    if name not in _SOURCE_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_SOURCE_MODULES[name]), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_SOURCE_MODULES))
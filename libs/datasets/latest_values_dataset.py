@@ -1,8 +1,7 @@
-from typing import Type, List, Optional, Iterable, Union, TextIO
+from typing import Dict, Type, List, Optional, Iterable, Union, TextIO
 import pathlib
 
 import structlog
-from more_itertools import first
 
 from covidactnow.datapublic import common_df
 from libs import us_state_abbrev
@@ -191,7 +190,28 @@ class LatestValuesDataset(dataset_base.DatasetBase):
 
         Returns: Dictionary with all data for a given fips code.
         """
-        return first(self.get_subset(fips=fips).yield_records(), default={})
+        # Copy so that callers modifying the record don't modify the index.
+        return dict(self._record_index().get(fips, {}))
+
+    def _record_index(self) -> Dict[str, dict]:
+        """Map of fips to the record of its first row, as produced by yield_records.
+
+        Built on first use and rebuilt when self.data is replaced. Code modifying self.data in
+        place must call invalidate_record_index.
+        """
+        if getattr(self, "_record_index_data", None) is not self.data:
+            first_rows = self.data.loc[~self.data[CommonFields.FIPS].duplicated(keep="first")]
+            first_rows = first_rows.loc[first_rows[CommonFields.FIPS].notnull()]
+            records = first_rows.astype(object).where(pd.notnull(first_rows), None)
+            self._record_index_map = dict(
+                zip(first_rows[CommonFields.FIPS], records.to_dict(orient="records"))
+            )
+            self._record_index_data = self.data
+        return self._record_index_map
+
+    def invalidate_record_index(self):
+        """Drop the fips record index, e.g. after modifying self.data in place."""
+        self._record_index_data = None
 
     @classmethod
     def load_csv(cls, path_or_buf: Union[pathlib.Path, TextIO]):
@@ -1,6 +1,7 @@
 import warnings
 import pathlib
-from typing import List, Optional, Union, TextIO
+from typing import Dict, List, Optional, Union, TextIO
+import numpy as np
 import pandas as pd
 import structlog
 from covidactnow.datapublic import common_df
@@ -162,18 +163,40 @@ class TimeseriesDataset(dataset_base.DatasetBase):
         """Fetch a new TimeseriesDataset with a subset of the data in `self`.
 
         Some parameters are only used in ipython notebooks."""
-        row_binary_array = dataset_utils.make_binary_array(
-            self.data,
-            aggregation_level=aggregation_level,
-            country=country,
-            fips=fips,
-            state=state,
-            states=states,
-            on=on,
-            after=after,
-            before=before,
+        return self.__class__(
+            self._select_rows(
+                aggregation_level=aggregation_level,
+                country=country,
+                fips=fips,
+                state=state,
+                states=states,
+                on=on,
+                after=after,
+                before=before,
+            )
         )
-        return self.__class__(self.data.loc[row_binary_array, :])
+
+    def _fips_rows(self) -> Dict[str, np.ndarray]:
+        """Map of fips to the positions of its rows in self.data, built on first use."""
+        # Rebuild if self.data was replaced since the map was built.
+        if getattr(self, "_fips_rows_data", None) is not self.data:
+            self._fips_rows_map = self.data.groupby(CommonFields.FIPS, sort=False).indices
+            self._fips_rows_data = self.data
+        return self._fips_rows_map
+
+    def _select_rows(self, fips: Optional[str] = None, **filters) -> pd.DataFrame:
+        """Rows of self.data matching the filters of dataset_utils.make_binary_array.
+
+        When fips is given, its rows are looked up in the fips index and only those rows are
+        checked against the other filters, instead of evaluating a query over every row.
+        """
+        if not fips:
+            return self.data.loc[dataset_utils.make_binary_array(self.data, **filters), :]
+
+        data = self.data.iloc[self._fips_rows().get(fips, np.array([], dtype=int))]
+        if any(filters.values()):
+            data = data.loc[dataset_utils.make_binary_array(data, **filters), :]
+        return data
 
     def get_records_for_fips(self, fips) -> List[dict]:
         """Get data for FIPS code.
@@ -197,8 +220,7 @@ class TimeseriesDataset(dataset_base.DatasetBase):
         before: Optional[str] = None,
         columns_slice: Optional[List[str]] = None,
     ) -> pd.DataFrame:
-        rows_binary_array = dataset_utils.make_binary_array(
-            self.data,
+        data = self._select_rows(
             aggregation_level=aggregation_level,
             country=country,
             fips=fips,
@@ -209,8 +231,8 @@ class TimeseriesDataset(dataset_base.DatasetBase):
             before=before,
         )
         if columns_slice is None:
-            columns_slice = slice(None, None, None)
-        return self.data.loc[rows_binary_array, columns_slice]
+            return data
+        return data.loc[:, columns_slice]
 
     @classmethod
     def from_source(
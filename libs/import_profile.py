@@ -0,0 +1,83 @@
+"""
+Import time profile of a module, measured with `python -X importtime` in a new interpreter.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    # Microseconds spent importing the module itself, excluding its imports.
+    self_us: int
+    # Microseconds spent importing the module including its imports.
+    cumulative_us: int
+    # Nesting of the import, 0 for modules imported by the profiled statement.
+    depth: int
+
+    @property
+    def top_level_package(self) -> str:
+        return self.module.split(".")[0]
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the stderr of `python -X importtime` into the imports in completion order."""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        timings.append(
+            ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def _run_importtime(statement: str) -> List[ImportTiming]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def profile_imports(module: str) -> List[ImportTiming]:
+    """
+    Import module in a new interpreter and return the timing of every module it imported,
+    excluding the modules imported by the interpreter at startup.
+    """
+    startup_modules = {timing.module for timing in _run_importtime("pass")}
+    return [
+        timing
+        for timing in _run_importtime(f"import {module}")
+        if timing.module not in startup_modules
+    ]
+
+
+def total_us(timings: List[ImportTiming]) -> int:
+    """Microseconds spent importing the profiled module."""
+    return sum(timing.cumulative_us for timing in timings if timing.depth == 0)
+
+
+def self_us_by_package(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Microseconds spent importing the modules of each top level package."""
+    by_package = defaultdict(int)
+    for timing in timings:
+        by_package[timing.top_level_package] += timing.self_us
+    return dict(by_package)
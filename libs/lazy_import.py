@@ -0,0 +1,53 @@
+"""
+Lazy imports of heavy modules.
+
+Entry points and the modules they import use lazy_import for dependencies that are slow to import
+(matplotlib, scipy, the dataset sources, the pyseir stages) so that commands that don't use them
+start quickly. Commands that fork workers call preload first so the workers inherit the imports
+instead of each importing the modules again.
+"""
+import importlib
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __getattr__(self, name):
+        return getattr(importlib.import_module(self.__name__), name)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Module name, imported on first attribute access.
+
+    Parameters
+    ----------
+    name: str
+        Absolute name of the module, e.g. "matplotlib.pyplot".
+
+    Returns
+    -------
+    module: module
+        The module if it was already imported, otherwise a stand-in for it.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return _LazyModule(name)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """True if module is a regular module or a lazily imported module that was imported."""
+    return not isinstance(module, _LazyModule) or module.__name__ in sys.modules
+
+
+def preload(*modules: types.ModuleType):
+    """Import lazily imported modules now, e.g. before forking workers that use them."""
+    for module in modules:
+        if isinstance(module, _LazyModule):
+            importlib.import_module(module.__name__)
@@ -16,13 +16,16 @@ from pydantic import BaseModel
 import pyseir
 from covidactnow.datapublic.common_fields import CommonFields
 from libs.datasets import FIPSPopulation
-from libs.datasets import combined_datasets
+from libs.lazy_import import lazy_import
+from pyseir.rt import results_table
 from pyseir.rt.utils import NEW_ORLEANS_FIPS
 from pyseir.utils import get_run_artifact_path, RunArtifact
 
 
 _log = structlog.get_logger()
 
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+
 
 @dataclass(frozen=True)
 class Region:
@@ -122,9 +125,4 @@ class RegionalWebUIInput:
             _log.info("Applying New Orleans Patch")
             return pyseir.rt.patches.patch_aggregate_rt_results(NEW_ORLEANS_FIPS)
 
-        path = pyseir.utils.get_run_artifact_path(
-            self.fips, pyseir.utils.RunArtifact.RT_INFERENCE_RESULT
-        )
-        if not os.path.exists(path):
-            return None
-        return pd.read_json(path)
+        return results_table.load_rt_result(self.fips)
@@ -1,4 +1,8 @@
+import os
 import pathlib
 
 DATA_DIR = pathlib.Path(__file__).parent.parent / "data"
-OUTPUT_DIR = pathlib.Path(__file__).parent.parent / "output"
+# Overridden to give each shard of a sharded build its own output root.
+OUTPUT_DIR = pathlib.Path(
+    os.environ.get("PYSEIR_OUTPUT_DIR", pathlib.Path(__file__).parent.parent / "output")
+)
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 
 import sys
@@ -9,15 +9,22 @@ import logging
 import pandas as pd
 from covidactnow.datapublic import common_init
 
-from multiprocessing import Pool
 from functools import partial
-from pyseir.rt import infer_rt
-from pyseir.ensembles import ensemble_runner
-from pyseir.inference import model_fitter
-from pyseir.deployment.webui_data_adaptor_v1 import WebUIDataAdaptorV1
-from libs.datasets import combined_datasets
+from libs import pipeline
+from libs.enums import Intervention
+from pyseir import OUTPUT_DIR, executor, journal, load_data, scheduler, sharding
+from pyseir.rt import reports
+from pyseir.utils import get_run_artifact_path, RunArtifact, RunMode
+from libs.lazy_import import lazy_import, preload
 from libs.us_state_abbrev import ABBREV_US_STATE
-from pyseir.inference.whitelist_generator import WhitelistGenerator
+
+# The pipeline stages are imported on first use so that short commands start quickly.
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+ensemble_runner = lazy_import("pyseir.ensembles.ensemble_runner")
+infer_rt = lazy_import("pyseir.rt.infer_rt")
+model_fitter = lazy_import("pyseir.inference.model_fitter")
+webui_data_adaptor_v1 = lazy_import("pyseir.deployment.webui_data_adaptor_v1")
+whitelist_generator = lazy_import("pyseir.inference.whitelist_generator")
 
 
 sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(__file__)), ".."))
@@ -34,6 +41,10 @@ def _cache_global_datasets():
     # is not needed as the only goal is to populate the cache.
     combined_datasets.load_us_latest_dataset()
     combined_datasets.load_us_timeseries_dataset()
+    load_data.precompute_new_count_data()
+    # Likewise import the modules run by workers, instead of each worker importing them.
+    preload(infer_rt, model_fitter, ensemble_runner, webui_data_adaptor_v1)
+    preload(infer_rt.plotting, model_fitter.model_plotting)
 
 
 @click.group()
@@ -43,14 +54,18 @@ def entry_point():
 
 
 def _generate_whitelist():
-    gen = WhitelistGenerator()
+    gen = whitelist_generator.WhitelistGenerator()
     gen.generate_whitelist()
 
 
-def _run_infer_rt(states: List[str], states_only=False):
+def _run_infer_rt(
+    states: List[str], states_only=False, incremental_rt=False, rt_reports=reports.ReportMode.RENDER
+):
     for state in states:
         fips = us.states.lookup(state).fips
-        infer_rt.run_rt_for_fips(fips)
+        infer_rt.run_rt_for_fips(
+            fips, use_checkpoints=incremental_rt, report_mode=reports.ReportMode(rt_reports)
+        )
 
 
 def _run_mle_fits(states: List[str], states_only=False):
@@ -66,7 +81,7 @@ def _run_ensembles(states, ensemble_kwargs=dict(), states_only=False):
 def _map_outputs(
     states, output_interval_days=1, states_only=False, output_dir=None, run_mode="default"
 ):
-    web_ui_mapper = WebUIDataAdaptorV1(
+    web_ui_mapper = webui_data_adaptor_v1.WebUIDataAdaptorV1(
         output_interval_days=output_interval_days, run_mode=run_mode, output_dir=output_dir,
     )
     for state in states:
@@ -74,12 +89,19 @@ def _map_outputs(
 
 
 def _state_only_pipeline(
-    state, run_mode=DEFAULT_RUN_MODE, output_interval_days=1, output_dir=None,
+    state,
+    run_mode=DEFAULT_RUN_MODE,
+    output_interval_days=1,
+    output_dir=None,
+    incremental_rt=False,
+    rt_reports=reports.ReportMode.RENDER,
 ):
     states_only = True
 
     states = [state]
-    _run_infer_rt(states, states_only=states_only)
+    _run_infer_rt(
+        states, states_only=states_only, incremental_rt=incremental_rt, rt_reports=rt_reports
+    )
     _run_mle_fits(states, states_only=states_only)
     _run_ensembles(
         states, ensemble_kwargs=dict(run_mode=run_mode), states_only=states_only,
@@ -94,6 +116,169 @@ def _state_only_pipeline(
     )
 
 
+def _map_fips_output(fips, output_interval_days=1, output_dir=None, run_mode="default"):
+    web_ui_mapper = webui_data_adaptor_v1.WebUIDataAdaptorV1(
+        output_interval_days=output_interval_days, run_mode=run_mode, output_dir=output_dir,
+    )
+    web_ui_mapper.map_fips(pipeline.RegionalWebUIInput.from_fips(fips))
+
+
+def _fips_input_fingerprint(fips: str) -> str:
+    """Fingerprint of the combined data of a fips, the input of all of its tasks."""
+    timeseries = combined_datasets.load_us_timeseries_dataset().get_data(fips=fips)
+    return journal.fingerprint(
+        pd.util.hash_pandas_object(timeseries, index=False).values,
+        combined_datasets.get_us_latest_for_fips(fips),
+    )
+
+
+def _build_pipeline_dag(
+    states: List[str],
+    all_county_fips: Dict[str, str],
+    run_mode=DEFAULT_RUN_MODE,
+    output_interval_days=1,
+    output_dir=None,
+    incremental_rt=False,
+    rt_reports=reports.ReportMode.RENDER,
+) -> scheduler.DagScheduler:
+    """
+    Build the tasks of build_all with their per fips dependencies: a county fit depends on its
+    state fit, a county ensemble on the fit results of its state's counties and the web output
+    of a fips on its ensemble and Rt results. Tasks are given the fingerprint of their fips'
+    data and the artifacts they write so that a run can be resumed from its journal.
+    """
+    dag = scheduler.DagScheduler()
+    ensemble_kwargs = dict(run_mode=run_mode)
+    output_kwargs = dict(
+        output_interval_days=output_interval_days, output_dir=output_dir, run_mode=run_mode
+    )
+    county_fips_by_state = {}
+    for county_fips, state in all_county_fips.items():
+        county_fips_by_state.setdefault(state, []).append(county_fips)
+
+    def artifacts(fips, *artifact_types):
+        return [get_run_artifact_path(fips, artifact) for artifact in artifact_types]
+
+    def web_ui_artifacts(fips):
+        # One output per suppression policy of the ensembles.
+        path = get_run_artifact_path(fips, RunArtifact.WEB_UI_RESULT, output_dir=output_dir)
+        return [
+            path.replace("__INTERVENTION_IDX__", str(intervention.value))
+            for intervention in Intervention
+            if intervention is not Intervention.SELECTED_INTERVENTION
+        ]
+
+    for state in states:
+        state_fips = us.states.lookup(state).fips
+        inputs = _fips_input_fingerprint(state_fips)
+        rt = dag.add(
+            ("rt", state_fips),
+            _run_infer_rt,
+            [state],
+            states_only=True,
+            incremental_rt=incremental_rt,
+            rt_reports=rt_reports,
+            inputs=inputs,
+            artifacts=artifacts(state_fips, RunArtifact.RT_INFERENCE_RESULT),
+        )
+        fit = dag.add(
+            ("fit", state_fips),
+            _run_mle_fits,
+            [state],
+            states_only=True,
+            inputs=inputs,
+            artifacts=artifacts(state_fips, RunArtifact.MLE_FIT_RESULT, RunArtifact.MLE_FIT_MODEL),
+        )
+        ensemble = dag.add(
+            ("ensemble", state_fips),
+            _run_ensembles,
+            [state],
+            ensemble_kwargs=ensemble_kwargs,
+            states_only=True,
+            deps=[fit],
+            inputs=inputs,
+            artifacts=artifacts(state_fips, RunArtifact.ENSEMBLE_RESULT),
+        )
+        dag.add(
+            ("web", state_fips),
+            _map_fips_output,
+            state_fips,
+            deps=[rt, ensemble],
+            inputs=inputs,
+            artifacts=web_ui_artifacts(state_fips),
+            **output_kwargs,
+        )
+
+        county_fips = county_fips_by_state.get(state, [])
+        if not county_fips:
+            continue
+        county_inputs = {fips: _fips_input_fingerprint(fips) for fips in county_fips}
+        # The aggregated Rt of some counties needs the Rt of other counties of the state.
+        county_rt = dag.add(
+            ("rt_counties", state_fips),
+            infer_rt.run_rt_for_fips_batch,
+            county_fips,
+            use_checkpoints=incremental_rt,
+            report_mode=reports.ReportMode(rt_reports),
+            inputs=journal.fingerprint(county_inputs),
+            artifacts=artifacts(state_fips, RunArtifact.RT_INFERENCE_TABLE),
+        )
+        county_fits = [
+            dag.add(
+                ("fit", fips),
+                model_fitter.execute_model_summary_for_fips,
+                fips,
+                deps=[fit],
+                inputs=county_inputs[fips],
+                artifacts=artifacts(fips, RunArtifact.MLE_FIT_MODEL),
+            )
+            for fips in county_fips
+        ]
+        county_fit_results = dag.add(
+            ("fit_results", state_fips),
+            model_fitter._persist_county_fit_results,
+            deps=county_fits,
+            with_dep_results=True,
+            artifacts=artifacts(county_fips[0], RunArtifact.MLE_FIT_RESULT),
+        )
+        for fips in county_fips:
+            county_ensemble = dag.add(
+                ("ensemble", fips),
+                ensemble_runner._run_county,
+                fips,
+                ensemble_kwargs=ensemble_kwargs,
+                deps=[county_fit_results],
+                inputs=county_inputs[fips],
+                artifacts=artifacts(fips, RunArtifact.ENSEMBLE_RESULT),
+            )
+            dag.add(
+                ("web", fips),
+                _map_fips_output,
+                fips,
+                deps=[county_rt, county_ensemble],
+                inputs=county_inputs[fips],
+                artifacts=web_ui_artifacts(fips),
+                **output_kwargs,
+            )
+    return dag
+
+
+def _build_all_with_dag(
+    states: List[str], all_county_fips: Dict[str, str], resume=False, **pipeline_kwargs,
+):
+    dag = _build_pipeline_dag(states, all_county_fips, **pipeline_kwargs)
+    root.info(
+        f"scheduling {len(dag)} tasks for {len(states)} states and {len(all_county_fips)} counties"
+    )
+    completion_journal = journal.CompletionJournal(journal.get_journal_path(), resume=resume)
+    p = executor.get_executor()
+    report = dag.run(p, processes=p.processes, journal=completion_journal)
+    report.log_summary()
+    sharding.save_costs(sharding.costs_from_report(report), sharding.get_costs_path())
+    if report.failed:
+        raise RuntimeError(f"{len(report.failed)} build_all tasks failed: {list(report.failed)}")
+
+
 def build_counties_to_run_per_state(states: List[str], fips: str = None) -> Dict[str, str]:
     """Builds mapping from fips to state of counties to run.
 
@@ -122,6 +307,24 @@ def build_counties_to_run_per_state(states: List[str], fips: str = None) -> Dict
     return all_county_fips
 
 
+def _select_shard_states(
+    states: List[str], shard: Tuple[int, int], fips: str = None, shard_costs: str = None
+) -> List[str]:
+    """States of shard (index, count), balanced by the fips costs recorded at shard_costs."""
+    index, count = shard
+    county_fips_by_state = {}
+    for county_fips, state in build_counties_to_run_per_state(states, fips=fips).items():
+        county_fips_by_state.setdefault(state, []).append(county_fips)
+    costs = sharding.state_costs(
+        county_fips_by_state,
+        {state: us.states.lookup(state).fips for state in states},
+        sharding.load_costs(shard_costs),
+    )
+    shard_states = sharding.partition_states(costs, count)[index]
+    root.info(f"running shard {index}/{count} with states {shard_states}")
+    return shard_states
+
+
 def _build_all_for_states(
     states: List[str],
     run_mode=DEFAULT_RUN_MODE,
@@ -130,34 +333,86 @@ def _build_all_for_states(
     skip_whitelist=False,
     states_only=False,
     fips=None,
+    incremental_rt=False,
+    rt_reports=reports.ReportMode.RENDER,
+    fit_summaries=False,
+    dag_scheduler=False,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_costs=None,
+    resume=False,
+    worker_max_tasks=None,
+    worker_max_rss_mb=None,
 ):
     # prepare data
     _cache_global_datasets()
+    executor.configure(max_tasks_per_worker=worker_max_tasks, max_rss_mb=worker_max_rss_mb)
 
     if not skip_whitelist:
         _generate_whitelist()
 
-    # do everything for just states in parallel
-    with Pool(maxtasksperchild=1) as p:
-        states_only_func = partial(
-            _state_only_pipeline,
+    if shard:
+        states = _select_shard_states(states, shard, fips=fips, shard_costs=shard_costs)
+        if not states:
+            root.info("No states in this shard. returning.")
+            return
+
+    if dag_scheduler or resume:
+        all_county_fips = {} if states_only else build_counties_to_run_per_state(states, fips=fips)
+        _build_all_with_dag(
+            states,
+            all_county_fips,
+            resume=resume,
             run_mode=run_mode,
-            output_interval_days=output_interval_days,
+            output_interval_days=int(output_interval_days),
             output_dir=output_dir,
+            incremental_rt=incremental_rt,
+            rt_reports=rt_reports,
         )
-        p.map(states_only_func, states)
+        executor.shutdown()
+        return
+
+    # do everything for just states in parallel
+    p = executor.get_executor()
+    states_only_func = partial(
+        _state_only_pipeline,
+        run_mode=run_mode,
+        output_interval_days=output_interval_days,
+        output_dir=output_dir,
+        incremental_rt=incremental_rt,
+        rt_reports=rt_reports,
+    )
+    p.map(states_only_func, states)
 
     if states_only:
         root.info("Only executing for states. returning.")
+        executor.shutdown()
         return
 
     all_county_fips = build_counties_to_run_per_state(states, fips=fips)
 
-    with Pool(maxtasksperchild=1) as p:
-        # calculate calculate county inference
-        p.map(infer_rt.run_rt_for_fips, all_county_fips.keys())
-        # calculate model fit
-        root.info(f"executing model for {len(all_county_fips)} counties")
+    # calculate county inference, batching the counties of each state
+    county_fips_by_state = {}
+    for county_fips, state in all_county_fips.items():
+        county_fips_by_state.setdefault(state, []).append(county_fips)
+    p.map(
+        partial(
+            infer_rt.run_rt_for_fips_batch,
+            use_checkpoints=incremental_rt,
+            report_mode=reports.ReportMode(rt_reports),
+        ),
+        county_fips_by_state.values(),
+    )
+    # calculate model fit
+    root.info(f"executing model for {len(all_county_fips)} counties")
+    if fit_summaries:
+        # Workers persist their models and only return the fit results.
+        fit_results = p.map(model_fitter.execute_model_summary_for_fips, all_county_fips.keys())
+        df = pd.DataFrame([fit for fit in fit_results if fit])
+        df["state"] = df.fips.replace(all_county_fips)
+        df.index = df.fips
+        for name, state_df in df.groupby("state"):
+            model_fitter._persist_fit_results_per_state(state_df)
+    else:
         fitters = p.map(model_fitter.execute_model_for_fips, all_county_fips.keys())
 
         df = pd.DataFrame([fit.fit_results for fit in fitters if fit])
@@ -168,12 +423,10 @@ def _build_all_for_states(
         state_dfs = [state_df for name, state_df in df.groupby("state")]
         p.map(model_fitter._persist_results_per_state, state_dfs)
 
-        # calculate ensemble
-        root.info(f"running ensemble for {len(all_county_fips)} counties")
-        ensemble_func = partial(
-            ensemble_runner._run_county, ensemble_kwargs=dict(run_mode=run_mode),
-        )
-        p.map(ensemble_func, all_county_fips.keys())
+    # calculate ensemble
+    root.info(f"running ensemble for {len(all_county_fips)} counties")
+    ensemble_func = partial(ensemble_runner._run_county, ensemble_kwargs=dict(run_mode=run_mode),)
+    p.map(ensemble_func, all_county_fips.keys())
 
     # output it all
     output_interval_days = int(output_interval_days)
@@ -183,7 +436,7 @@ def _build_all_for_states(
     # does not parallelize well, because web_ui mapper doesn't serialize efficiently
     # TODO: Remove intermediate artifacts and paralellize artifacts creation better
     # Approximately 40% of the processing time is taken on this step
-    web_ui_mapper = WebUIDataAdaptorV1(
+    web_ui_mapper = webui_data_adaptor_v1.WebUIDataAdaptorV1(
         output_interval_days=output_interval_days, run_mode=run_mode, output_dir=output_dir,
     )
     for state in states:
@@ -192,10 +445,20 @@ def _build_all_for_states(
             whitelisted_county_fips=[k for k, v in all_county_fips.items() if v == state],
             states_only=False,
         )
+    executor.shutdown()
 
     return
 
 
+def _parse_shard_option(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return sharding.parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
 @entry_point.command()
 def generate_whitelist():
     _generate_whitelist()
@@ -206,9 +469,30 @@ def generate_whitelist():
     "--state", help="State to generate files for. If no state is given, all states are computed."
 )
 @click.option("--states-only", default=False, is_flag=True, type=bool, help="Only model states")
-def run_infer_rt(state, states_only):
+@click.option(
+    "--incremental-rt",
+    is_flag=True,
+    help="Resume Rt inference from the previous run's checkpoints when only new days were added.",
+)
+@click.option(
+    "--rt-reports",
+    default=reports.ReportMode.RENDER.value,
+    type=click.Choice([mode.value for mode in reports.ReportMode]),
+    help="Render Rt reports, defer them to `render-rt-reports` or skip them.",
+)
+def run_infer_rt(state, states_only, incremental_rt, rt_reports):
     states = [state] if state else ALL_STATES
-    _run_infer_rt(states, states_only=states_only)
+    _run_infer_rt(
+        states, states_only=states_only, incremental_rt=incremental_rt, rt_reports=rt_reports
+    )
+
+
+@entry_point.command()
+@click.option("--fips", "-f", multiple=True, help="Fips to render. Defaults to all recorded fips.")
+@click.option("--output-dir", default=None, type=str, help="Output directory of the Rt run.")
+def render_rt_reports(fips, output_dir):
+    """Render the Rt reports deferred with `--rt-reports defer`, at low priority."""
+    reports.render_deferred_reports(fips_list=list(fips) or None, output_dir=output_dir)
 
 
 @entry_point.command()
@@ -228,7 +512,7 @@ def run_mle_fits(state, states_only):
 @click.option(
     "--run-mode",
     default=DEFAULT_RUN_MODE,
-    type=click.Choice([run_mode.value for run_mode in ensemble_runner.RunMode]),
+    type=click.Choice([run_mode.value for run_mode in RunMode]),
     help="State to generate files for. If no state is given, all states are computed.",
 )
 @click.option("--states-only", default=False, is_flag=True, type=bool, help="Only model states")
@@ -252,7 +536,7 @@ def run_ensembles(state, run_mode, states_only):
 @click.option(
     "--run-mode",
     default=DEFAULT_RUN_MODE,
-    type=click.Choice([run_mode.value for run_mode in ensemble_runner.RunMode]),
+    type=click.Choice([run_mode.value for run_mode in RunMode]),
     help="State to generate files for. If no state is given, all states are computed.",
 )
 @click.option("--states-only", default=False, is_flag=True, type=bool, help="Only model states")
@@ -276,7 +560,7 @@ def map_outputs(state, output_interval_days, run_mode, states_only):
 @click.option(
     "--run-mode",
     default=DEFAULT_RUN_MODE,
-    type=click.Choice([run_mode.value for run_mode in ensemble_runner.RunMode]),
+    type=click.Choice([run_mode.value for run_mode in RunMode]),
     help="State to generate files for. If no state is given, all states are computed.",
 )
 @click.option(
@@ -298,8 +582,85 @@ def map_outputs(state, output_interval_days, run_mode, states_only):
 )
 @click.option("--states-only", is_flag=True, help="If set, only runs on states.")
 @click.option("--output-dir", default=None, type=str, help="Directory to deploy webui output.")
+@click.option(
+    "--incremental-rt",
+    is_flag=True,
+    help="Resume Rt inference from the previous run's checkpoints when only new days were added.",
+)
+@click.option(
+    "--rt-reports",
+    default=reports.ReportMode.RENDER.value,
+    type=click.Choice([mode.value for mode in reports.ReportMode]),
+    help="Render Rt reports, defer them to `render-rt-reports` or skip them.",
+)
+@click.option(
+    "--fit-summaries",
+    is_flag=True,
+    help="Persist county MLE models from the workers and only return fit results to the parent.",
+)
+@click.option(
+    "--dag-scheduler",
+    is_flag=True,
+    help=(
+        "Schedule per fips tasks as soon as the tasks they depend on complete instead of "
+        "running the pipeline in stages, and report the critical path and worker utilization."
+    ),
+)
+@click.option(
+    "--shard",
+    default=None,
+    callback=_parse_shard_option,
+    help=(
+        "Only run shard i/n of the states (0 <= i < n). Run each shard with its own output root "
+        "in PYSEIR_OUTPUT_DIR and combine them with `merge-shards`."
+    ),
+)
+@click.option(
+    "--shard-costs",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help=(
+        "Fips costs of a previous run (pyseir/fips_costs.json of its output root) to balance "
+        "shards by. All shards must be given the same file."
+    ),
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help=(
+        "Resume the previous run from its completion journal, only running tasks that did not "
+        "complete or whose inputs changed. Implies --dag-scheduler."
+    ),
+)
+@click.option(
+    "--worker-max-tasks",
+    default=None,
+    type=int,
+    help="Replace a pool worker after it ran this many tasks. Workers are kept by default.",
+)
+@click.option(
+    "--worker-max-rss-mb",
+    default=2048,
+    type=float,
+    help="Replace a pool worker once its resident memory grew by more than this many MB.",
+)
 def build_all(
-    states, run_mode, output_interval_days, output_dir, skip_whitelist, states_only, fips,
+    states,
+    run_mode,
+    output_interval_days,
+    output_dir,
+    skip_whitelist,
+    states_only,
+    fips,
+    incremental_rt,
+    rt_reports,
+    fit_summaries,
+    dag_scheduler,
+    shard,
+    shard_costs,
+    resume,
+    worker_max_tasks,
+    worker_max_rss_mb,
 ):
     # split columns by ',' and remove whitespace
     states = [c.strip() for c in states]
@@ -316,9 +677,33 @@ def build_all(
         skip_whitelist=skip_whitelist,
         states_only=states_only,
         fips=fips,
+        incremental_rt=incremental_rt,
+        rt_reports=rt_reports,
+        fit_summaries=fit_summaries,
+        dag_scheduler=dag_scheduler,
+        shard=shard,
+        shard_costs=shard_costs,
+        resume=resume,
+        worker_max_tasks=worker_max_tasks,
+        worker_max_rss_mb=worker_max_rss_mb,
     )
 
 
+@entry_point.command()
+@click.argument(
+    "shard_dirs", nargs=-1, required=True, type=click.Path(exists=True, file_okay=False)
+)
+@click.option(
+    "--output-dir",
+    default=str(OUTPUT_DIR),
+    type=str,
+    help="Output root to assemble the shards into. Defaults to the pyseir output directory.",
+)
+def merge_shards(shard_dirs, output_dir):
+    """Merge the output roots of `build-all --shard` runs into one output root."""
+    sharding.merge_shards(shard_dirs, output_dir)
+
+
 if __name__ == "__main__":
     try:
         entry_point()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,114 @@
+"""
+Columnar, key (fips) indexed tables stored as a directory of .npy files.
+
+Rows are grouped by key and each column is one contiguous array, so the rows of a key are a
+slice of every column. Columns are memory mapped when a table is opened: a process only reads
+the pages of the keys it looks up, and forked workers share them through the page cache
+instead of each unpickling the whole table.
+"""
+import json
+import os
+import shutil
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+KEYS_FILE = "_keys.npy"
+OFFSETS_FILE = "_offsets.npy"
+COLUMNS_FILE = "_columns.json"
+
+
+def _column_array(values: pd.Series) -> np.ndarray:
+    if values.dtype == object:
+        # Object arrays can't be memory mapped, store strings with a fixed width instead (missing
+        # strings become empty strings).
+        return values.fillna("").astype(str).values.astype(str)
+    return values.values
+
+
+def write_columnar_table(directory: str, df: pd.DataFrame, key: str = "fips"):
+    """
+    Write df as a columnar table indexed by the key column.
+
+    Parameters
+    ----------
+    directory: str
+        Output directory of the table, replaced if it exists.
+    df: pd.DataFrame
+        Rows to store. The order of rows of each key is kept.
+    key: str
+        Column to index the rows by.
+    """
+    keys = df[key].values.astype(str)
+    order = np.argsort(keys, kind="mergesort")
+    df = df.iloc[order].reset_index(drop=True)
+    keys = keys[order]
+
+    unique_keys, starts = np.unique(keys, return_index=True)
+    offsets = np.append(starts, len(keys)).astype(np.int64)
+    columns = [column for column in df.columns if column != key]
+
+    tmp_directory = f"{directory}.tmp"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+    np.save(os.path.join(tmp_directory, KEYS_FILE), unique_keys)
+    np.save(os.path.join(tmp_directory, OFFSETS_FILE), offsets)
+    for i, column in enumerate(columns):
+        np.save(os.path.join(tmp_directory, f"{i}.npy"), _column_array(df[column]))
+    with open(os.path.join(tmp_directory, COLUMNS_FILE), "w") as f:
+        json.dump(columns, f)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_directory, directory)
+
+
+class ColumnarTable:
+    """
+    Table written by write_columnar_table, with memory mapped columns.
+
+    Parameters
+    ----------
+    directory: str
+        Directory of the table.
+    mmap_mode: str
+        Mode passed to np.load, None to read the columns into memory.
+    """
+
+    def __init__(self, directory: str, mmap_mode: Optional[str] = "r"):
+        self.directory = directory
+        keys = np.load(os.path.join(directory, KEYS_FILE))
+        self._offsets = np.load(os.path.join(directory, OFFSETS_FILE))
+        self._row_by_key = {key: i for i, key in enumerate(keys.tolist())}
+        with open(os.path.join(directory, COLUMNS_FILE)) as f:
+            self.columns = json.load(f)
+        self._arrays = {
+            column: np.load(os.path.join(directory, f"{i}.npy"), mmap_mode=mmap_mode)
+            for i, column in enumerate(self.columns)
+        }
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._row_by_key
+
+    def __len__(self) -> int:
+        return len(self._row_by_key)
+
+    def keys(self) -> Iterable[str]:
+        return self._row_by_key.keys()
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Rows of key as a dict of read only arrays by column, or None if key is not in the table.
+        """
+        i = self._row_by_key.get(key)
+        if i is None:
+            return None
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        return {column: values[start:stop] for column, values in self._arrays.items()}
+
+    def to_frame(self, key: str = "fips") -> pd.DataFrame:
+        """Read the whole table into a DataFrame with a key column."""
+        keys = np.repeat(list(self._row_by_key), np.diff(self._offsets))
+        return pd.DataFrame(
+            {key: keys, **{column: np.asarray(values) for column, values in self._arrays.items()}}
+        )
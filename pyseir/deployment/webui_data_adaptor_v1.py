@@ -3,9 +3,9 @@ import us
 from datetime import timedelta, datetime
 import numpy as np
 import pandas as pd
-from multiprocessing import Pool
 
 from libs import pipeline
+from pyseir import executor
 from pyseir.deployment import model_to_observed_shim as shim
 from pyseir.utils import get_run_artifact_path, RunArtifact, RunMode
 from libs.enums import Intervention
@@ -281,11 +281,9 @@ class WebUIDataAdaptorV1:
         if states_only:
             return
         else:
-            with Pool(maxtasksperchild=1) as p:
-                p.map(
-                    self.map_fips,
-                    map(pipeline.RegionalWebUIInput.from_fips, whitelisted_county_fips),
-                )
+            executor.parallel_map(
+                self.map_fips, map(pipeline.RegionalWebUIInput.from_fips, whitelisted_county_fips)
+            )
 
             return
 
@@ -2,7 +2,6 @@ import datetime
 import logging
 import os
 import numpy as np
-from multiprocessing import Pool
 from functools import partial
 import us
 import pickle
@@ -12,6 +11,7 @@ from collections import defaultdict
 from pyseir.models.seir_model import SEIRModel
 from pyseir.parameters.parameter_ensemble_generator import ParameterEnsembleGenerator
 import pyseir.models.suppression_policies as sp
+from pyseir import executor
 from pyseir.utils import get_run_artifact_path, RunArtifact, RunMode
 from pyseir.inference import fit_results
 from libs.datasets import AggregationLevel
@@ -427,6 +427,4 @@ def run_state(state, ensemble_kwargs, states_only=False):
         # Run county level
         county_latest = combined_datasets.load_us_latest_dataset().county
         all_fips = county_latest.get_subset(state=state).all_fips
-        with Pool(maxtasksperchild=1) as p:
-            f = partial(_run_county, ensemble_kwargs=ensemble_kwargs)
-            p.map(f, all_fips)
+        executor.parallel_map(partial(_run_county, ensemble_kwargs=ensemble_kwargs), all_fips)
@@ -0,0 +1,72 @@
+"""
+Process wide executor shared by all pyseir stages.
+
+Stages submit their work with parallel_map instead of creating their own pools. In the main
+process the work runs on a single WorkerPool sized to the machine, created on first use. In a
+task running on that pool the work is fanned out to the same pool, so a state level task runs
+its counties on the pool's workers without forking a pool of its own.
+"""
+import atexit
+import logging
+import multiprocessing
+from typing import Callable, Iterable, Optional
+
+from pyseir import worker_pool
+
+log = logging.getLogger(__name__)
+
+_executor: Optional[worker_pool.WorkerPool] = None
+_pool_kwargs = {}
+
+
+def configure(
+    processes: Optional[int] = None,
+    max_tasks_per_worker: Optional[int] = None,
+    max_rss_mb: Optional[float] = None,
+):
+    """
+    Set the parameters of the executor, see WorkerPool. An executor created with other
+    parameters is shut down first.
+    """
+    global _pool_kwargs
+    shutdown()
+    _pool_kwargs = dict(
+        processes=processes, max_tasks_per_worker=max_tasks_per_worker, max_rss_mb=max_rss_mb
+    )
+
+
+def get_executor() -> worker_pool.WorkerPool:
+    """The executor of the process, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = worker_pool.WorkerPool(**_pool_kwargs)
+        log.info(f"Started executor with {_executor.processes} workers")
+    return _executor
+
+
+def parallel_map(func: Callable, iterable: Iterable) -> list:
+    """
+    Map func over iterable on the executor, results in order. Raises the first error of a task.
+
+    Can be called from tasks running on the executor. In a daemon process of another pool, which
+    can't have workers, func runs serially.
+    """
+    if worker_pool.in_worker():
+        return worker_pool.map_from_worker(func, iterable)
+    if multiprocessing.current_process().daemon:
+        return [func(item) for item in iterable]
+    return get_executor().map(func, iterable)
+
+
+def shutdown():
+    """Wait for the submitted tasks of the executor and stop its workers."""
+    global _executor
+    if _executor is None:
+        return
+    executor, _executor = _executor, None
+    executor.close()
+    executor.join()
+    executor.metrics.log_summary()
+
+
+atexit.register(shutdown)
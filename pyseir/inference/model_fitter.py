@@ -6,7 +6,6 @@ import structlog
 from pprint import pformat
 import datetime as dt
 from datetime import datetime, timedelta
-from multiprocessing import Pool
 
 import pandas as pd
 import dill as pickle
@@ -14,9 +13,8 @@ import numpy as np
 import iminuit
 from covidactnow.datapublic.common_fields import CommonFields
 
-from pyseir.inference import model_plotting
 from pyseir.models import suppression_policies
-from pyseir import load_data
+from pyseir import executor, load_data
 from pyseir.models.seir_model import SEIRModel
 from pyseir.models.seir_model_age import SEIRModelAge
 from pyseir.parameters.parameter_ensemble_generator import ParameterEnsembleGenerator
@@ -27,6 +25,9 @@ from pyseir.inference.fit_results import load_inference_result
 
 from libs.datasets import combined_datasets
 from libs.datasets.dataset_utils import AggregationLevel
+from libs.lazy_import import lazy_import
+
+model_plotting = lazy_import("pyseir.inference.model_plotting")
 
 log = structlog.getLogger()
 
@@ -676,14 +677,53 @@ def execute_model_for_fips(fips):
     return None
 
 
-def _persist_results_per_state(state_df):
+def execute_model_summary_for_fips(fips):
+    """
+    Run the model fitter for a county and persist its MLE model from the worker.
+
+    Parameters
+    ----------
+    fips: str
+        5-digit county fips code.
+
+    Returns
+    -------
+    fit_results: dict or None
+        The fit results of the model fitter, without the model or data the fitter holds so
+        that it's cheap to return from a Pool. None if the fit failed.
+    """
+    model_fitter = execute_model_for_fips(fips)
+    if not model_fitter:
+        return None
+    _persist_mle_model(fips, model_fitter.mle_model)
+    return model_fitter.fit_results
+
+
+def _persist_mle_model(fips, mle_model):
+    with open(get_run_artifact_path(fips, RunArtifact.MLE_FIT_MODEL), "wb") as f:
+        pickle.dump(mle_model, f)
+
+
+def _persist_fit_results_per_state(state_df):
     county_output_file = get_run_artifact_path(state_df.fips[0], RunArtifact.MLE_FIT_RESULT)
-    data = state_df.drop(["state", "mle_model"], axis=1)
+    data = state_df.drop(["state", "mle_model"], axis=1, errors="ignore")
     data.to_json(county_output_file)
 
+
+def _persist_county_fit_results(fit_results):
+    """Write the fit results (as returned by execute_model_summary_for_fips) of a state's counties."""
+    fit_results = [fit for fit in fit_results if fit]
+    if not fit_results:
+        return
+    df = pd.DataFrame(fit_results)
+    df.index = df.fips
+    _persist_fit_results_per_state(df)
+
+
+def _persist_results_per_state(state_df):
+    _persist_fit_results_per_state(state_df)
     for fips, county_series in state_df.iterrows():
-        with open(get_run_artifact_path(fips, RunArtifact.MLE_FIT_MODEL), "wb") as f:
-            pickle.dump(county_series.mle_model, f)
+        _persist_mle_model(fips, county_series.mle_model)
 
 
 def build_county_list(state: str) -> List[str]:
@@ -738,8 +778,7 @@ def run_state(state, states_only=False, with_age_structure=False):
         all_fips = df_whitelist.loc[is_state, CommonFields.FIPS].values
 
         if len(all_fips) > 0:
-            with Pool(maxtasksperchild=1) as p:
-                fitters = p.map(ModelFitter.run_for_fips, all_fips)
+            fitters = executor.parallel_map(ModelFitter.run_for_fips, all_fips)
 
             county_output_file = get_run_artifact_path(all_fips[0], RunArtifact.MLE_FIT_RESULT)
             data = pd.DataFrame([fit.fit_results for fit in fitters if fit])
@@ -1,17 +1,16 @@
-import os
-import pandas as pd
-import numpy as np
 import logging
 from pyseir import load_data
-from datetime import datetime
 from covidactnow.datapublic.common_fields import CommonFields
 from libs.datasets import AggregationLevel
 from libs.datasets import combined_datasets
 from pyseir.utils import get_run_artifact_path, RunArtifact
-from pandarallel import pandarallel
 
-VISIBIBLE_PROGRESS_BAR = os.environ.get("PYSEIR_VERBOSITY") == "True"
-pandarallel.initialize(progress_bar=VISIBIBLE_PROGRESS_BAR)
+CANDIDATE_COLUMNS = [
+    "total_cases",
+    "total_deaths",
+    "nonzero_case_datapoints",
+    "nonzero_death_datapoints",
+]
 
 
 class WhitelistGenerator:
@@ -57,10 +56,16 @@ class WhitelistGenerator:
         )
         columns = [CommonFields.FIPS, CommonFields.STATE, CommonFields.COUNTY]
         counties = latest_values.data[columns]
-        # parallel load and compute
-        df_candidates = counties.fips.parallel_apply(_whitelist_candidates_per_fips)
-        # join extra data
-        df_candidates = df_candidates.merge(counties, left_on="fips", right_on="fips", how="inner",)
+        # compute the new case totals of all fips in one pass, counties without case data have
+        # no new cases
+        totals = load_data.build_new_case_totals(
+            combined_datasets.load_us_timeseries_dataset().data
+        )
+        df_candidates = counties.merge(
+            totals, left_on="fips", right_index=True, how="left"
+        ).reset_index(drop=True)
+        missing = ~df_candidates.fips.isin(totals.index)
+        df_candidates.loc[missing, CANDIDATE_COLUMNS] = 0
         df_candidates["inference_ok"] = (
             (df_candidates.nonzero_case_datapoints >= self.nonzero_case_datapoints)
             & (df_candidates.nonzero_death_datapoints >= self.nonzero_death_datapoints)
@@ -74,17 +79,3 @@ class WhitelistGenerator:
         df_whitelist.to_json(output_path)
 
         return df_whitelist
-
-
-def _whitelist_candidates_per_fips(fips):
-    times, observed_new_cases, observed_new_deaths = load_data.load_new_case_data_by_fips(
-        fips, t0=datetime(day=1, month=1, year=2020)
-    )
-    record = dict(
-        fips=fips,
-        total_cases=observed_new_cases.sum(),
-        total_deaths=observed_new_deaths.sum(),
-        nonzero_case_datapoints=np.sum(observed_new_cases > 0),
-        nonzero_death_datapoints=np.sum(observed_new_deaths > 0),
-    )
-    return pd.Series(record)
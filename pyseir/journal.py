@@ -0,0 +1,115 @@
+"""
+Completion journal of build_all tasks, used to resume a run that died midway.
+
+The journal is an append only JSON lines file with one entry per completed task: its key (e.g.
+("fit", "06037")), the fingerprint of its inputs, the artifacts it wrote and, for tasks whose
+results are passed to other tasks, its result. An entry is appended by the parent process after
+the task returned, as a single line that is flushed and synced, so a crash leaves at most a torn
+last line which is removed when resuming. A task is complete if the journal has an entry with the
+same input fingerprint and all of the entry's artifacts exist.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Hashable, Optional, Sequence
+
+import numpy as np
+
+from pyseir import OUTPUT_DIR
+
+JOURNAL_FILENAME = "build_journal.jsonl"
+
+
+def get_journal_path(output_dir: Optional[str] = None) -> str:
+    return os.path.join(output_dir or OUTPUT_DIR, "pyseir", JOURNAL_FILENAME)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash of parts, which are arrays or JSON serializable values (others are hashed by str)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _entry_key(key: Hashable) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+class CompletionJournal:
+    """
+    Journal of completed tasks stored at path.
+
+    Parameters
+    ----------
+    path: str
+        Path of the journal file.
+    resume: bool
+        If True keep the entries of a previous run, otherwise start an empty journal.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._entries = {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if resume:
+            self._read()
+        else:
+            open(path, "w").close()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            # Truncate the torn last line of a run that died while writing it, so that the next
+            # entry isn't appended to it.
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                f.truncate(complete)
+        for line in data[:complete].decode().splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._entries[entry["key"]] = entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_complete(self, key: Hashable, input_fingerprint: str) -> bool:
+        entry = self._entries.get(_entry_key(key))
+        return (
+            entry is not None
+            and entry["fingerprint"] == input_fingerprint
+            and all(os.path.exists(path) for path in entry["artifacts"])
+        )
+
+    def result(self, key: Hashable) -> Any:
+        """Result recorded for a completed task."""
+        return self._entries[_entry_key(key)].get("result")
+
+    def record(
+        self,
+        key: Hashable,
+        input_fingerprint: str,
+        artifacts: Sequence[str] = (),
+        result: Any = None,
+    ):
+        """Record that the task key completed, writing artifacts, with the given inputs."""
+        entry = dict(
+            key=_entry_key(key),
+            fingerprint=input_fingerprint,
+            artifacts=list(artifacts),
+            result=result,
+        )
+        line = json.dumps(entry) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries[entry["key"]] = entry
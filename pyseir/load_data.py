@@ -1,3 +1,4 @@
+import glob
 import os
 import logging
 import urllib.request
@@ -10,21 +11,27 @@ import json
 from datetime import datetime
 from functools import lru_cache
 from enum import Enum
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 import numpy as np
 
 from covidactnow.datapublic.common_fields import CommonFields
-from libs.datasets import combined_datasets
 from libs.datasets.timeseries import TimeseriesDataset
 from libs.datasets.dataset_utils import AggregationLevel
+from libs.lazy_import import lazy_import
 import pyseir.utils
+from pyseir import columnar_store
 
 # from pyseir.utils import get_run_artifact_path, RunArtifact, ewma_smoothing
 
 log = logging.getLogger(__name__)
 
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyseir_data")
+MOBILITY_DATA_PATH = os.path.join(DATA_DIR, "mobility_data")
+PUBLIC_IMPLEMENTATIONS_DATA_PATH = os.path.join(DATA_DIR, "public_implementations_data")
 
 
 class HospitalizationCategory(Enum):
@@ -90,17 +97,8 @@ def cache_mobility_data():
     }
 
     df = pd.read_csv(filepath_or_buffer=url, parse_dates=["date"], dtype=dtypes_mapping)
-    df__m50 = df.query("admin_level == 2")[["fips", "date", "m50"]]
-    df__m50_index = df.query("admin_level == 2")[["fips", "date", "m50_index"]]
-    df__m50__final = df__m50.groupby("fips").agg(list).reset_index()
-    df__m50_index__final = df__m50_index.groupby("fips").agg(list).reset_index()
-    df__m50__final["m50"] = df__m50__final["m50"].apply(lambda x: np.array(x))
-    df__m50_index__final["m50_index"] = df__m50_index__final["m50_index"].apply(
-        lambda x: np.array(x)
-    )
-
-    df__m50__final.to_pickle(os.path.join(DATA_DIR, "mobility_data__m50.pkl"))
-    df__m50_index__final.to_pickle(os.path.join(DATA_DIR, "mobility_data__m50_index.pkl"))
+    df = df.query("admin_level == 2")[["fips", "date", "m50", "m50_index"]]
+    columnar_store.write_columnar_table(MOBILITY_DATA_PATH, df)
 
 
 def cache_public_implementations_data():
@@ -130,7 +128,197 @@ def cache_public_implementations_data():
         col.replace(">", "").replace(" ", "_").replace("/", "_").lower() for col in df.columns
     ]
     df.fips = df.fips.apply(lambda x: x.zfill(5))
-    df.to_pickle(os.path.join(DATA_DIR, "public_implementations_data.pkl"))
+    columnar_store.write_columnar_table(PUBLIC_IMPLEMENTATIONS_DATA_PATH, df)
+
+
+def _sort_by_fips(data: pd.DataFrame) -> pd.DataFrame:
+    """Rows with a fips, grouped by fips, keeping the order of rows within each fips."""
+    data = data.loc[data[CommonFields.FIPS].notnull()]
+    order = np.argsort(data[CommonFields.FIPS].values.astype(str), kind="mergesort")
+    return data.iloc[order].reset_index(drop=True)
+
+
+def _first_in_group(fips: np.ndarray) -> np.ndarray:
+    """True for the first row of each fips in rows grouped by fips."""
+    return np.append([True], fips[1:] != fips[:-1])
+
+
+def _reported_case_rows(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Case and death rows grouped by fips, trimmed to the range of each fips where cases or deaths
+    are reported, like get_timeseries_for_fips(..., min_range_with_some_value=True).
+    """
+    data = _sort_by_fips(
+        data[[CommonFields.FIPS, CommonFields.DATE, CommonFields.CASES, CommonFields.DEATHS]]
+    )
+    fips = data[CommonFields.FIPS].values
+    has_value = (data[CommonFields.CASES].notnull() | data[CommonFields.DEATHS].notnull()).values
+
+    # Drop rows before the first and after the last reported value of each fips.
+    started = pd.Series(has_value).groupby(fips, sort=False).cumsum().values > 0
+    remaining = pd.Series(has_value[::-1]).groupby(fips[::-1], sort=False).cumsum().values > 0
+    return data.loc[started & remaining[::-1]].reset_index(drop=True)
+
+
+def build_new_case_index(data: pd.DataFrame) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Compute new cases and deaths of every fips in one pass over the timeseries.
+
+    Like get_timeseries_for_fips(..., min_range_with_some_value=True), each fips' rows are
+    trimmed to the range where cases or deaths are reported, then differenced.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Timeseries rows with fips, date, cases and deaths columns.
+
+    Returns
+    -------
+    index: dict
+        Map of fips to a dict of date, new_cases and new_deaths arrays. Dates are the dates of
+        the second to last row, as there is no new count for the first row.
+    """
+    data = _reported_case_rows(data)
+    fips = data[CommonFields.FIPS].values
+
+    dates = data[CommonFields.DATE].values
+    new_cases = np.diff(data[CommonFields.CASES].values.astype(float))
+    new_deaths = np.diff(data[CommonFields.DEATHS].values.astype(float))
+    index = {}
+    for fips_code, positions in pd.Series(fips).groupby(fips, sort=False).indices.items():
+        start, stop = positions[0], positions[-1] + 1
+        index[fips_code] = {
+            "date": dates[start + 1 : stop],
+            "new_cases": new_cases[start : stop - 1],
+            "new_deaths": new_deaths[start : stop - 1],
+        }
+    return index
+
+
+def build_new_case_totals(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Totals of the new cases and deaths returned by load_new_case_data_by_fips, for every fips
+    in one grouped pass over the timeseries.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Timeseries rows with fips, date, cases and deaths columns.
+
+    Returns
+    -------
+    totals: pd.DataFrame
+        Indexed by fips, with the total_cases, total_deaths, nonzero_case_datapoints and
+        nonzero_death_datapoints of the new counts clipped at 0. Totals are NaN if a new count
+        is missing. Fips with less than two rows are not included.
+    """
+    data = _reported_case_rows(data)
+    fips = data[CommonFields.FIPS].values
+    later = ~_first_in_group(fips)
+    new_counts = pd.DataFrame(
+        {
+            "cases": np.diff(data[CommonFields.CASES].values.astype(float), prepend=np.nan),
+            "deaths": np.diff(data[CommonFields.DEATHS].values.astype(float), prepend=np.nan),
+        }
+    )[later].clip(lower=0)
+    by_fips = fips[later]
+
+    totals = new_counts.groupby(by_fips).sum()
+    totals = totals.mask(new_counts.isnull().groupby(by_fips).any())
+    nonzero = (new_counts > 0).groupby(by_fips).sum()
+    return pd.DataFrame(
+        {
+            "total_cases": totals["cases"],
+            "total_deaths": totals["deaths"],
+            "nonzero_case_datapoints": nonzero["cases"],
+            "nonzero_death_datapoints": nonzero["deaths"],
+        }
+    ).rename_axis(CommonFields.FIPS)
+
+
+@lru_cache(maxsize=1)
+def get_new_case_index() -> Dict[str, Dict[str, np.ndarray]]:
+    """New cases and deaths of every fips, built once per process."""
+    return build_new_case_index(combined_datasets.load_us_timeseries_dataset().data)
+
+
+NEW_TEST_COLUMNS = [
+    "date",
+    "new_tests",
+    "increase_in_new_tests",
+    "positivity_rate",
+    "expected_positives_from_test_increase",
+    "new_positive",
+]
+
+
+def build_new_test_index(data: pd.DataFrame) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Compute the test based columns of load_new_test_data_by_fips for every fips in one pass
+    over the timeseries. expected_positives_from_test_increase is not smoothed yet.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Timeseries rows with fips, date, positive_tests and negative_tests columns.
+
+    Returns
+    -------
+    index: dict
+        Map of fips to a dict of NEW_TEST_COLUMNS arrays.
+    """
+    positive = data[CommonFields.POSITIVE_TESTS]
+    negative = data[CommonFields.NEGATIVE_TESTS]
+    data = data.loc[positive.notnull() & negative.notnull() & (negative > 0) & (positive > 0)]
+    data = _sort_by_fips(
+        data[
+            [
+                CommonFields.FIPS,
+                CommonFields.DATE,
+                CommonFields.POSITIVE_TESTS,
+                CommonFields.NEGATIVE_TESTS,
+            ]
+        ]
+    )
+    fips = data[CommonFields.FIPS].values
+    first = _first_in_group(fips)
+
+    def diff_in_group(values):
+        return np.where(first, 0, np.diff(values, prepend=np.nan))
+
+    positive = data[CommonFields.POSITIVE_TESTS].values.astype(float)
+    total = positive + data[CommonFields.NEGATIVE_TESTS].values.astype(float)
+    columns = {"date": data[CommonFields.DATE].values}
+    columns["new_tests"] = diff_in_group(total)
+    columns["increase_in_new_tests"] = diff_in_group(columns["new_tests"])
+    columns["positivity_rate"] = positive / total
+    # dPositive / dTotal = 0.65 * positivity_rate was empirically determined by looking at
+    # the increase in positives day-over-day relative to the increase in total tests across all 50 states.
+    columns["expected_positives_from_test_increase"] = (
+        columns["increase_in_new_tests"] * 0.65 * columns["positivity_rate"]
+    )
+    columns["new_positive"] = diff_in_group(positive)
+
+    index = {}
+    for fips_code, positions in pd.Series(fips).groupby(fips, sort=False).indices.items():
+        rows = slice(positions[0], positions[-1] + 1)
+        index[fips_code] = {column: columns[column][rows] for column in NEW_TEST_COLUMNS}
+    return index
+
+
+@lru_cache(maxsize=1)
+def get_new_test_index() -> Dict[str, Dict[str, np.ndarray]]:
+    """Test based columns of every fips, built once per process."""
+    return build_new_test_index(combined_datasets.load_us_timeseries_dataset().data)
+
+
+def precompute_new_count_data():
+    """
+    Build the new case, death and test indexes for all fips. Call before forking workers so
+    they share the indexes instead of each building them.
+    """
+    get_new_case_index()
+    get_new_test_index()
 
 
 @lru_cache(maxsize=32)
@@ -162,15 +350,14 @@ def load_new_case_data_by_fips(
     observed_new_deaths: array(int)
         Array of new deaths observed each day.
     """
-    county_case_timeseries = combined_datasets.get_timeseries_for_fips(
-        fips, columns=[CommonFields.CASES, CommonFields.DEATHS], min_range_with_some_value=True
-    )
-    county_case_data = county_case_timeseries.data
+    new_case_data = get_new_case_index().get(fips)
+    if new_case_data is None:
+        new_case_data = {"date": np.array([], dtype="datetime64[ns]")}
+        new_case_data["new_cases"] = new_case_data["new_deaths"] = np.array([], dtype=float)
 
-    times_new = (county_case_data["date"] - t0).dt.days.iloc[1:]
-    observed_new_cases = (
-        county_case_data["cases"].values[1:] - county_case_data["cases"].values[:-1]
-    )
+    dates = pd.Series(new_case_data["date"], index=range(1, len(new_case_data["date"]) + 1))
+    times_new = (dates - t0).dt.days
+    observed_new_cases = new_case_data["new_cases"]
 
     if include_testing_correction:
         df_new_tests = load_new_test_data_by_fips(
@@ -181,9 +368,7 @@ def load_new_case_data_by_fips(
         df_cases["new_cases"] -= df_cases["expected_positives_from_test_increase"].fillna(0)
         observed_new_cases = df_cases["new_cases"].values
 
-    observed_new_deaths = (
-        county_case_data["deaths"].values[1:] - county_case_data["deaths"].values[:-1]
-    )
+    observed_new_deaths = new_case_data["new_deaths"]
 
     # Clip because there are sometimes negatives either due to data reporting or
     # corrections in case count. These are always tiny so we just make
@@ -207,6 +392,81 @@ def get_hospitalization_data():
     return TimeseriesDataset(data[has_current_hospital | has_cumulative_hospital])
 
 
+HOSPITALIZATION_COLUMNS = [
+    CommonFields.CURRENT_HOSPITALIZED,
+    CommonFields.CUMULATIVE_HOSPITALIZED,
+    CommonFields.CURRENT_ICU,
+    CommonFields.CUMULATIVE_ICU,
+]
+
+
+def build_hospitalization_index(data: pd.DataFrame) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Split hospitalization rows by fips with a single groupby.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Timeseries rows with fips, date and HOSPITALIZATION_COLUMNS columns.
+
+    Returns
+    -------
+    index: dict
+        Map of fips to a dict of date and hospitalization column arrays, in the row order of
+        data.
+    """
+    # Keyed by the plain column names, e.g. "current_icu".
+    columns = {CommonFields.DATE.value: data[CommonFields.DATE].values}
+    for column in HOSPITALIZATION_COLUMNS:
+        columns[column.value] = data[column].values.astype(float)
+
+    return {
+        fips: {column: values[rows] for column, values in columns.items()}
+        for fips, rows in data.groupby(CommonFields.FIPS, sort=False).indices.items()
+    }
+
+
+@lru_cache(maxsize=1)
+def get_hospitalization_index() -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Hospitalization data of every fips, built once per process from get_hospitalization_data so
+    that looking up a fips does not filter the whole dataset.
+    """
+    return build_hospitalization_index(get_hospitalization_data().data)
+
+
+def select_hospitalization_data(
+    hospitalization_data: Optional[Dict[str, np.ndarray]],
+    t0: datetime,
+    category: HospitalizationCategory = HospitalizationCategory.HOSPITALIZED,
+):
+    """
+    Pick current (preferably) or cumulative hospitalizations of a category from a fips' entry
+    of the hospitalization index. See load_hospitalization_data.
+    """
+    if hospitalization_data is None or len(hospitalization_data[CommonFields.DATE.value]) == 0:
+        return None, None, None
+
+    for prefix, data_type in (
+        ("current", HospitalizationDataType.CURRENT_HOSPITALIZATIONS),
+        ("cumulative", HospitalizationDataType.CUMULATIVE_HOSPITALIZATIONS),
+    ):
+        values = hospitalization_data[f"{prefix}_{category}"]
+        if not (values > 0).any():
+            continue
+
+        has_value = ~np.isnan(values)
+        dates = hospitalization_data[CommonFields.DATE.value][has_value].astype("datetime64[D]")
+        relative_days = (dates - np.datetime64(t0.date(), "D")).astype(int)
+        values = values[has_value].clip(min=0)
+        if data_type is HospitalizationDataType.CUMULATIVE_HOSPITALIZATIONS:
+            # Some minor glitches for a few states..
+            values[:-1] = np.minimum(values[:-1], values[1:])
+        return relative_days, values, data_type
+
+    return None, None, None
+
+
 @lru_cache(maxsize=32)
 def load_hospitalization_data(
     fips: str,
@@ -235,34 +495,7 @@ def load_hospitalization_data(
     type: HospitalizationDataType
         Specifies cumulative or current hospitalizations.
     """
-    hospitalization_data = get_hospitalization_data().get_data(fips=fips)
-
-    if len(hospitalization_data) == 0:
-        return None, None, None
-
-    if (hospitalization_data[f"current_{category}"] > 0).any():
-        hospitalization_data = hospitalization_data[
-            hospitalization_data[f"current_{category}"].notnull()
-        ]
-        relative_days = (hospitalization_data["date"].dt.date - t0.date()).dt.days.values
-        return (
-            relative_days,
-            hospitalization_data[f"current_{category}"].values.clip(min=0),
-            HospitalizationDataType.CURRENT_HOSPITALIZATIONS,
-        )
-    elif (hospitalization_data[f"cumulative_{category}"] > 0).any():
-        hospitalization_data = hospitalization_data[
-            hospitalization_data[f"cumulative_{category}"].notnull()
-        ]
-        relative_days = (hospitalization_data["date"].dt.date - t0.date()).dt.days.values
-        cumulative = hospitalization_data[f"cumulative_{category}"].values.clip(min=0)
-        # Some minor glitches for a few states..
-        for i, val in enumerate(cumulative[1:]):
-            if cumulative[i] > cumulative[i + 1]:
-                cumulative[i] = cumulative[i + 1]
-        return relative_days, cumulative, HospitalizationDataType.CUMULATIVE_HOSPITALIZATIONS
-    else:
-        return None, None, None
+    return select_hospitalization_data(get_hospitalization_index().get(fips), t0, category)
 
 
 @lru_cache(maxsize=32)
@@ -298,53 +531,18 @@ def load_new_test_data_by_fips(fips, t0, smoothing_tau=5, correction_threshold=5
         Do not apply a correction if the incident cases per day is lower than
         this value. There can be instability if case counts are very low.
     """
-    fips_timeseries = combined_datasets.get_timeseries_for_fips(fips)
-    df = fips_timeseries.data.copy()
-
-    # Aggregation level is None as fips is unique across aggregation levels.
-    df = df.loc[
-        (df[CommonFields.POSITIVE_TESTS].notnull())
-        & (df[CommonFields.NEGATIVE_TESTS].notnull())
-        & (df[CommonFields.NEGATIVE_TESTS] > 0)
-        & (df[CommonFields.POSITIVE_TESTS] > 0),
-        :,
-    ]
-
-    df["positivity_rate"] = df[CommonFields.POSITIVE_TESTS] / (
-        df[CommonFields.POSITIVE_TESTS] + df[CommonFields.NEGATIVE_TESTS]
-    )
-    df["new_positive"] = np.append([0], np.diff(df[CommonFields.POSITIVE_TESTS]))
-
-    # The first derivative gets us new instead of cumulative tests while the second derivative gives us the change in new test rate.
-    df["new_tests"] = np.append(
-        [0], np.diff(df[CommonFields.POSITIVE_TESTS] + df[CommonFields.NEGATIVE_TESTS])
-    )
-    df["increase_in_new_tests"] = np.append([0], np.diff(df["new_tests"]))
-
-    # dPositive / dTotal = 0.65 * positivity_rate was empirically determined by looking at
-    # the increase in positives day-over-day relative to the increase in total tests across all 50 states.
-    df["expected_positives_from_test_increase"] = (
-        df["increase_in_new_tests"] * 0.65 * df["positivity_rate"]
-    )
-    df = df[
-        [
-            "date",
-            "new_tests",
-            "increase_in_new_tests",
-            "positivity_rate",
-            "expected_positives_from_test_increase",
-            "new_positive",
-        ]
-    ]
+    new_test_data = get_new_test_index().get(fips)
+    if new_test_data is None:
+        df = pd.DataFrame({column: [] for column in NEW_TEST_COLUMNS})
+    else:
+        df = pd.DataFrame(new_test_data, columns=NEW_TEST_COLUMNS)
     df = df.loc[df.increase_in_new_tests.notnull() & df.positivity_rate.notnull(), :]
     df["expected_positives_from_test_increase"] = pyseir.utils.ewma_smoothing(
         df["expected_positives_from_test_increase"], smoothing_tau
     )
     df.loc[df["new_positive"] < 5, "expected_positives_from_test_increase"] = 0
 
-    df["times"] = [
-        int((date - t0).days) for date in pd.to_datetime(df["date"].values).to_pydatetime()
-    ]
+    df["times"] = (pd.to_datetime(df["date"]) - t0).dt.days.astype(int)
 
     return df
 
@@ -365,6 +563,48 @@ def load_cdc_hospitalization_data():
     return pd.read_csv(os.path.join(DATA_DIR, "cdc_hospitalization_data.csv"))
 
 
+@lru_cache(maxsize=1)
+def load_mobility_data_table() -> columnar_store.ColumnarTable:
+    """
+    Return the memory mapped mobility data table, with date, m50 and m50_index columns indexed
+    by fips.
+    """
+    return columnar_store.ColumnarTable(MOBILITY_DATA_PATH)
+
+
+def load_mobility_data_by_fips(fips) -> Optional[pd.DataFrame]:
+    """
+    Return the mobility data of a county.
+
+    Parameters
+    ----------
+    fips: str
+        County FIPS code.
+
+    Returns
+    -------
+    : pd.DataFrame or None
+        With date, m50 and m50_index (normalized m50, see load_mobility_data_m50_index)
+        columns, None if there is no mobility data for the county.
+    """
+    rows = load_mobility_data_table().get(fips)
+    if rows is None:
+        return None
+    return pd.DataFrame(rows)
+
+
+def _load_mobility_data_column(column):
+    table = load_mobility_data_table()
+    rows = {fips: table.get(fips) for fips in table.keys()}
+    return pd.DataFrame(
+        {
+            "fips": list(rows),
+            "date": [list(pd.to_datetime(fips_rows["date"])) for fips_rows in rows.values()],
+            column: [np.array(fips_rows[column]) for fips_rows in rows.values()],
+        }
+    )
+
+
 @lru_cache(maxsize=1)
 def load_mobility_data_m50():
     """
@@ -374,7 +614,7 @@ def load_mobility_data_m50():
     -------
     : pd.DataFrame
     """
-    return pd.read_pickle(os.path.join(DATA_DIR, "mobility_data__m50.pkl"))
+    return _load_mobility_data_column("m50")
 
 
 @lru_cache(maxsize=1)
@@ -388,7 +628,37 @@ def load_mobility_data_m50_index():
     -------
     : pd.DataFrame
     """
-    return pd.read_pickle(os.path.join(DATA_DIR, "mobility_data__m50_index.pkl")).set_index("fips")
+    return _load_mobility_data_column("m50_index").set_index("fips")
+
+
+@lru_cache(maxsize=1)
+def load_public_implementations_table() -> columnar_store.ColumnarTable:
+    """Return the memory mapped public implementations table, indexed by fips."""
+    return columnar_store.ColumnarTable(PUBLIC_IMPLEMENTATIONS_DATA_PATH)
+
+
+def load_public_implementations_by_fips(fips) -> Optional[dict]:
+    """
+    Return the public implementations of a county.
+
+    Parameters
+    ----------
+    fips: str
+        County FIPS code.
+
+    Returns
+    -------
+    : dict or None
+        Implementation date (NaT if not implemented) of each policy, None if the county is not
+        in the dataset.
+    """
+    rows = load_public_implementations_table().get(fips)
+    if rows is None:
+        return None
+    return {
+        column: pd.Timestamp(values[0]) if np.issubdtype(values.dtype, np.datetime64) else values[0]
+        for column, values in rows.items()
+    }
 
 
 @lru_cache(maxsize=1)
@@ -400,9 +670,67 @@ def load_public_implementations_data():
     -------
     : pd.DataFrame
     """
-    return pd.read_pickle(os.path.join(DATA_DIR, "public_implementations_data.pkl")).set_index(
-        "fips"
-    )
+    return load_public_implementations_table().to_frame().set_index("fips")
+
+
+CONTACT_MATRIX_DIR = os.path.join(DATA_DIR, "contact_matrix")
+CONTACT_MATRIX_KEYS = ("age_bin_edges", "age_distribution", "contact_matrix")
+
+
+def _contact_matrix_path(state_abbr, extension):
+    return os.path.join(CONTACT_MATRIX_DIR, f"contact_matrix_fips_{state_abbr}.{extension}")
+
+
+def _contact_matrix_arrays(contact_matrix_data: dict) -> Dict[str, np.ndarray]:
+    """Stack the per fips contact matrix data of a state into arrays with one row per fips."""
+    fips = sorted(contact_matrix_data)
+    arrays = {"fips": np.array(fips)}
+    for key, dtype in zip(CONTACT_MATRIX_KEYS, (int, float, float)):
+        arrays[key] = np.array([contact_matrix_data[s][key] for s in fips], dtype=dtype)
+    return arrays
+
+
+def cache_contact_matrix_data():
+    """
+    Convert the contact matrix JSON of each state to the binary (npz) store read by
+    load_contact_matrix_data_by_fips.
+    """
+    for json_path in sorted(glob.glob(_contact_matrix_path("*", "json"))):
+        with open(json_path) as f:
+            arrays = _contact_matrix_arrays(json.load(f))
+        np.savez(os.path.splitext(json_path)[0] + ".npz", **arrays)
+
+
+@lru_cache(maxsize=None)
+def _state_abbr(state_fips):
+    return us.states.lookup(state_fips).abbr
+
+
+@lru_cache(maxsize=None)
+def load_contact_matrix_store(state_abbr) -> Tuple[Dict[str, int], Dict[str, np.ndarray]]:
+    """
+    Load the contact matrix data of all fips in a state, once per process.
+
+    Reads the binary store written by cache_contact_matrix_data, or the state's JSON if the
+    store is missing or older than the JSON.
+
+    Returns
+    -------
+    row_by_fips: dict
+        Row of each fips in the arrays.
+    arrays: dict
+        'contact_matrix', 'age_bin_edges' and 'age_distribution' arrays with one row per fips.
+    """
+    json_path = _contact_matrix_path(state_abbr, "json")
+    npz_path = _contact_matrix_path(state_abbr, "npz")
+    if os.path.exists(npz_path) and os.path.getmtime(npz_path) >= os.path.getmtime(json_path):
+        with np.load(npz_path) as npz:
+            arrays = {key: npz[key] for key in npz.files}
+    else:
+        with open(json_path) as f:
+            arrays = _contact_matrix_arrays(json.load(f))
+    row_by_fips = {fips: row for row, fips in enumerate(arrays["fips"].tolist())}
+    return row_by_fips, arrays
 
 
 def load_contact_matrix_data_by_fips(fips):
@@ -431,10 +759,10 @@ def load_contact_matrix_data_by_fips(fips):
     """
 
     fips = [fips] if isinstance(fips, str) else list(fips)
-    state_abbr = us.states.lookup(fips[0][:2]).abbr
-    path = os.path.join(DATA_DIR, "contact_matrix", "contact_matrix_fips_%s.json" % state_abbr)
-    contact_matrix_data = json.loads(open(path).read())
-    return {s: contact_matrix_data[s] for s in fips}
+    row_by_fips, arrays = load_contact_matrix_store(_state_abbr(fips[0][:2]))
+    return {
+        s: {key: arrays[key][row_by_fips[s]].tolist() for key in CONTACT_MATRIX_KEYS} for s in fips
+    }
 
 
 def load_whitelist():
@@ -460,6 +788,7 @@ def cache_all_data():
     """
     cache_mobility_data()
     cache_public_implementations_data()
+    cache_contact_matrix_data()
 
 
 if __name__ == "__main__":
@@ -8,7 +8,9 @@ import numpy as np
 # from jax import jit
 from scipy.integrate import odeint
 
-import matplotlib.pyplot as plt
+from libs.lazy_import import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 z0 = np.array([0])
 
@@ -503,7 +505,7 @@ class SEIRModel:
             HAdmissions_ICU
         )  # Derivative of the cumulative.
 
-    def plot_results(self, y_scale="log", xlim=None) -> plt.Figure:
+    def plot_results(self, y_scale="log", xlim=None) -> "plt.Figure":
         """
         Generate a summary plot for the simulation.
 
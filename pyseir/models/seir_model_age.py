@@ -1,6 +1,9 @@
 import numpy as np
 from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
+
+from libs.lazy_import import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SEIRModelAge:
@@ -965,7 +968,7 @@ class SEIRModelAge:
         self.results["by_age"]["HICU"] = HICU
         self.results["by_age"]["HVent"] = HICUVent
 
-    def plot_results(self, y_scale="log", by_age_group=False, xlim=None) -> plt.Figure:
+    def plot_results(self, y_scale="log", by_age_group=False, xlim=None) -> "plt.Figure":
         """
         Generate a summary plot for the simulation.
 
@@ -288,10 +288,10 @@ def generate_empirical_distancing_policy(
     rho = []
 
     # Check for fips that don't match.
-    public_implementations = load_data.load_public_implementations_data()
+    policies = load_data.load_public_implementations_by_fips(fips)
 
     # Not all counties present in this dataset.
-    if fips not in public_implementations.index:
+    if policies is None:
         # Then assume 1.0 until today and then future_suppression going forward.
         for t_step in t_list:
             t_actual = t0 + timedelta(days=t_step)
@@ -300,7 +300,6 @@ def generate_empirical_distancing_policy(
             else:
                 rho.append(future_suppression)
     else:
-        policies = public_implementations.loc[fips].to_dict()
         for t_step in t_list:
             t_actual = t0 + timedelta(days=t_step)
             rho_this_t = 1
@@ -0,0 +1,345 @@
+"""
+Array-native forward filter for the Bayesian R_t inference in pyseir.rt.infer_rt.
+
+The prior, likelihood and posterior for every day are held in preallocated
+(len(R_BUCKETS), T) numpy matrices so that each daily update is a handful of
+vector operations. DataFrames are only built once, by the caller, at the end.
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from pyseir.rt import process_matrix
+from pyseir.rt.constants import InferRtConstants
+
+
+@dataclass
+class FilterResult:
+    """
+    Output of run_forward_filter. Matrices are shaped (len(r_list), T) and column 0 holds the
+    initial posterior the filter was started from.
+    """
+
+    priors: np.ndarray
+    posteriors: np.ndarray
+    # argmax of the (unnormalized) Bayes numerator for each day. Kept separately from the
+    # posterior argmax since the two differ on days the filter was re-initialized.
+    numerator_argmax: np.ndarray
+    # Process sigma and exponential moving average of counts used for each day.
+    sigmas: np.ndarray
+    scales: np.ndarray
+    log_likelihood: float
+
+    @property
+    def last_posterior(self) -> np.ndarray:
+        return self.posteriors[:, -1]
+
+    @property
+    def last_scale(self) -> float:
+        return float(self.scales[-1])
+
+
+def run_forward_filter(
+    likelihoods: np.ndarray,
+    counts: np.ndarray,
+    initial_posterior: np.ndarray,
+    reinit_prior: np.ndarray,
+    make_process_matrix: Callable[[float], Tuple[float, np.ndarray]],
+    initial_scale: Optional[float] = None,
+    log_normalizers: Optional[np.ndarray] = None,
+) -> FilterResult:
+    """
+    Iteratively apply Bayes' rule over a timeseries.
+
+    Parameters
+    ----------
+    likelihoods: np.ndarray
+        (len(r_list), T) likelihood of each day's observation over R_t. Column 0 is ignored.
+    counts: np.ndarray
+        (T,) smoothed counts, used to track the scale of the timeseries for the auto sigma.
+    initial_posterior: np.ndarray
+        Posterior for day 0 of the series.
+    reinit_prior: np.ndarray
+        Prior to restart from when the data has zero probability under the current prior.
+    make_process_matrix: callable
+        Maps the current count scale to (sigma, process_matrix). The process matrix can be any
+        object supporting `process_matrix @ posterior`, e.g. a BandedProcessMatrix.
+    initial_scale: float or NoneType
+        Count scale at day 0. Defaults to counts[0].
+    log_normalizers: np.ndarray or NoneType
+        (T,) log of the factor each day's likelihood was divided by (see
+        pyseir.rt.likelihoods.normalize_log_likelihoods). Added back to the log likelihood.
+
+    Returns
+    -------
+    result: FilterResult
+    """
+    n_r, n_t = likelihoods.shape
+    priors = np.empty((n_r, n_t))
+    posteriors = np.empty((n_r, n_t))
+    numerator_argmax = np.zeros(n_t, dtype=int)
+    sigmas = np.full(n_t, np.nan)
+    scales = np.empty(n_t)
+
+    priors[:, 0] = initial_posterior
+    posteriors[:, 0] = initial_posterior
+    scale = counts[0] if initial_scale is None else initial_scale
+    scales[0] = scale
+
+    # Sum of the log of the probability of the data for maximum likelihood calculation.
+    log_likelihood = 0.0
+
+    for day in range(1, n_t):
+        # Keep track of exponential moving average of scale of counts of timeseries
+        scale = 0.9 * scale + 0.1 * counts[day]
+        scales[day] = scale
+
+        sigmas[day], process_matrix = make_process_matrix(scale)
+
+        # Calculate the new prior from the previous day's posterior
+        prior = priors[:, day] = process_matrix @ posteriors[:, day - 1]
+
+        # Numerator and denominator of Bayes' Rule: P(k|R_t)P(R_t) and P(k)
+        numerator = likelihoods[:, day] * prior
+        denominator = numerator.sum()
+        numerator_argmax[day] = numerator.argmax()
+
+        if denominator == 0:
+            # Restart the bayesian learning for the remaining series, otherwise NaN values
+            # would be inferred for all future days after seeing a single (smoothed) zero.
+            posteriors[:, day] = reinit_prior
+        else:
+            posteriors[:, day] = numerator / denominator
+
+        log_likelihood += np.log(denominator)
+        if log_normalizers is not None:
+            log_likelihood += log_normalizers[day]
+
+    return FilterResult(
+        priors=priors,
+        posteriors=posteriors,
+        numerator_argmax=numerator_argmax,
+        sigmas=sigmas,
+        scales=scales,
+        log_likelihood=log_likelihood,
+    )
+
+
+def run_batched_forward_filter(
+    likelihoods: np.ndarray,
+    counts: np.ndarray,
+    lengths: np.ndarray,
+    initial_posterior: np.ndarray,
+    reinit_prior: np.ndarray,
+    make_process_matrix: Callable[[float], Tuple[float, np.ndarray]],
+    log_normalizers: Optional[np.ndarray] = None,
+) -> List[FilterResult]:
+    """
+    Run the forward filter for several regions at once.
+
+    Series are left aligned and padded to a common length T. On each day the regions are grouped
+    by process sigma so that propagating their posteriors is one matrix-matrix product per
+    distinct process matrix instead of one matrix-vector product per region.
+
+    Parameters
+    ----------
+    likelihoods: np.ndarray
+        (F, len(r_list), T) likelihoods per region, as for run_forward_filter.
+    counts: np.ndarray
+        (F, T) smoothed counts per region.
+    lengths: np.ndarray
+        (F,) number of valid days of each region. Values past a region's length are ignored.
+    initial_posterior, reinit_prior, make_process_matrix:
+        As for run_forward_filter, shared by all regions.
+    log_normalizers: np.ndarray or NoneType
+        (F, T) per region log normalizers, as for run_forward_filter.
+
+    Returns
+    -------
+    results: list(FilterResult)
+        One result per region, truncated to the region's length. Identical (up to floating point
+        summation order) to calling run_forward_filter on each region.
+    """
+    n_f, n_r, n_t = likelihoods.shape
+    lengths = np.asarray(lengths)
+    priors = np.empty((n_f, n_r, n_t))
+    posteriors = np.empty((n_f, n_r, n_t))
+    numerator_argmax = np.zeros((n_f, n_t), dtype=int)
+    sigmas = np.full((n_f, n_t), np.nan)
+    scales = np.empty((n_f, n_t))
+    log_likelihoods = np.zeros(n_f)
+
+    priors[:, :, 0] = initial_posterior
+    posteriors[:, :, 0] = initial_posterior
+    scales[:, 0] = counts[:, 0]
+
+    for day in range(1, n_t):
+        active = np.flatnonzero(lengths > day)
+        if not len(active):
+            break
+        scales[active, day] = 0.9 * scales[active, day - 1] + 0.1 * counts[active, day]
+
+        # Group the regions sharing a process matrix (sigmas are quantized, so most do).
+        groups = {}
+        for f in active:
+            sigmas[f, day], process_matrix = make_process_matrix(scales[f, day])
+            groups.setdefault(sigmas[f, day], (process_matrix, []))[1].append(f)
+
+        for process_matrix, members in groups.values():
+            priors[members, :, day] = (process_matrix @ posteriors[members, :, day - 1].T).T
+
+        numerator = likelihoods[active, :, day] * priors[active, :, day]
+        denominator = numerator.sum(axis=1)
+        numerator_argmax[active, day] = numerator.argmax(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            posterior = numerator / denominator[:, None]
+        # Restart the bayesian learning for regions whose data had zero probability.
+        posterior[denominator == 0] = reinit_prior
+        posteriors[active, :, day] = posterior
+
+        with np.errstate(divide="ignore"):
+            log_likelihoods[active] += np.log(denominator)
+        if log_normalizers is not None:
+            log_likelihoods[active] += log_normalizers[active, day]
+
+    return [
+        FilterResult(
+            priors=priors[f, :, : lengths[f]],
+            posteriors=posteriors[f, :, : lengths[f]],
+            numerator_argmax=numerator_argmax[f, : lengths[f]],
+            sigmas=sigmas[f, : lengths[f]],
+            scales=scales[f, : lengths[f]],
+            log_likelihood=log_likelihoods[f],
+        )
+        for f in range(n_f)
+    ]
+
+
+def run_adaptive_forward_filter(
+    likelihoods: np.ndarray,
+    counts: np.ndarray,
+    initial_posterior: np.ndarray,
+    reinit_prior: np.ndarray,
+    r_list: np.ndarray,
+    get_process_sigma: Callable[[float], float],
+    coarsening: int = InferRtConstants.ADAPTIVE_GRID_COARSENING,
+    tolerance: float = InferRtConstants.ADAPTIVE_GRID_TOLERANCE,
+    initial_scale: Optional[float] = None,
+    log_normalizers: Optional[np.ndarray] = None,
+) -> FilterResult:
+    """
+    Coarse-to-fine version of run_forward_filter.
+
+    The filter first runs on every `coarsening`-th bucket of r_list to find, for each day, the
+    range of R holding prior or posterior mass above `tolerance`. It then runs on r_list again,
+    only updating that range (padded by two coarse buckets on each side) of the prior and
+    posterior. Results are returned on the full grid, zero outside of each day's range, so that
+    MAP and highest density intervals are computed exactly as for the fixed grid.
+
+    Falls back to run_forward_filter on the full grid if the narrowed range ever loses all of a
+    day's probability.
+
+    Parameters
+    ----------
+    likelihoods, counts, initial_posterior, reinit_prior, initial_scale, log_normalizers:
+        As for run_forward_filter, on the full grid.
+    r_list: np.ndarray
+        Full, uniformly spaced, R grid.
+    get_process_sigma: callable
+        Maps the current count scale to the process sigma.
+    coarsening: int
+        Ratio of the full grid resolution to the coarse grid resolution.
+    tolerance: float
+        Probability below which coarse buckets are considered empty.
+    """
+
+    def make_full_process_matrix(scale):
+        sigma = get_process_sigma(scale)
+        return sigma, process_matrix.get_process_matrix(r_list, sigma)
+
+    n_r, n_t = likelihoods.shape
+    coarse_idx = np.arange(0, n_r, coarsening)
+    coarse_r_list = r_list[coarse_idx]
+    coarse_step = coarse_r_list[1] - coarse_r_list[0]
+
+    def make_coarse_process_matrix(scale):
+        # Sigmas narrower than the coarse buckets would pin the coarse posterior in place.
+        sigma = max(get_process_sigma(scale), coarse_step)
+        return sigma, process_matrix.get_process_matrix(coarse_r_list, sigma)
+
+    coarse = run_forward_filter(
+        likelihoods=likelihoods[coarse_idx],
+        counts=counts,
+        initial_posterior=initial_posterior[coarse_idx] / initial_posterior[coarse_idx].sum(),
+        reinit_prior=reinit_prior[coarse_idx] / reinit_prior[coarse_idx].sum(),
+        make_process_matrix=make_coarse_process_matrix,
+        initial_scale=initial_scale,
+    )
+
+    # Range of fine buckets [low, high) to update each day.
+    has_mass = np.maximum(coarse.priors, coarse.posteriors) >= tolerance
+    has_mass[:, ~has_mass.any(axis=0)] = True
+    padding = 2 * coarsening
+    low = coarse_idx[has_mass.argmax(axis=0)] - padding
+    high = coarse_idx[len(coarse_idx) - 1 - has_mass[::-1].argmax(axis=0)] + padding + 1
+    low = np.clip(low, 0, n_r)
+    high = np.clip(high, 0, n_r)
+    low[0], high[0] = 0, n_r
+
+    priors = np.zeros((n_r, n_t))
+    posteriors = np.zeros((n_r, n_t))
+    numerator_argmax = np.zeros(n_t, dtype=int)
+    sigmas = np.full(n_t, np.nan)
+    scales = np.empty(n_t)
+
+    priors[:, 0] = initial_posterior
+    posteriors[:, 0] = initial_posterior
+    scale = counts[0] if initial_scale is None else initial_scale
+    scales[0] = scale
+    log_likelihood = 0.0
+
+    for day in range(1, n_t):
+        scale = 0.9 * scale + 0.1 * counts[day]
+        scales[day] = scale
+        sigmas[day], full_matrix = make_full_process_matrix(scale)
+
+        window = slice(low[day], high[day])
+        previous_window = slice(low[day - 1], high[day - 1])
+        prior = full_matrix[window, previous_window] @ posteriors[previous_window, day - 1]
+        priors[window, day] = prior
+
+        numerator = likelihoods[window, day] * prior
+        denominator = numerator.sum()
+        numerator_argmax[day] = low[day] + numerator.argmax()
+
+        if denominator == 0:
+            if likelihoods[:, day].any():
+                # The coarse pass placed the range where the likelihood has no support.
+                return run_forward_filter(
+                    likelihoods,
+                    counts,
+                    initial_posterior,
+                    reinit_prior,
+                    make_full_process_matrix,
+                    initial_scale=initial_scale,
+                    log_normalizers=log_normalizers,
+                )
+            posteriors[:, day] = reinit_prior
+            numerator_argmax[day] = 0
+        else:
+            posteriors[window, day] = numerator / denominator
+
+        log_likelihood += np.log(denominator)
+        if log_normalizers is not None:
+            log_likelihood += log_normalizers[day]
+
+    return FilterResult(
+        priors=priors,
+        posteriors=posteriors,
+        numerator_argmax=numerator_argmax,
+        sigmas=sigmas,
+        scales=scales,
+        log_likelihood=log_likelihood,
+    )
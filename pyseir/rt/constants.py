@@ -29,6 +29,27 @@ class InferRtConstants:
     # shift in R_t day-to-day.
     DEFAULT_PROCESS_SIGMA = 0.03
 
+    # Process sigmas are quantized in steps of this size in log(sigma / DEFAULT_PROCESS_SIGMA)
+    # so that process matrices can be cached and shared. 0.01 is a 1% relative step.
+    PROCESS_SIGMA_QUANTIZATION = 0.01
+
+    # Maximum number of process matrices (2MB each for the default R_BUCKETS) cached per process.
+    PROCESS_MATRIX_CACHE_SIZE = 64
+
+    # How the posterior is propagated to the next day's prior. "dense" multiplies by the full
+    # process matrix (O(n^2) per day). "banded" only keeps the diagonals where the gaussian kernel
+    # exceeds BANDED_PRIOR_TOLERANCE relative to its peak (O(n * k) per day).
+    PRIOR_PROPAGATION = "dense"
+    BANDED_PRIOR_TOLERANCE = 1e-12
+
+    # Number of fips filtered together by infer_rt.run_rt_for_fips_batch. Bounds the size of the
+    # (fips, R, time) arrays, about 2MB per fips for a year of data.
+    BATCH_SIZE = 64
+
+    # Incremental runs checkpoint the filter this many days before the end of each series, since
+    # the centered count smoothing still changes the most recent days when new data is appended.
+    INCREMENTAL_CHECKPOINT_LAG = COUNT_SMOOTHING_WINDOW_SIZE // 2 + 2
+
     # Scale sigma up as sqrt(SCALE_SIGMA_FROM_COUNT/current_count)
     # 5000 recommended
     SCALE_SIGMA_FROM_COUNT = 5000.0
@@ -65,6 +86,13 @@ class InferRtConstants:
     # The quantization of the R Buckets
     R_BUCKETS = np.linspace(0, 10, 501)
 
+    # "fixed" runs the filter over all of R_BUCKETS every day. "adaptive" first runs it on every
+    # ADAPTIVE_GRID_COARSENING-th bucket, then only updates the R_BUCKETS range where the coarse
+    # prior or posterior exceeds ADAPTIVE_GRID_TOLERANCE. Results stay on R_BUCKETS.
+    R_GRID_MODE = "fixed"
+    ADAPTIVE_GRID_COARSENING = 5
+    ADAPTIVE_GRID_TOLERANCE = 1e-10
+
     # Reference date to compute from.
     REF_DATE = datetime(year=2020, month=1, day=1)
 
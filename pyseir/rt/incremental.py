@@ -0,0 +1,137 @@
+"""
+Checkpoints of the R_t forward filter, used to only filter newly appended days on later runs.
+
+The posterior on a given day only depends on the smoothed counts up to that day, so a run can
+resume from a stored posterior as long as the smoothed counts up to the checkpoint are unchanged.
+Smoothing is centered, so appending days still changes the last half window of smoothed values.
+Checkpoints are therefore taken INCREMENTAL_CHECKPOINT_LAG days before the end of the series.
+If the data before the checkpoint was revised, or the inference constants changed, the filter
+falls back to processing the full series.
+"""
+from dataclasses import dataclass
+import hashlib
+import io
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from pyseir.rt.constants import InferRtConstants
+from pyseir.rt.bayes_filter import FilterResult
+
+
+def config_fingerprint() -> str:
+    """Hash of the InferRtConstants that change the filter's output."""
+    c = InferRtConstants
+    values = (
+        c.R_BUCKETS.tobytes(),
+        c.DEFAULT_PROCESS_SIGMA,
+        c.SCALE_SIGMA_FROM_COUNT,
+        c.MAX_SCALING_OF_SIGMA,
+        c.SERIAL_PERIOD,
+        c.PROCESS_SIGMA_QUANTIZATION,
+        c.PRIOR_PROPAGATION,
+        c.BANDED_PRIOR_TOLERANCE,
+        c.R_GRID_MODE,
+        c.ADAPTIVE_GRID_COARSENING,
+        c.ADAPTIVE_GRID_TOLERANCE,
+        c.CONFIDENCE_INTERVALS,
+    )
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+@dataclass
+class FilterCheckpoint:
+    """State of the forward filter for one timeseries at its checkpoint day."""
+
+    # Dates and smoothed counts up to and including the checkpoint day.
+    dates: np.ndarray
+    counts: np.ndarray
+    # Posterior and count scale on the checkpoint day.
+    posterior: np.ndarray
+    scale: float
+    # Per day output columns of RtInferenceEngine.summarize_posteriors up to the checkpoint day.
+    summary: pd.DataFrame
+    fingerprint: str
+
+    def resume_index(self, dates, counts) -> Optional[int]:
+        """
+        Index of the checkpoint day in the new series if the filter can resume from it, None if
+        the full series needs to be filtered.
+        """
+        n = len(self.dates)
+        if self.fingerprint != config_fingerprint() or len(dates) <= n:
+            return None
+        if not np.array_equal(np.asarray(dates[:n], dtype="datetime64[ns]"), self.dates):
+            return None
+        if not np.allclose(np.asarray(counts[:n], dtype=float), self.counts, rtol=1e-10, atol=0):
+            return None
+        return n - 1
+
+
+def make_checkpoint(
+    dates, counts, result: FilterResult, start: int, summary: pd.DataFrame
+) -> Optional[FilterCheckpoint]:
+    """
+    Checkpoint a filter run over counts[start:], given the summary of the full series.
+
+    Returns None if the series is too short, or the checkpoint day was not part of this run.
+    """
+    checkpoint_idx = len(counts) - 1 - InferRtConstants.INCREMENTAL_CHECKPOINT_LAG
+    if checkpoint_idx < start:
+        return None
+    return FilterCheckpoint(
+        dates=np.asarray(dates[: checkpoint_idx + 1], dtype="datetime64[ns]"),
+        counts=np.asarray(counts[: checkpoint_idx + 1], dtype=float),
+        posterior=result.posteriors[:, checkpoint_idx - start].copy(),
+        scale=float(result.scales[checkpoint_idx - start]),
+        summary=summary.iloc[: checkpoint_idx + 1],
+        fingerprint=config_fingerprint(),
+    )
+
+
+def save_checkpoints(path: str, checkpoints: Dict[str, FilterCheckpoint]):
+    """Write the checkpoints of each timeseries type (keyed by TimeseriesType value)."""
+    arrays = {}
+    for key, checkpoint in checkpoints.items():
+        arrays[f"{key}__dates"] = checkpoint.dates.astype("int64")
+        arrays[f"{key}__counts"] = checkpoint.counts
+        arrays[f"{key}__posterior"] = checkpoint.posterior
+        arrays[f"{key}__scale"] = np.array(checkpoint.scale)
+        arrays[f"{key}__fingerprint"] = np.array(checkpoint.fingerprint)
+        arrays[f"{key}__summary_columns"] = np.array(list(checkpoint.summary.columns), dtype=str)
+        arrays[f"{key}__summary_values"] = checkpoint.summary.values.astype(float)
+
+    # Write to a temporary file first so an interrupted run never leaves a partial checkpoint.
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoints(path: str) -> Dict[str, FilterCheckpoint]:
+    """Read checkpoints written by save_checkpoints. Missing files give no checkpoints."""
+    if not os.path.exists(path):
+        return {}
+
+    checkpoints = {}
+    with np.load(path) as data:
+        keys = {name.split("__")[0] for name in data.files}
+        for key in keys:
+            dates = data[f"{key}__dates"].astype("datetime64[ns]")
+            checkpoints[key] = FilterCheckpoint(
+                dates=dates,
+                counts=data[f"{key}__counts"],
+                posterior=data[f"{key}__posterior"],
+                scale=float(data[f"{key}__scale"]),
+                summary=pd.DataFrame(
+                    data[f"{key}__summary_values"],
+                    columns=list(data[f"{key}__summary_columns"]),
+                    index=pd.DatetimeIndex(dates, name="date"),
+                ),
+                fingerprint=str(data[f"{key}__fingerprint"]),
+            )
+    return checkpoints
@@ -2,17 +2,29 @@ import math
 from datetime import timedelta
 import logging
 import structlog
-from typing import Optional
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
-from scipy import stats as sps
-from matplotlib import pyplot as plt
 
+from libs.lazy_import import lazy_import
 from pyseir import load_data
 from pyseir.utils import TimeseriesType, get_run_artifact_path, RunArtifact
 from pyseir.rt.constants import InferRtConstants
-from pyseir.rt import plotting, utils
+from pyseir.rt.reports import ReportMode
+from pyseir.rt import (
+    bayes_filter,
+    incremental,
+    likelihoods,
+    process_matrix,
+    reports,
+    results_table,
+    utils,
+)
+
+plotting = lazy_import("pyseir.rt.plotting")
+plt = lazy_import("matplotlib.pyplot")
+sps = lazy_import("scipy.stats")
 
 rt_log = structlog.get_logger(__name__)
 
@@ -22,18 +34,31 @@ def run_rt_for_fips(
     include_deaths: bool = False,
     include_testing_correction: bool = False,
     figure_collector: Optional[list] = None,
+    use_checkpoints: bool = False,
+    report_mode: ReportMode = ReportMode.RENDER,
 ):
-    """Entry Point for Infer Rt"""
+    """
+    Entry Point for Infer Rt
+
+    use_checkpoints: bool
+        If True, resume the forward filter from the checkpoints of the previous run when only new
+        days were appended to the data (see pyseir.rt.incremental).
+    report_mode: ReportMode
+        Render the smoothing and inference reports now, record their inputs to render them later
+        with pyseir.rt.reports.render_deferred_reports, or skip them.
+    """
 
     # TODO: This fails silently if you pass it a numeric fips instead of a string
     # assert type(fips) == str
 
+    _discard_report_data(fips)
     # Generate the Data Packet to Pass to RtInferenceEngine
     input_df = _generate_input_data(
         fips=fips,
         include_testing_correction=include_testing_correction,
         include_deaths=include_deaths,
         figure_collector=figure_collector,
+        report_mode=report_mode,
     )
     if input_df.dropna().empty:
         rt_log.warning(event="Infer Rt Skipped. No Data Passed Filter Requirements:", fips=fips)
@@ -46,16 +71,187 @@ def run_rt_for_fips(
         display_name=_get_display_name(fips),
         fips=fips,
         include_deaths=include_deaths,
+        checkpoints=_load_checkpoints(fips) if use_checkpoints else None,
+        report_mode=report_mode,
     )
 
     # Generate the output DataFrame (consider renaming the function infer_all to be clearer)
     output_df = engine.infer_all()
 
-    # Save the output to json for downstream repacking and incorporation.
+    _save_rt_result(fips, output_df)
+    if use_checkpoints:
+        _save_checkpoints(fips, engine.checkpoints)
+    return output_df
+
+
+def run_rt_for_fips_batch(
+    fips_list: List[str],
+    include_deaths: bool = False,
+    include_testing_correction: bool = False,
+    batch_size: int = InferRtConstants.BATCH_SIZE,
+    use_checkpoints: bool = False,
+    report_mode: ReportMode = ReportMode.RENDER,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Batched equivalent of run_rt_for_fips for many fips (e.g. all counties of a state).
+
+    The Bayesian filter runs for up to batch_size fips at a time as one (fips, R, time) array
+    computation. Input filtering, sigma scaling and the cases/deaths lag alignment are still done
+    per fips, so results are the same as calling run_rt_for_fips for each fips.
+
+    With use_checkpoints each fips resumes from its own checkpoint instead, see run_rt_for_fips.
+
+    Once all fips are done, their results are also written to one table per state, see
+    pyseir.rt.results_table.
+
+    Returns
+    -------
+    results: dict
+        Map of fips to output DataFrame, for fips where inference was possible.
+    """
+    results = {}
+    for batch_start in range(0, len(fips_list), batch_size):
+        engines = []
+        for fips in fips_list[batch_start : batch_start + batch_size]:
+            _discard_report_data(fips)
+            input_df = _generate_input_data(
+                fips=fips,
+                include_testing_correction=include_testing_correction,
+                include_deaths=include_deaths,
+                figure_collector=None,
+                report_mode=report_mode,
+            )
+            if input_df.dropna().empty:
+                rt_log.warning(
+                    event="Infer Rt Skipped. No Data Passed Filter Requirements:", fips=fips
+                )
+                continue
+            engines.append(
+                RtInferenceEngine(
+                    data=input_df,
+                    display_name=_get_display_name(fips),
+                    fips=fips,
+                    include_deaths=include_deaths,
+                    checkpoints=_load_checkpoints(fips) if use_checkpoints else None,
+                    report_mode=report_mode,
+                )
+            )
+
+        precomputed = {engine.fips: {} for engine in engines}
+        # Incremental runs resume each fips from its own checkpoint, so are not batched.
+        timeseries_types = (
+            [] if use_checkpoints else [TimeseriesType.NEW_CASES, TimeseriesType.NEW_DEATHS]
+        )
+        for timeseries_type in timeseries_types:
+            batched = infer_posteriors_batched(engines, timeseries_type)
+            for fips, posteriors in batched.items():
+                precomputed[fips][timeseries_type] = posteriors
+
+        for engine in engines:
+            output_df = engine.infer_all(precomputed_posteriors=precomputed[engine.fips])
+            _save_rt_result(engine.fips, output_df)
+            if use_checkpoints:
+                _save_checkpoints(engine.fips, engine.checkpoints)
+            if output_df is not None:
+                results[engine.fips] = output_df
+
+    _save_rt_tables(results)
+    return results
+
+
+def infer_posteriors_batched(
+    engines: List["RtInferenceEngine"], timeseries_type
+) -> Dict[str, tuple]:
+    """
+    Compute RtInferenceEngine.get_posteriors for several engines with a single batched forward
+    filter. Engines without data for timeseries_type are skipped.
+
+    Returns
+    -------
+    posteriors: dict
+        Map of engine fips to the (dates, posteriors, start_idx) returned by get_posteriors.
+    """
+    if engines and engines[0].r_grid_mode == "adaptive":
+        # Each region narrows the grid differently, so there is nothing to batch.
+        return {
+            engine.fips: engine.get_posteriors(timeseries_type)
+            for engine in engines
+            if engine.get_timeseries(timeseries_type)[1] is not None
+        }
+
+    series = []
+    for engine in engines:
+        dates, timeseries = engine.get_timeseries(timeseries_type)
+        if timeseries is not None and len(timeseries):
+            series.append((engine, dates, timeseries))
+    if not series:
+        return {}
+
+    lengths = np.array([len(timeseries) for _, _, timeseries in series])
+    n_r, n_t = len(engines[0].r_list), lengths.max()
+    all_likelihoods = np.zeros((len(series), n_r, n_t))
+    all_log_normalizers = np.zeros((len(series), n_t))
+    all_counts = np.zeros((len(series), n_t))
+    daily_likelihoods = []
+    for i, (engine, _, timeseries) in enumerate(series):
+        likelihoods_i, log_normalizers_i = engine.get_likelihoods(timeseries)
+        daily_likelihoods.append(likelihoods_i)
+        all_likelihoods[i, :, : lengths[i]] = likelihoods_i
+        all_log_normalizers[i, : lengths[i]] = log_normalizers_i
+        all_counts[i, : lengths[i]] = timeseries.values
+
+    # The filter configuration only depends on InferRtConstants, so is shared by all engines.
+    prior0, reinit_prior = engines[0].get_initial_priors()
+    results = bayes_filter.run_batched_forward_filter(
+        likelihoods=all_likelihoods,
+        counts=all_counts,
+        lengths=lengths,
+        initial_posterior=prior0,
+        reinit_prior=reinit_prior,
+        make_process_matrix=engines[0].make_process_matrix,
+        log_normalizers=all_log_normalizers,
+    )
+
+    return {
+        engine.fips: engine.finalize_posteriors(dates, timeseries, result, daily_likelihoods[i])
+        for i, ((engine, dates, timeseries), result) in enumerate(zip(series, results))
+    }
+
+
+def _save_rt_result(fips: str, output_df: Optional[pd.DataFrame]):
+    """Save the output to json for downstream repacking and incorporation."""
     if output_df is not None and not output_df.empty:
         output_path = get_run_artifact_path(fips, RunArtifact.RT_INFERENCE_RESULT)
         output_df.to_json(output_path)
-    return output_df
+
+
+def _save_rt_tables(results: Dict[str, pd.DataFrame]):
+    """Save the results of each state's fips to the state's consolidated Rt table."""
+    results_by_state = {}
+    for fips, output_df in results.items():
+        results_by_state.setdefault(fips[:2], {})[fips] = output_df
+    for state_fips, state_results in results_by_state.items():
+        results_table.write_rt_table(results_table.get_rt_table_path(state_fips), state_results)
+
+
+def _load_checkpoints(fips: str) -> Dict[str, incremental.FilterCheckpoint]:
+    path = get_run_artifact_path(fips, RunArtifact.RT_FILTER_CHECKPOINT)
+    try:
+        return incremental.load_checkpoints(path)
+    except (OSError, ValueError, KeyError):
+        rt_log.warning(event="Ignoring unreadable Rt filter checkpoint:", fips=fips, path=path)
+        return {}
+
+
+def _save_checkpoints(fips: str, checkpoints: Dict[str, incremental.FilterCheckpoint]):
+    if checkpoints:
+        path = get_run_artifact_path(fips, RunArtifact.RT_FILTER_CHECKPOINT)
+        incremental.save_checkpoints(path, checkpoints)
+
+
+def _discard_report_data(fips: str):
+    """Discard the deferred report data of the previous run, see pyseir.rt.reports."""
+    reports.discard(get_run_artifact_path(fips, RunArtifact.RT_REPORT_DATA))
 
 
 def _get_display_name(fips: str) -> str:
@@ -68,6 +264,7 @@ def _generate_input_data(
     include_testing_correction: bool,
     include_deaths: bool,
     figure_collector: Optional[list],
+    report_mode: ReportMode = ReportMode.RENDER,
 ):
     """
     Allow the RtInferenceEngine to be agnostic to aggregation level by handling the loading first
@@ -88,6 +285,7 @@ def _generate_input_data(
         figure_collector=figure_collector,
         display_name=fips,
         log=rt_log.new(fips=fips),
+        report_mode=report_mode,
     )
     return df
 
@@ -98,6 +296,7 @@ def filter_and_smooth_input_data(
     include_deaths: bool,
     figure_collector: Optional[list],
     log: logging.Logger,
+    report_mode: ReportMode = ReportMode.RENDER,
 ) -> pd.DataFrame:
     """Do Filtering Here Before it Gets to the Inference Engine"""
     MIN_CUMULATIVE_COUNTS = dict(cases=20, deaths=10)
@@ -136,28 +335,9 @@ def filter_and_smooth_input_data(
 
         if all(requirements):
             if column == "cases":
-                fig = plt.figure(figsize=(10, 6))
-                ax = fig.add_subplot(111)  # plt.axes
-                ax.set_yscale("log")
-                chart_min = max(0.1, smoothed.min())
-                ax.set_ylim((chart_min, df[column].max()))
-                plt.scatter(
-                    dates[-len(df[column]) :],
-                    df[column],
-                    alpha=0.3,
-                    label=f"Smoothing of: {column}",
+                _report_smoothing(
+                    dates, df[column], smoothed, column, display_name, figure_collector, report_mode
                 )
-                plt.plot(dates[-len(df[column]) :], smoothed)
-                plt.grid(True, which="both")
-                plt.xticks(rotation=30)
-                plt.xlim(min(dates[-len(df[column]) :]), max(dates) + timedelta(days=2))
-
-                if not figure_collector:
-                    plot_path = get_run_artifact_path(display_name, RunArtifact.RT_SMOOTHING_REPORT)
-                    plt.savefig(plot_path, bbox_inches="tight")
-                    plt.close(fig)
-                else:
-                    figure_collector["1_smoothed_cases"] = fig
 
             df[column] = smoothed
         else:
@@ -167,6 +347,35 @@ def filter_and_smooth_input_data(
     return df
 
 
+def _report_smoothing(
+    dates,
+    original: pd.Series,
+    smoothed: pd.Series,
+    column: str,
+    display_name: str,
+    figure_collector: Optional[list],
+    report_mode: ReportMode,
+):
+    """Plot (or record for deferred rendering) the smoothing of the input counts."""
+    if not figure_collector and report_mode is ReportMode.SKIP:
+        return
+    if not figure_collector and report_mode is ReportMode.DEFER:
+        reports.record(
+            get_run_artifact_path(display_name, RunArtifact.RT_REPORT_DATA),
+            reports.SMOOTHING,
+            reports.smoothing_payload(dates, original, smoothed, column),
+        )
+        return
+
+    fig = plotting.plot_smoothed_counts(dates, original, smoothed, column)
+    if not figure_collector:
+        plot_path = get_run_artifact_path(display_name, RunArtifact.RT_SMOOTHING_REPORT)
+        fig.savefig(plot_path, bbox_inches="tight")
+        plt.close(fig)
+    else:
+        figure_collector["1_smoothed_cases"] = fig
+
+
 class RtInferenceEngine:
     """
     This class extends the analysis of Bettencourt et al to include mortality data in a
@@ -183,9 +392,24 @@ class RtInferenceEngine:
         and save location somewhere downstream.
     fips: str
         Just used for output paths. Should remove with display_name later.
+    checkpoints: dict or NoneType
+        Filter checkpoints by TimeseriesType value, see pyseir.rt.incremental. If given (even
+        empty), posteriors are computed incrementally and the checkpoints are updated in place.
+    report_mode: ReportMode
+        Whether to render the inference report, record its inputs for deferred rendering (see
+        pyseir.rt.reports) or skip it. Ignored when a figure_collector is given.
     """
 
-    def __init__(self, data, display_name, fips, include_deaths=False, figure_collector=None):
+    def __init__(
+        self,
+        data,
+        display_name,
+        fips,
+        include_deaths=False,
+        figure_collector=None,
+        checkpoints=None,
+        report_mode=ReportMode.RENDER,
+    ):
 
         self.dates = data.index
         self.cases = data.cases if "cases" in data else None
@@ -195,12 +419,17 @@ class RtInferenceEngine:
         self.display_name = display_name
         self.fips = fips
         self.figure_collector = figure_collector
+        self.checkpoints = checkpoints
+        self.report_mode = report_mode
 
         # Load the InferRtConstants (TODO: turn into class constants)
         self.r_list = InferRtConstants.R_BUCKETS
+        self.r_grid_mode = InferRtConstants.R_GRID_MODE
         self.window_size = InferRtConstants.COUNT_SMOOTHING_WINDOW_SIZE
         self.kernel_std = InferRtConstants.COUNT_SMOOTHING_KERNEL_STD
         self.default_process_sigma = InferRtConstants.DEFAULT_PROCESS_SIGMA
+        self.prior_propagation = InferRtConstants.PRIOR_PROPAGATION
+        self.banded_prior_tolerance = InferRtConstants.BANDED_PRIOR_TOLERANCE
         self.ref_date = InferRtConstants.REF_DATE
         self.confidence_intervals = InferRtConstants.CONFIDENCE_INTERVALS
         self.min_cases = InferRtConstants.MIN_COUNTS_TO_INFER
@@ -280,55 +509,37 @@ class RtInferenceEngine:
         ci_high = self.r_list[high_idx_list]
         return ci_low, ci_high
 
+    def get_process_sigma(self, timeseries_scale=InferRtConstants.SCALE_SIGMA_FROM_COUNT):
+        """
+        Process sigma for the given count scale: scales sigma up from its default value as
+        1/sqrt(count) for low counts, up to a maximum factor of MAX_SCALING_OF_SIGMA.
+        """
+        return process_matrix.process_sigma(
+            timeseries_scale,
+            default_sigma=self.default_process_sigma,
+            scale_sigma_from_count=self.scale_sigma_from_count,
+            max_scaling=self.max_scaling_sigma,
+        )
+
     def make_process_matrix(self, timeseries_scale=InferRtConstants.SCALE_SIGMA_FROM_COUNT):
         """ Externalizes process of generating the Gaussian process matrix adding the following:
         1) Auto adjusts sigma from its default value for low counts - scales sigma up as
            1/sqrt(count) up to a maximum factor of MAX_SCALING_OF_SIGMA
         2) Ensures the smoothing (of the posterior when creating the prior) is symmetric
            in R so that this process does not move argmax (the peak in probability)
+        Matrices are cached per quantized sigma, see pyseir.rt.process_matrix. With
+        prior_propagation == "banded" a BandedProcessMatrix is returned instead of a dense array.
         """
-        # TODO FOR ALEX: Please expand this and describe more clearly the meaning of these variables
-        a = self.max_scaling_sigma
-        if timeseries_scale == 0:
-            b = 1.0
-        else:
-            b = max(1.0, math.sqrt(self.scale_sigma_from_count / timeseries_scale))
-
-        use_sigma = min(a, b) * self.default_process_sigma
-
-        process_matrix = sps.norm(loc=self.r_list, scale=use_sigma).pdf(self.r_list[:, None])
-
-        # process_matrix applies gaussian smoothing to the previous posterior to make the prior.
-        # But when the gaussian is wide much of its distribution function can be outside of the
-        # range Reff = (0,10). When this happens the smoothing is not symmetric in R space. For
-        # R<1, when posteriors[previous_day]).argmax() < 50, this asymmetry can push the argmax of
-        # the prior >10 Reff bins (delta R = .2) on each new day. This was a large systematic error.
-
-        # Ensure smoothing window is symmetric in X direction around diagonal
-        # to avoid systematic drift towards middle (Reff = 5). This is done by
-        # ensuring the following matrix values are 0:
-        # 1 0 0 0 0 0 ... 0 0 0 0 0 0
-        # * * * 0 0 0 ... 0 0 0 0 0 0
-        # ...
-        # * * * * * * ... * * * * 0 0
-        # * * * * * * ... * * * * * *
-        # 0 0 * * * * ... * * * * * *
-        # ...
-        # 0 0 0 0 0 0 ... 0 0 0 * * *
-        # 0 0 0 0 0 0 ... 0 0 0 0 0 1
-        sz = len(self.r_list)
-        for row in range(0, sz):
-            if row < (sz - 1) / 2:
-                process_matrix[row, 2 * row + 1 : sz] = 0.0
-            elif row > (sz - 1) / 2:
-                process_matrix[row, 0 : sz - 2 * (sz - row)] = 0.0
-
-        # (3a) Normalize all rows to sum to 1
-        row_sums = process_matrix.sum(axis=1)
-        for row in range(0, sz):
-            process_matrix[row] = process_matrix[row] / row_sums[row]
-
-        return use_sigma, process_matrix
+        use_sigma = self.get_process_sigma(timeseries_scale)
+
+        if self.prior_propagation == "banded":
+            return (
+                use_sigma,
+                process_matrix.get_banded_process_matrix(
+                    self.r_list, use_sigma, self.banded_prior_tolerance
+                ),
+            )
+        return use_sigma, process_matrix.get_process_matrix(self.r_list, use_sigma)
 
     def get_posteriors(self, timeseries_type, plot=False):
         """
@@ -361,129 +572,205 @@ class RtInferenceEngine:
             rt_log.info(
                 "%s: empty timeseries %s, skipping" % (self.display_name, timeseries_type.value)
             )
-            return None, None, None, None
+            return None, None, None
         else:
             rt_log.info(
                 "%s: Analyzing posteriors for timeseries %s"
                 % (self.display_name, timeseries_type.value)
             )
 
-        # (1) Calculate Lambda (the Poisson likelihood given the data) based on
-        # the observed increase from t-1 cases to t cases.
-        lam = timeseries[:-1].values * np.exp((self.r_list[:, None] - 1) / self.serial_period)
-
-        # (2) Calculate each day's likelihood over R_t
-        # Originally smoothed counts were rounded (as needed for sps.poisson.pmf below) which
-        # doesn't work well for low counts and introduces artifacts at rounding transitions. Now
-        # calculate for both ceiling and floor values and interpolate between to get smooth
-        # behaviour
-        ts_floor = timeseries.apply(np.floor).astype(int)
-        ts_ceil = timeseries.apply(np.ceil).astype(int)
-        ts_frac = timeseries - ts_floor
-
-        likelihoods_floor = pd.DataFrame(
-            data=sps.poisson.pmf(ts_floor[1:].values, lam),
-            index=self.r_list,
-            columns=timeseries.index[1:],
+        daily_likelihoods, log_normalizers = self.get_likelihoods(timeseries)
+        prior0, reinit_prior = self.get_initial_priors()
+
+        # (3) Iteratively apply Bayes' rule, using the (now scaled up for low counts) Gaussian
+        # process matrix for each day.
+        result = self.run_filter(
+            daily_likelihoods, timeseries.values, prior0, reinit_prior, log_normalizers
         )
-        likelihoods_ceil = pd.DataFrame(
-            data=sps.poisson.pmf(ts_ceil[1:].values, lam),
-            index=self.r_list,
-            columns=timeseries.index[1:],
+        return self.finalize_posteriors(dates, timeseries, result, daily_likelihoods, plot=plot)
+
+    def run_filter(
+        self,
+        daily_likelihoods,
+        counts,
+        initial_posterior,
+        reinit_prior,
+        log_normalizers,
+        initial_scale=None,
+    ):
+        """
+        Run the forward filter configured by r_grid_mode and prior_propagation.
+
+        Returns
+        -------
+        result: bayes_filter.FilterResult
+        """
+        if self.r_grid_mode == "adaptive":
+            return bayes_filter.run_adaptive_forward_filter(
+                likelihoods=daily_likelihoods,
+                counts=counts,
+                initial_posterior=initial_posterior,
+                reinit_prior=reinit_prior,
+                r_list=self.r_list,
+                get_process_sigma=self.get_process_sigma,
+                initial_scale=initial_scale,
+                log_normalizers=log_normalizers,
+            )
+        return bayes_filter.run_forward_filter(
+            likelihoods=daily_likelihoods,
+            counts=counts,
+            initial_posterior=initial_posterior,
+            reinit_prior=reinit_prior,
+            make_process_matrix=self.make_process_matrix,
+            initial_scale=initial_scale,
+            log_normalizers=log_normalizers,
         )
-        # Interpolate between value for ceiling and floor of smoothed counts
-        likelihoods = ts_frac * likelihoods_ceil + (1 - ts_frac) * likelihoods_floor
 
-        # (3) Create the (now scaled up for low counts) Gaussian Matrix
-        (current_sigma, process_matrix) = self.make_process_matrix(timeseries.median())
+    def get_likelihoods(self, timeseries):
+        """
+        (1) Calculate each day's likelihood over R_t from the Poisson likelihood of the observed
+        increase from t-1 cases to t cases. Smoothed counts are interpolated between their floor
+        and ceiling values to avoid artifacts at rounding transitions. Computed in log space and
+        normalized per day so that large counts don't underflow.
 
-        # (3a) Normalize all rows to sum to 1
-        process_matrix /= process_matrix.sum(axis=0)
+        Returns
+        -------
+        daily_likelihoods: np.array
+            (len(r_list), len(timeseries)) normalized likelihoods.
+        log_normalizers: np.array
+            Log of each day's normalization factor.
+        """
+        log_likelihoods = likelihoods.poisson_log_likelihoods(
+            timeseries.values, r_list=self.r_list, serial_period=self.serial_period
+        )
+        return likelihoods.normalize_log_likelihoods(log_likelihoods)
 
-        # (4) Calculate the initial prior. Gamma mean of "a" with mode of "a-1".
+    def get_initial_priors(self):
+        """
+        (2) Calculate the initial prior. Gamma mean of "a" with mode of "a-1". Also returns the
+        prior used to re-initialize the filter after a day with zero probability.
+        """
         prior0 = sps.gamma(a=2.5).pdf(self.r_list)
         prior0 /= prior0.sum()
 
         reinit_prior = sps.gamma(a=2).pdf(self.r_list)
         reinit_prior /= reinit_prior.sum()
+        return prior0, reinit_prior
+
+    def finalize_posteriors(self, dates, timeseries, result, daily_likelihoods, plot=False):
+        """
+        Turn a forward filter result into the outputs of get_posteriors.
+        """
+        self.log_likelihood = result.log_likelihood
+
+        # (4) Monitor if posterior is lagging excessively behind signal in likelihood
+        # TODO future can return cumulative lag and use to scale sigma up only when needed
+        self._monitor_lag(result, daily_likelihoods)
 
-        # Create a DataFrame that will hold our posteriors for each day
-        # Insert our prior as the first posterior.
         posteriors = pd.DataFrame(
-            index=self.r_list, columns=timeseries.index, data={timeseries.index[0]: prior0}
+            data=result.posteriors, index=self.r_list, columns=timeseries.index
         )
 
-        # We said we'd keep track of the sum of the log of the probability
-        # of the data for maximum likelihood calculation.
-        log_likelihood = 0.0
+        if plot:
+            plotting.plot_posteriors(x=posteriors)  # Returns Figure.
+            # The interpreter will handle this as it sees fit. Normal builds never call plot flag.
 
-        # Initialize timeseries scale (used for auto sigma)
-        scale = timeseries.head(1).item()
+        start_idx = -len(posteriors.columns)
 
-        # Setup monitoring for Reff lagging signal in daily likelihood
-        monitor = utils.LagMonitor(debug=False)  # Set debug=True for detailed printout of daily lag
+        return dates[start_idx:], posteriors, start_idx
 
-        # (5) Iteratively apply Bayes' rule
-        loop_idx = 0
-        for previous_day, current_day in zip(timeseries.index[:-1], timeseries.index[1:]):
+    @staticmethod
+    def _monitor_lag(result, daily_likelihoods):
+        """Replay the filter's daily argmaxes through a LagMonitor."""
+        monitor = utils.LagMonitor(debug=False)  # Set debug=True for detailed printout of daily lag
+        prior_am = result.priors.argmax(axis=0)
+        like_am = daily_likelihoods.argmax(axis=0)
+        post_am = result.posteriors.argmax(axis=0)
+        for day in range(1, result.posteriors.shape[1]):
+            monitor.evaluate_lag_using_argmaxes(
+                current_day=day - 1,
+                current_sigma=result.sigmas[day],
+                prev_post_am=post_am[day - 1],
+                prior_am=prior_am[day],
+                like_am=like_am[day],
+                post_am=result.numerator_argmax[day],
+            )
 
-            # Keep track of exponential moving average of scale of counts of timeseries
-            scale = 0.9 * scale + 0.1 * timeseries[current_day]
+    def summarize_posteriors(self, timeseries_type, dates, posteriors):
+        """
+        MAP estimate and confidence intervals of each day's posterior.
 
-            # Calculate process matrix for each day
-            (current_sigma, process_matrix) = self.make_process_matrix(scale)
+        Returns
+        -------
+        summary: pd.DataFrame
+            Indexed by date, with Rt_MAP__* and Rt_ci*__* columns for the timeseries type.
+        """
+        df = pd.DataFrame()
+        df[f"Rt_MAP__{timeseries_type.value}"] = posteriors.idxmax()
+        for ci in self.confidence_intervals:
+            ci_low, ci_high = self.highest_density_interval(posteriors, ci=ci)
 
-            # (5a) Calculate the new prior
-            current_prior = process_matrix @ posteriors[previous_day]
+            low_val = 1 - ci
+            high_val = ci
+            df[f"Rt_ci{int(math.floor(100 * low_val))}__{timeseries_type.value}"] = ci_low
+            df[f"Rt_ci{int(math.floor(100 * high_val))}__{timeseries_type.value}"] = ci_high
 
-            # (5b) Calculate the numerator of Bayes' Rule: P(k|R_t)P(R_t)
-            numerator = likelihoods[current_day] * current_prior
+        df["date"] = dates
+        return df.set_index("date")
 
-            # (5c) Calculate the denominator of Bayes' Rule P(k)
-            denominator = np.sum(numerator)
+    def get_incremental_summary(self, timeseries_type):
+        """
+        Summarize the posteriors of a timeseries, resuming the forward filter from the stored
+        checkpoint when only new days were appended to the data, and update the checkpoint.
 
-            # Execute full Bayes' Rule
-            if denominator == 0:
-                # Restart the baysian learning for the remaining series.
-                # This is necessary since otherwise NaN values
-                # will be inferred for all future days, after seeing
-                # a single (smoothed) zero value.
-                #
-                # We understand that restarting the posteriors with the
-                # re-initial prior may incur a start-up artifact as the posterior
-                # restabilizes, but we believe it's the current best
-                # solution for municipalities that have smoothed cases and
-                # deaths that dip down to zero, but then start to increase
-                # again.
+        Only the days filtered in this call are included in log_likelihood.
 
-                posteriors[current_day] = reinit_prior
-            else:
-                posteriors[current_day] = numerator / denominator
+        Returns
+        -------
+        summary: pd.DataFrame or NoneType
+            As returned by summarize_posteriors, None if the timeseries is empty.
+        """
+        dates, timeseries = self.get_timeseries(timeseries_type)
+        if timeseries is None or len(timeseries) == 0:
+            return None
 
-            # Monitors if posterior is lagging excessively behind signal in likelihood
-            # TODO future can return cumulative lag and use to scale sigma up only when needed
-            monitor.evaluate_lag_using_argmaxes(
-                current_day=loop_idx,
-                current_sigma=current_sigma,
-                prev_post_am=posteriors[previous_day].argmax(),
-                prior_am=current_prior.argmax(),
-                like_am=likelihoods[current_day].argmax(),
-                post_am=numerator.argmax(),
+        prior0, reinit_prior = self.get_initial_priors()
+        checkpoint = self.checkpoints.get(timeseries_type.value)
+        start = checkpoint.resume_index(dates, timeseries.values) if checkpoint else None
+        if start is None:
+            start, initial_posterior, initial_scale = 0, prior0, None
+        else:
+            initial_posterior, initial_scale = checkpoint.posterior, checkpoint.scale
+            self.log.info(
+                event="Resuming Rt filter from checkpoint:",
+                timeseries=timeseries_type.value,
+                new_days=len(timeseries) - 1 - start,
             )
 
-            # Add to the running sum of log likelihoods
-            log_likelihood += np.log(denominator)
-            loop_idx += 1
-
-        self.log_likelihood = log_likelihood
-
-        if plot:
-            plotting.plot_posteriors(x=posteriors)  # Returns Figure.
-            # The interpreter will handle this as it sees fit. Normal builds never call plot flag.
-
-        start_idx = -len(posteriors.columns)
+        new_timeseries = timeseries.iloc[start:]
+        daily_likelihoods, log_normalizers = self.get_likelihoods(new_timeseries)
+        result = self.run_filter(
+            daily_likelihoods,
+            new_timeseries.values,
+            initial_posterior,
+            reinit_prior,
+            log_normalizers,
+            initial_scale=initial_scale,
+        )
+        new_dates, posteriors, _ = self.finalize_posteriors(
+            dates[start:], new_timeseries, result, daily_likelihoods
+        )
+        summary = self.summarize_posteriors(timeseries_type, new_dates, posteriors)
+        if start > 0:
+            # Day `start` is the checkpoint day, already part of the stored summary.
+            summary = pd.concat([checkpoint.summary, summary.iloc[1:]])
 
-        return dates[start_idx:], posteriors, start_idx
+        new_checkpoint = incremental.make_checkpoint(
+            dates, timeseries.values, result, start, summary
+        )
+        if new_checkpoint:
+            self.checkpoints[timeseries_type.value] = new_checkpoint
+        return summary
 
     def get_available_timeseries(self):
         """
@@ -508,7 +795,7 @@ class RtInferenceEngine:
 
         return available_timeseries
 
-    def infer_all(self, plot=True, shift_deaths=0):
+    def infer_all(self, plot=True, shift_deaths=0, precomputed_posteriors=None):
         """
         Infer R_t from all available data sources.
 
@@ -519,6 +806,9 @@ class RtInferenceEngine:
         shift_deaths: int
             Shift the death time series by this amount with respect to cases
             (when plotting only, does not shift the returned result).
+        precomputed_posteriors: dict or NoneType
+            Map of TimeseriesType to the output of get_posteriors, for timeseries whose
+            posteriors were already computed (e.g. by infer_posteriors_batched).
 
         Returns
         -------
@@ -540,27 +830,23 @@ class RtInferenceEngine:
             df_raw = df_raw.set_index("date")
             df_raw[timeseries_type.value] = timeseries_raw
 
-            df = pd.DataFrame()
-            dates, posteriors, start_idx = self.get_posteriors(timeseries_type)
             # Note that it is possible for the dates to be missing days
             # This can cause problems when:
             #   1) computing posteriors that assume continuous data (above),
             #   2) when merging data with variable keys
-            if posteriors is None:
+            if precomputed_posteriors and timeseries_type in precomputed_posteriors:
+                dates, posteriors, start_idx = precomputed_posteriors[timeseries_type]
+                df = self.summarize_posteriors(timeseries_type, dates, posteriors)
+            elif self.checkpoints is not None:
+                df = self.get_incremental_summary(timeseries_type)
+            else:
+                dates, posteriors, start_idx = self.get_posteriors(timeseries_type)
+                df = None
+                if posteriors is not None:
+                    df = self.summarize_posteriors(timeseries_type, dates, posteriors)
+            if df is None:
                 continue
 
-            df[f"Rt_MAP__{timeseries_type.value}"] = posteriors.idxmax()
-            for ci in self.confidence_intervals:
-                ci_low, ci_high = self.highest_density_interval(posteriors, ci=ci)
-
-                low_val = 1 - ci
-                high_val = ci
-                df[f"Rt_ci{int(math.floor(100 * low_val))}__{timeseries_type.value}"] = ci_low
-                df[f"Rt_ci{int(math.floor(100 * high_val))}__{timeseries_type.value}"] = ci_high
-
-            df["date"] = dates
-            df = df.set_index("date")
-
             if df_all is None:
                 df_all = df
             else:
@@ -666,7 +952,15 @@ class RtInferenceEngine:
                 / np.power(suppression, self.tail_suppression_correction / 2)
             ).apply(lambda v: max(v, self.min_conf_width)) + df_all["Rt_MAP_composite"]
 
-        if plot:
+        if plot and self.figure_collector is None and self.report_mode is ReportMode.DEFER:
+            reports.record(
+                get_run_artifact_path(self.fips, RunArtifact.RT_REPORT_DATA),
+                reports.INFERENCE,
+                reports.inference_payload(
+                    df_all, self.include_deaths, shift_deaths, self.display_name
+                ),
+            )
+        elif plot and (self.figure_collector is not None or self.report_mode is ReportMode.RENDER):
             fig = plotting.plot_rt(
                 df=df_all,
                 include_deaths=self.include_deaths,
@@ -0,0 +1,80 @@
+"""
+Vectorized Poisson likelihoods of daily counts over the R grid, computed in log space.
+
+All days and R buckets are evaluated at once with gammaln instead of one scipy distribution call
+per day, and every day is normalized with log-sum-exp so that large counts don't underflow.
+"""
+from typing import Tuple
+
+import numpy as np
+from scipy.special import gammaln, logsumexp, xlogy
+
+from pyseir.rt.constants import InferRtConstants
+
+
+def poisson_log_pmf(k: np.ndarray, lam: np.ndarray) -> np.ndarray:
+    """log of the Poisson pmf, broadcasting k against lam."""
+    return xlogy(k, lam) - lam - gammaln(k + 1)
+
+
+def poisson_log_likelihoods(
+    counts: np.ndarray,
+    r_list: np.ndarray = InferRtConstants.R_BUCKETS,
+    serial_period: float = InferRtConstants.SERIAL_PERIOD,
+) -> np.ndarray:
+    """
+    Log likelihood of each day's (smoothed) count over R_t given the previous day's count.
+
+    Smoothed counts are not integers, so the likelihood is interpolated between the floor and
+    ceiling of each count, in linear space, to avoid artifacts at rounding transitions.
+
+    Parameters
+    ----------
+    counts: np.ndarray
+        (T,) smoothed daily counts.
+    r_list: np.ndarray
+        R grid to evaluate over.
+    serial_period: float
+        Serial period relating R_t to the daily growth rate.
+
+    Returns
+    -------
+    log_likelihoods: np.ndarray
+        (len(r_list), T) array. Column 0 has no previous day and is 0 (a flat likelihood).
+    """
+    counts = np.asarray(counts, dtype=float)
+    log_likelihoods = np.zeros((len(r_list), len(counts)))
+    if len(counts) < 2:
+        return log_likelihoods
+
+    # Expected count for each R given the previous day's count.
+    lam = counts[:-1] * np.exp((r_list[:, None] - 1) / serial_period)
+
+    k = counts[1:]
+    k_floor = np.floor(k)
+    k_frac = k - k_floor
+
+    with np.errstate(divide="ignore"):
+        log_floor = np.log1p(-k_frac) + poisson_log_pmf(k_floor, lam)
+        log_ceil = np.log(k_frac) + poisson_log_pmf(k_floor + 1, lam)
+    log_likelihoods[:, 1:] = np.logaddexp(log_floor, log_ceil)
+    return log_likelihoods
+
+
+def normalize_log_likelihoods(log_likelihoods: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert log likelihoods to likelihoods that sum to 1 over the R grid for each day.
+
+    Returns
+    -------
+    likelihoods: np.ndarray
+        Normalized likelihoods, same shape as the input.
+    log_normalizers: np.ndarray
+        log-sum-exp of each day (column), to add back in to the total log likelihood.
+    """
+    log_normalizers = logsumexp(log_likelihoods, axis=0)
+    with np.errstate(invalid="ignore"):
+        likelihoods = np.exp(log_likelihoods - log_normalizers)
+    # Days where the observation is impossible for every R (e.g. growth from a zero count).
+    likelihoods[:, ~np.isfinite(log_normalizers)] = 0.0
+    return likelihoods, log_normalizers
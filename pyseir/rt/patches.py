@@ -1,14 +1,25 @@
+import functools
+from typing import Mapping, Sequence, Tuple
+
 import pandas as pd
 import numpy as np
 
-from libs.datasets import combined_datasets
-from libs.datasets.combined_datasets import CommonFields
-import pyseir.utils
+from libs.datasets import CommonFields
+from libs.lazy_import import lazy_import
+from pyseir.rt import results_table
+
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+
+AGGREGATED_RT_COLUMNS = ["Rt_MAP_composite", "Rt_ci95_composite"]
 
 
-def patch_aggregate_rt_results(fips_superset: list) -> pd.DataFrame:
+def patch_aggregate_rt_results(fips_superset: Sequence[str]) -> pd.DataFrame:
     """Return the population weighted rt dataframe results for the given fips_superset
 
+    The aggregate is computed once per superset and served to every member fips from a cache,
+    which is keyed on the modification times of the member Rt results (tables and JSON) so
+    that results rewritten by a later Rt run are picked up.
+
     Parameters
     ----------
     fips_superset
@@ -19,28 +30,53 @@ def patch_aggregate_rt_results(fips_superset: list) -> pd.DataFrame:
     dataframe
         With columns "Rt_MAP_composite" and "Rt_ci95_composite"
     """
+    versions = tuple((fips, results_table.rt_result_version(fips)) for fips in fips_superset)
+    # Callers modify the returned frame (e.g. reformat its index), so never hand out the cached one.
+    return _cached_aggregate_rt_results(versions).copy()
 
-    def load_and_append_population(fips: str) -> pd.DataFrame:
-        path = pyseir.utils.get_run_artifact_path(
-            fips, pyseir.utils.RunArtifact.RT_INFERENCE_RESULT
-        )
-        tmp = pd.read_json(path)
-        tmp["population"] = combined_datasets.get_us_latest_for_fips(fips)[CommonFields.POPULATION]
-        return tmp
 
-    combined_df = pd.concat([load_and_append_population(x) for x in fips_superset])
+@functools.lru_cache(None)
+def _cached_aggregate_rt_results(versions: Tuple[Tuple[str, tuple], ...]) -> pd.DataFrame:
+    fips_superset = [fips for fips, _ in versions]
+    rt_results = {fips: results_table.load_rt_result(fips) for fips in fips_superset}
+    missing = [fips for fips, df in rt_results.items() if df is None]
+    if missing:
+        raise ValueError(f"No Rt results to aggregate for fips {missing}")
+    populations = {
+        fips: combined_datasets.get_us_latest_for_fips(fips)[CommonFields.POPULATION]
+        for fips in fips_superset
+    }
+    return aggregate_rt_results(rt_results, populations)
 
-    def f(x):
-        """Helper function to apply to weighted arithmetic means to groupby objects"""
-        # TODO: Decide whether Rt_ci95_composite should be changed to being combined in quadrature
-        #  http://ipl.physics.harvard.edu/wp-uploads/2013/03/PS3_Error_Propagation_sp13.pdf instead
-        #  of the population weighted arithmetic mean
 
-        weighted_data = dict(
-            Rt_MAP_composite=np.average(x["Rt_MAP_composite"], weights=x["population"]),
-            Rt_ci95_composite=np.average(x["Rt_ci95_composite"], weights=x["population"]),
-        )
+def aggregate_rt_results(
+    rt_results: Mapping[str, pd.DataFrame], populations: Mapping[str, float]
+) -> pd.DataFrame:
+    """Population weighted arithmetic mean of the Rt results of each fips, date by date.
 
-        return pd.Series(weighted_data, index=["Rt_MAP_composite", "Rt_ci95_composite"])
+    Parameters
+    ----------
+    rt_results
+        Rt inference result DataFrame (indexed by date) of each fips.
+    populations
+        Population of each fips.
+
+    Returns
+    -------
+    dataframe
+        With columns "Rt_MAP_composite" and "Rt_ci95_composite", indexed by the dates present in
+        any of the results. Dates where a present value is NaN are NaN.
+    """
+    # TODO: Decide whether Rt_ci95_composite should be changed to being combined in quadrature
+    #  http://ipl.physics.harvard.edu/wp-uploads/2013/03/PS3_Error_Propagation_sp13.pdf instead
+    #  of the population weighted arithmetic mean
+    combined_df = pd.concat([df[AGGREGATED_RT_COLUMNS] for df in rt_results.values()])
+    weights = np.concatenate(
+        [np.full(len(df), float(populations[fips])) for fips, df in rt_results.items()]
+    )
 
-    return combined_df.groupby(combined_df.index).apply(f)
+    grouped_weights = pd.Series(weights, index=combined_df.index).groupby(level=0).sum()
+    grouped = combined_df.mul(weights, axis=0).groupby(level=0)
+    weighted = grouped.sum().div(grouped_weights, axis=0)
+    # Like np.average, any missing value makes the whole average missing.
+    return weighted.mask(combined_df.isna().groupby(level=0).any())
@@ -20,6 +20,25 @@ def plot_smoothing(x, original, processed, timeseries_type) -> plt.Figure:
     return fig
 
 
+def plot_smoothed_counts(dates, original, smoothed, column) -> plt.Figure:
+    """
+    Scatter of the raw counts with the smoothed counts used for inference, on a log scale.
+    """
+    fig = plt.figure(figsize=(10, 6))
+    ax = fig.add_subplot(111)  # plt.axes
+    ax.set_yscale("log")
+    chart_min = max(0.1, smoothed.min())
+    ax.set_ylim((chart_min, original.max()))
+    plt.scatter(
+        dates[-len(original) :], original, alpha=0.3, label=f"Smoothing of: {column}",
+    )
+    plt.plot(dates[-len(original) :], smoothed)
+    plt.grid(True, which="both")
+    plt.xticks(rotation=30)
+    plt.xlim(min(dates[-len(original) :]), max(dates) + timedelta(days=2))
+    return fig
+
+
 def plot_posteriors(x) -> plt.Figure:
     """
     """
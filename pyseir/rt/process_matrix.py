@@ -0,0 +1,187 @@
+"""
+Gaussian process matrices for the R_t forward filter.
+
+The process matrix only depends on the R grid and the process sigma, and the sigma only takes a
+limited range of values (DEFAULT_PROCESS_SIGMA up to MAX_SCALING_OF_SIGMA times that). Sigmas are
+quantized on a log scale and the matrices are cached per process so that each distinct matrix is
+built once instead of once per day of every timeseries.
+"""
+from functools import lru_cache
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+from pyseir.rt.constants import InferRtConstants
+
+
+def quantize_sigma(
+    sigma: float,
+    step: float = InferRtConstants.PROCESS_SIGMA_QUANTIZATION,
+    reference: float = InferRtConstants.DEFAULT_PROCESS_SIGMA,
+) -> float:
+    """
+    Snap sigma onto a grid that is uniform in log(sigma / reference) with the given step, so that
+    the reference sigma itself is always exactly representable. A step of 0 disables quantization.
+    """
+    if not step:
+        return sigma
+    return reference * math.exp(round(math.log(sigma / reference) / step) * step)
+
+
+def process_sigma(
+    scale: float,
+    default_sigma: float = InferRtConstants.DEFAULT_PROCESS_SIGMA,
+    scale_sigma_from_count: float = InferRtConstants.SCALE_SIGMA_FROM_COUNT,
+    max_scaling: float = InferRtConstants.MAX_SCALING_OF_SIGMA,
+) -> float:
+    """
+    Quantized process sigma for the given count scale: default_sigma scaled up as 1/sqrt(count)
+    for low counts, up to a maximum factor of max_scaling. A scale of 0 uses default_sigma.
+    """
+    if scale == 0:
+        scaling = 1.0
+    else:
+        scaling = max(1.0, math.sqrt(scale_sigma_from_count / scale))
+    # Quantize so that the matrix can be shared across days and timeseries.
+    return quantize_sigma(min(max_scaling, scaling) * default_sigma)
+
+
+def build_process_matrix(r_list: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    Build the row normalized Gaussian process matrix for the given R grid and sigma.
+
+    process_matrix applies gaussian smoothing to the previous posterior to make the prior.
+    But when the gaussian is wide much of its distribution function can be outside of the
+    range Reff = (0,10). When this happens the smoothing is not symmetric in R space. For
+    R<1, when posteriors[previous_day]).argmax() < 50, this asymmetry can push the argmax of
+    the prior >10 Reff bins (delta R = .2) on each new day. This was a large systematic error.
+
+    Ensure smoothing window is symmetric in X direction around diagonal
+    to avoid systematic drift towards middle (Reff = 5). This is done by
+    ensuring the following matrix values are 0:
+    1 0 0 0 0 0 ... 0 0 0 0 0 0
+    * * * 0 0 0 ... 0 0 0 0 0 0
+    ...
+    * * * * * * ... * * * * 0 0
+    * * * * * * ... * * * * * *
+    0 0 * * * * ... * * * * * *
+    ...
+    0 0 0 0 0 0 ... 0 0 0 * * *
+    0 0 0 0 0 0 ... 0 0 0 0 0 1
+    """
+    sz = len(r_list)
+    # The gaussian normalization constant cancels in the row normalization below.
+    process_matrix = np.exp(-0.5 * ((r_list[:, None] - r_list[None, :]) / sigma) ** 2)
+
+    rows = np.arange(sz)[:, None]
+    cols = np.arange(sz)[None, :]
+    process_matrix[(cols > 2 * rows) | (cols < 2 * rows - sz)] = 0.0
+
+    # Normalize all rows to sum to 1
+    process_matrix /= process_matrix.sum(axis=1, keepdims=True)
+    return process_matrix
+
+
+@lru_cache(maxsize=InferRtConstants.PROCESS_MATRIX_CACHE_SIZE)
+def _cached_process_matrix(r_list_bytes: bytes, sigma: float) -> np.ndarray:
+    process_matrix = build_process_matrix(np.frombuffer(r_list_bytes), sigma)
+    # Shared between all callers, so make sure nobody normalizes it in place.
+    process_matrix.setflags(write=False)
+    return process_matrix
+
+
+def get_process_matrix(r_list: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    Return the (read only) process matrix for the R grid and sigma, building it at most once per
+    process for each distinct pair.
+    """
+    return _cached_process_matrix(np.ascontiguousarray(r_list, dtype=float).tobytes(), sigma)
+
+
+class BandedProcessMatrix:
+    """
+    Process matrix truncated to the band of diagonals where the gaussian kernel is above a
+    tolerance. Stored as (len(r_list), 2 * half_width + 1) weights so that applying it to a
+    posterior costs O(n * k) instead of O(n^2). Supports `matrix @ posterior` like an ndarray.
+    """
+
+    def __init__(self, weights: np.ndarray, half_width: int):
+        self.weights = weights
+        self.half_width = half_width
+
+    @property
+    def shape(self):
+        return (len(self.weights), len(self.weights))
+
+    def __matmul__(self, posterior: np.ndarray) -> np.ndarray:
+        posterior = np.asarray(posterior, dtype=float)
+        hw = self.half_width
+        padded = np.zeros((len(posterior) + 2 * hw,) + posterior.shape[1:])
+        padded[hw : hw + len(posterior)] = posterior
+        # windows[i, m] == posterior[i + m - half_width], zero outside of the grid.
+        windows = as_strided(
+            padded,
+            shape=(len(posterior), 2 * hw + 1) + posterior.shape[1:],
+            strides=(padded.strides[0],) + padded.strides,
+            writeable=False,
+        )
+        if posterior.ndim == 1:
+            return np.einsum("ij,ij->i", self.weights, windows)
+        return np.einsum("ij,ij...->i...", self.weights, windows)
+
+    def toarray(self) -> np.ndarray:
+        """Expand to the equivalent dense matrix."""
+        n = len(self.weights)
+        dense = np.zeros((n, n + 2 * self.half_width))
+        rows = np.arange(n)
+        for m in range(2 * self.half_width + 1):
+            dense[rows, rows + m] = self.weights[:, m]
+        return dense[:, self.half_width : self.half_width + n]
+
+
+def build_banded_process_matrix(
+    r_list: np.ndarray, sigma: float, tolerance: float = InferRtConstants.BANDED_PRIOR_TOLERANCE
+) -> BandedProcessMatrix:
+    """
+    Build the process matrix of build_process_matrix keeping only the diagonals where the
+    (unnormalized) gaussian kernel is at least `tolerance`. Rows are renormalized over the
+    band. Requires a uniformly spaced R grid.
+    """
+    sz = len(r_list)
+    step = r_list[1] - r_list[0]
+    if not np.allclose(np.diff(r_list), step):
+        raise ValueError("Banded process matrices require a uniformly spaced R grid.")
+
+    half_width = min(sz - 1, int(math.ceil(sigma * math.sqrt(-2 * math.log(tolerance)) / step)))
+    offsets = np.arange(-half_width, half_width + 1)
+
+    rows = np.arange(sz)[:, None]
+    cols = rows + offsets[None, :]
+    weights = np.broadcast_to(np.exp(-0.5 * (offsets * step / sigma) ** 2), (sz, len(offsets)))
+    # Same symmetry constraint as the dense matrix, plus the edges of the grid.
+    outside = (cols > 2 * rows) | (cols < 2 * rows - sz) | (cols < 0) | (cols >= sz)
+    weights = np.where(outside, 0.0, weights)
+    weights /= weights.sum(axis=1, keepdims=True)
+    weights.setflags(write=False)
+    return BandedProcessMatrix(weights, half_width)
+
+
+@lru_cache(maxsize=InferRtConstants.PROCESS_MATRIX_CACHE_SIZE)
+def _cached_banded_process_matrix(
+    r_list_bytes: bytes, sigma: float, tolerance: float
+) -> BandedProcessMatrix:
+    return build_banded_process_matrix(np.frombuffer(r_list_bytes), sigma, tolerance)
+
+
+def get_banded_process_matrix(
+    r_list: np.ndarray, sigma: float, tolerance: float = InferRtConstants.BANDED_PRIOR_TOLERANCE
+) -> BandedProcessMatrix:
+    """Cached counterpart of build_banded_process_matrix."""
+    r_list_bytes = np.ascontiguousarray(r_list, dtype=float).tobytes()
+    return _cached_banded_process_matrix(r_list_bytes, sigma, tolerance)
+
+
+def clear_cache():
+    _cached_process_matrix.cache_clear()
+    _cached_banded_process_matrix.cache_clear()
@@ -0,0 +1,197 @@
+"""
+Deferred rendering of the Rt smoothing and inference reports.
+
+Rendering a PDF per fips is a large fraction of the time and memory of the Rt stage. In
+ReportMode.DEFER the Rt stage only records the inputs of each figure as small JSON documents,
+and render_deferred_reports turns them into the usual PDFs later, in a separate low priority
+job (`pyseir render-rt-reports`). Each Rt run of a fips discards the data of the previous run,
+and rendering discards the data it rendered, so the PDFs are never replaced by stale figures.
+"""
+from enum import Enum
+import glob
+import json
+import os
+import pathlib
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import structlog
+
+from libs.lazy_import import lazy_import
+from pyseir import OUTPUT_DIR
+
+plotting = lazy_import("pyseir.rt.plotting")
+
+log = structlog.get_logger(__name__)
+
+SMOOTHING = "smoothing"
+INFERENCE = "inference"
+
+# Columns of the Rt output used by plotting.plot_rt.
+RT_REPORT_COLUMNS = [
+    "Rt_ci5__new_deaths",
+    "Rt_ci95__new_deaths",
+    "Rt_MAP__new_deaths",
+    "Rt_ci5__new_cases",
+    "Rt_ci95__new_cases",
+    "Rt_MAP__new_cases",
+    "Rt_MAP_composite",
+    "Rt_ci95_composite",
+]
+
+# Process niceness used when rendering deferred reports.
+RENDER_NICENESS = 19
+
+
+class ReportMode(Enum):
+    # Render and save figures as part of the Rt stage.
+    RENDER = "render"
+    # Record the figure inputs, render later with render_deferred_reports.
+    DEFER = "defer"
+    # Don't produce reports.
+    SKIP = "skip"
+
+
+def _series_to_dict(dates, values) -> dict:
+    return dict(
+        dates=[pd.Timestamp(date).isoformat() for date in dates],
+        values=[None if np.isnan(value) else float(value) for value in np.asarray(values, float)],
+    )
+
+
+def _series_from_dict(data: dict) -> pd.Series:
+    return pd.Series(
+        np.array([np.nan if v is None else v for v in data["values"]], dtype=float),
+        index=pd.to_datetime(data["dates"]),
+    )
+
+
+def record(path: str, kind: str, payload: dict):
+    """Add the inputs of one figure (SMOOTHING or INFERENCE) to the report data at path."""
+    data = load(path)
+    data[kind] = payload
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def discard(path: str):
+    """Remove the report data at path, if any."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def load(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def smoothing_payload(dates, original: pd.Series, smoothed: pd.Series, column: str) -> dict:
+    """Inputs of plotting.plot_smoothed_counts."""
+    dates = dates[-len(original) :]
+    return dict(
+        column=column,
+        original=_series_to_dict(dates, original),
+        smoothed=_series_to_dict(dates, smoothed),
+    )
+
+
+def inference_payload(
+    df: pd.DataFrame, include_deaths: bool, shift_deaths: int, display_name: str
+) -> dict:
+    """Inputs of plotting.plot_rt."""
+    return dict(
+        include_deaths=include_deaths,
+        shift_deaths=shift_deaths,
+        display_name=display_name,
+        columns={
+            column: _series_to_dict(df.index, df[column])
+            for column in RT_REPORT_COLUMNS
+            if column in df
+        },
+    )
+
+
+def render(data: dict, smoothing_path: Optional[str], inference_path: Optional[str]):
+    """Render the figures recorded in data and save them to the given paths."""
+    import matplotlib.pyplot as plt
+
+    if SMOOTHING in data and smoothing_path:
+        payload = data[SMOOTHING]
+        original = _series_from_dict(payload["original"])
+        smoothed = _series_from_dict(payload["smoothed"])
+        fig = plotting.plot_smoothed_counts(original.index, original, smoothed, payload["column"])
+        fig.savefig(smoothing_path, bbox_inches="tight")
+        plt.close(fig)
+
+    if INFERENCE in data and inference_path:
+        payload = data[INFERENCE]
+        df = pd.DataFrame(
+            {column: _series_from_dict(values) for column, values in payload["columns"].items()}
+        )
+        fig = plotting.plot_rt(
+            df=df,
+            include_deaths=payload["include_deaths"],
+            shift_deaths=payload["shift_deaths"],
+            display_name=payload["display_name"],
+        )
+        fig.savefig(inference_path, bbox_inches="tight")
+        plt.close(fig)
+
+
+def find_report_data(output_dir: Optional[str] = None) -> List[str]:
+    """Paths of all recorded report data under the pyseir output directory."""
+    output_dir = output_dir or OUTPUT_DIR
+    pattern = os.path.join(output_dir, "pyseir", "**", "Rt_report_data__*.json")
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def render_deferred_reports(
+    fips_list: Optional[Iterable[str]] = None, output_dir: Optional[str] = None
+) -> int:
+    """
+    Render the deferred reports for the given fips (all recorded fips by default) at low priority.
+
+    Returns
+    -------
+    count: int
+        Number of fips rendered.
+    """
+    from pyseir.utils import get_run_artifact_path, RunArtifact
+
+    try:
+        os.nice(RENDER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+    if fips_list is None:
+        # Artifact file names end with the fips, e.g. Rt_report_data__Texas__Bexar County__48029.
+        fips_list = [
+            pathlib.Path(path).stem.split("__")[-1] for path in find_report_data(output_dir)
+        ]
+
+    count = 0
+    for fips in fips_list:
+        data_path = get_run_artifact_path(fips, RunArtifact.RT_REPORT_DATA, output_dir=output_dir)
+        data = load(data_path)
+        if not data:
+            continue
+        render(
+            data,
+            smoothing_path=get_run_artifact_path(
+                fips, RunArtifact.RT_SMOOTHING_REPORT, output_dir=output_dir
+            ),
+            inference_path=get_run_artifact_path(
+                fips, RunArtifact.RT_INFERENCE_REPORT, output_dir=output_dir
+            ),
+        )
+        discard(data_path)
+        count += 1
+    log.info("Rendered deferred Rt reports", count=count)
+    return count
@@ -0,0 +1,111 @@
+"""
+Consolidated Rt inference results: one columnar (parquet) table per state keyed by fips and date.
+
+The Rt stage writes one JSON result per fips. After the counties of a state are inferred their
+results are also written to a single table, stored with one row group per fips so that reading
+a single fips only decodes that fips' row group (the fips filter is pushed down to the row group
+statistics). Readers use load_rt_result, which falls back to the per fips JSON for fips that are
+not in a table (e.g. states) or whose JSON is newer than the table (e.g. after a single fips run).
+"""
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pyseir.utils import get_run_artifact_path, RunArtifact
+
+FIPS_COLUMN = "fips"
+DATE_COLUMN = "date"
+PARQUET_ENGINE = "fastparquet"
+
+
+def write_rt_table(path: str, results: Dict[str, pd.DataFrame]):
+    """
+    Write the Rt results (date indexed DataFrames by fips) to a table at path.
+
+    Parameters
+    ----------
+    path: str
+        Output path of the table.
+    results: dict
+        Rt inference result of each fips, as returned by RtInferenceEngine.infer_all.
+    """
+    frames = [
+        df.rename_axis(DATE_COLUMN).reset_index().assign(**{FIPS_COLUMN: fips})
+        for fips, df in sorted(results.items())
+        if df is not None and not df.empty
+    ]
+    if not frames:
+        return
+    table = pd.concat(frames, ignore_index=True, sort=False)
+    table = table[
+        [FIPS_COLUMN, DATE_COLUMN] + [c for c in table if c not in (FIPS_COLUMN, DATE_COLUMN)]
+    ]
+
+    # One row group per fips, so a fips filter only reads that fips' rows.
+    row_group_offsets = np.cumsum([0] + [len(frame) for frame in frames[:-1]]).tolist()
+    tmp_path = f"{path}.tmp"
+    table.to_parquet(
+        tmp_path,
+        engine=PARQUET_ENGINE,
+        compression="gzip",
+        index=False,
+        row_group_offsets=row_group_offsets,
+    )
+    os.replace(tmp_path, path)
+
+
+def read_rt_table(path: str, fips: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a table written by write_rt_table, only the rows of the given fips if not None.
+
+    Returns
+    -------
+    table: pd.DataFrame
+        Long table with fips and date columns followed by the Rt result columns.
+    """
+    filters = [(FIPS_COLUMN, "==", fips)] if fips is not None else None
+    table = pd.read_parquet(path, engine=PARQUET_ENGINE, filters=filters)
+    if fips is not None:
+        # Filters only skip row groups, so drop rows of other fips sharing a row group.
+        table = table[table[FIPS_COLUMN] == fips]
+    return table
+
+
+def table_to_results(table: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Split a table into date indexed results by fips, like the per fips JSON results."""
+    results = {}
+    for fips, df in table.groupby(FIPS_COLUMN, sort=False):
+        df = df.drop(columns=FIPS_COLUMN).set_index(DATE_COLUMN).rename_axis(None)
+        # Columns other fips have (e.g. deaths based Rt) are all missing.
+        results[fips] = df.dropna(axis=1, how="all")
+    return results
+
+
+def get_rt_table_path(fips: str, output_dir: Optional[str] = None) -> str:
+    """Path of the table holding the Rt results of a state fips or of the counties of a state."""
+    return get_run_artifact_path(fips, RunArtifact.RT_INFERENCE_TABLE, output_dir=output_dir)
+
+
+def rt_result_version(fips: str) -> Tuple[Optional[int], Optional[int]]:
+    """Modification times of the table and the JSON that may hold the Rt result of fips."""
+    paths = (get_rt_table_path(fips), get_run_artifact_path(fips, RunArtifact.RT_INFERENCE_RESULT))
+    return tuple(os.stat(path).st_mtime_ns if os.path.exists(path) else None for path in paths)
+
+
+def load_rt_result(fips: str) -> Optional[pd.DataFrame]:
+    """
+    Load the Rt inference result of fips from its state's table, or from its JSON result if
+    the table doesn't have it or is older than the JSON. Returns None if there is no result.
+    """
+    table_mtime, json_mtime = rt_result_version(fips)
+    # Single fips runs (run_rt_for_fips) only update the JSON.
+    if table_mtime is not None and (json_mtime is None or table_mtime >= json_mtime):
+        results = table_to_results(read_rt_table(get_rt_table_path(fips), fips=fips))
+        if fips in results:
+            return results[fips]
+
+    if json_mtime is None:
+        return None
+    return pd.read_json(get_run_artifact_path(fips, RunArtifact.RT_INFERENCE_RESULT))
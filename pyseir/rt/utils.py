@@ -4,12 +4,14 @@ from typing import Optional
 
 import numpy as np
 import pandas as pd
-from scipy import signal
 
+from libs.lazy_import import lazy_import
 from pyseir.rt.constants import InferRtConstants
 import pyseir.utils
 import pyseir.rt.patches
 
+signal = lazy_import("scipy.signal")
+
 # from pyseir.utils import get_run_artifact_path, RunArtifact
 
 utils_log = logging.getLogger(__name__)
@@ -162,40 +164,60 @@ def replace_outliers(
     # Small epsilon to prevent divide by 0 errors.
     EPSILON = 1e-8
 
-    # Calculate Z Score
-    r = x.rolling(window=local_lookback_window, min_periods=local_lookback_window, center=False)
-    m = r.mean().shift(1)
-    s = r.std(ddof=0).shift(1)
-    z_score = (x - m) / (s + EPSILON)
-    possible_changes_idx = np.flatnonzero(z_score > z_threshold)
-    changed_idx = []
-    changed_value = []
-    changed_snippets = []
-
-    for idx in possible_changes_idx:
-        if m[idx] > min_mean_to_consider:
-            changed_idx.append(idx)
-            changed_value.append(int(x[idx]))
-            slicer = slice(idx - local_lookback_window, idx + local_lookback_window)
-            changed_snippets.append(x[slicer].astype(int).tolist())
-            try:
-                x[idx] = np.mean([x.iloc[idx - 1], x.iloc[idx + 1]])
-            except IndexError:  # Value to replace can be newest and fail on x[idx+1].
-                # If so, just use previous.
-                x[idx] = x[idx - 1]
+    values = x.to_numpy(dtype=float)
+    n = len(values)
+
+    # Calculate Z Score from the mean and std of the previous local_lookback_window values.
+    m = np.full(n, np.nan)
+    s = np.full(n, np.nan)
+    if n > local_lookback_window:
+        windows = _rolling_windows(values[:-1], local_lookback_window)
+        m[local_lookback_window:] = windows.mean(axis=1)
+        s[local_lookback_window:] = windows.std(axis=1)
+    with np.errstate(invalid="ignore"):
+        z_score = (values - m) / (s + EPSILON)
+        changed_idx = np.flatnonzero((z_score > z_threshold) & (m > min_mean_to_consider))
 
     if len(changed_idx) > 0:
+        # Replace with the mean of the neighbors, or the previous value for the newest value.
+        previous = values[changed_idx - 1]
+        following = values[np.minimum(changed_idx + 1, n - 1)]
+        replacements = np.where(changed_idx + 1 < n, (previous + following) / 2, previous)
+
+        # Runs of consecutive outliers use the already replaced previous value.
+        for i in np.flatnonzero(np.diff(changed_idx) == 1) + 1:
+            idx = changed_idx[i]
+            replacements[i] = (
+                (replacements[i - 1] + values[idx + 1]) / 2 if idx + 1 < n else replacements[i - 1]
+            )
+
         log.info(
             event="Replacing Outliers:",
-            outlier_values=changed_value,
+            outlier_values=values[changed_idx].astype(int).tolist(),
             z_score=z_score[changed_idx].astype(int).tolist(),
-            where=changed_idx,
-            snippets=changed_snippets,
+            where=changed_idx.tolist(),
+            snippets=[
+                values[idx - local_lookback_window : idx + local_lookback_window]
+                .astype(int)
+                .tolist()
+                for idx in changed_idx
+            ],
         )
+        x.iloc[changed_idx] = replacements
 
     return x
 
 
+def _rolling_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """Read only (len(values) - window + 1, window) view of the sliding windows over values."""
+    return np.lib.stride_tricks.as_strided(
+        values,
+        shape=(len(values) - window + 1, window),
+        strides=(values.strides[0], values.strides[0]),
+        writeable=False,
+    )
+
+
 def ewma_smoothing(series, tau=5):
     """
     Exponentially weighted moving average of a series.
@@ -235,19 +257,31 @@ def align_time_series(series_a, series_b):
     shift: int
         A shift period applied to series b that aligns to series a
     """
-    shifts = InferRtConstants.XCOR_DAY_RANGE
-    valid_shifts = []
-    xcor = []
-    np.random.seed(InferRtConstants.RNG_SEED)  # Xcor has some stochastic FFT elements.
-    _series_a = np.diff(series_a)
-
-    for i in shifts:
-        series_b_shifted = np.diff(series_b.shift(i))
-        valid = ~np.isnan(_series_a) & ~np.isnan(series_b_shifted)
-        if len(series_b_shifted[valid]) > 0:
-            xcor.append(signal.correlate(_series_a[valid], series_b_shifted[valid]).mean())
-            valid_shifts.append(i)
-    if len(valid_shifts) > 0:
-        return valid_shifts[np.argmax(xcor)]
-    else:
+    shifts = np.array(InferRtConstants.XCOR_DAY_RANGE)
+    np.random.seed(InferRtConstants.RNG_SEED)  # Kept so the global RNG state is unchanged.
+    diff_a = np.diff(np.asarray(series_a, dtype=float))
+    diff_b = np.diff(np.asarray(series_b, dtype=float))
+    valid_a = ~np.isnan(diff_a)
+    valid_b = ~np.isnan(diff_b)
+    length = len(diff_a)
+    if length == 0:
+        return 0
+
+    # For each shift the score is the mean of the full cross correlation of the overlapping
+    # valid values, which equals sum(a) * sum(b) / (2 * n - 1) over those n values. The number of
+    # overlapping values and both sums are cross correlations of the validity masks, so all
+    # shifts are read off a single FFT convolution.
+    first = np.stack([valid_a, np.where(valid_a, diff_a, 0.0), valid_a]).astype(float)
+    second = np.stack([valid_b, valid_b, np.where(valid_b, diff_b, 0.0)]).astype(float)
+    correlations = signal.fftconvolve(first, second[:, ::-1], mode="full", axes=1)
+
+    in_range = np.abs(shifts) < length
+    shifts = shifts[in_range]
+    # Lag i (series b shifted forward by i days) is at index i + length - 1.
+    n_valid, sum_a, sum_b = correlations[:, shifts + length - 1]
+    n_valid = np.rint(n_valid)
+    if not (n_valid > 0).any():
         return 0
+    valid_shifts = shifts[n_valid > 0]
+    xcor = (sum_a * sum_b)[n_valid > 0] / (2 * n_valid[n_valid > 0] - 1)
+    return int(valid_shifts[np.argmax(xcor)])
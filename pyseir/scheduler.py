@@ -0,0 +1,352 @@
+"""
+Dependency aware scheduling of pipeline tasks on a process pool.
+
+Tasks are added with the keys of the tasks they depend on and are dispatched as soon as all of
+their dependencies completed, instead of running the pipeline as stages that each wait for their
+slowest task. The ScheduleReport of a run has the timing of every task, the critical path (the
+chain of dependent tasks that bounds the wall time) and the utilization of the workers.
+"""
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+import logging
+import os
+import queue
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from pyseir import journal as journal_module
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Task:
+    key: Hashable
+    func: Callable
+    args: tuple
+    kwargs: dict
+    deps: Tuple[Hashable, ...]
+    # If True func is called with the list of the results of deps as its first argument.
+    with_dep_results: bool = False
+    # Fingerprint of the inputs of the task other than its arguments and dependencies.
+    inputs: str = ""
+    # Paths written by the task, checked when resuming from a journal.
+    artifacts: Tuple[str, ...] = ()
+
+
+@dataclass
+class TaskTiming:
+    start: float
+    end: float
+    pid: int
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _run_task(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, TaskTiming]:
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, TaskTiming(start=start, end=time.time(), pid=os.getpid())
+
+
+def task_kind(key: Hashable) -> Hashable:
+    """Kind of a task, the first element of tuple keys such as ("fit", "06037")."""
+    return key[0] if isinstance(key, tuple) else key
+
+
+@dataclass
+class ScheduleReport:
+    timings: Dict[Hashable, TaskTiming]
+    deps: Dict[Hashable, Tuple[Hashable, ...]]
+    failed: Dict[Hashable, BaseException]
+    skipped: List[Hashable]
+    wall_time: float
+    processes: int
+    # Tasks skipped as completed in the journal of a previous run.
+    resumed: List[Hashable] = field(default_factory=list)
+
+    def critical_path(self) -> Tuple[List[Hashable], float]:
+        """
+        Chain of dependent completed tasks with the largest total duration.
+
+        Returns
+        -------
+        path: list
+            Keys of the tasks on the path, in execution order.
+        duration: float
+            Total duration of the tasks on the path in seconds.
+        """
+        # Tasks end after all of their dependencies, so end time order is a topological order.
+        longest = {}
+        for key in sorted(self.timings, key=lambda key: self.timings[key].end):
+            deps = [dep for dep in self.deps[key] if dep in longest]
+            previous = max(deps, key=lambda dep: longest[dep][0], default=None)
+            duration = self.timings[key].duration
+            if previous is not None:
+                duration += longest[previous][0]
+            longest[key] = (duration, previous)
+        if not longest:
+            return [], 0.0
+
+        key = max(longest, key=lambda key: longest[key][0])
+        duration = longest[key][0]
+        path = []
+        while key is not None:
+            path.append(key)
+            key = longest[key][1]
+        return path[::-1], duration
+
+    @property
+    def busy_time(self) -> float:
+        return sum(timing.duration for timing in self.timings.values())
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the workers' time spent running tasks."""
+        if self.wall_time <= 0:
+            return 0.0
+        return self.busy_time / (self.wall_time * self.processes)
+
+    def busy_time_by_kind(self) -> Dict[Hashable, float]:
+        busy_time = defaultdict(float)
+        for key, timing in self.timings.items():
+            busy_time[task_kind(key)] += timing.duration
+        return dict(busy_time)
+
+    def log_summary(self):
+        path, duration = self.critical_path()
+        log.info(
+            f"Ran {len(self.timings)} tasks in {self.wall_time:.1f}s on {self.processes} workers "
+            f"({self.utilization:.0%} utilization), {len(self.failed)} failed, "
+            f"{len(self.skipped)} skipped, {len(self.resumed)} resumed"
+        )
+        log.info(f"Critical path ({duration:.1f}s): {' -> '.join(map(str, path))}")
+        for kind, busy_time in sorted(self.busy_time_by_kind().items(), key=lambda x: -x[1]):
+            log.info(f"Busy time of {kind} tasks: {busy_time:.1f}s")
+
+
+class DagScheduler:
+    """Runs tasks on a process pool as soon as the tasks they depend on have completed."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, Task] = {}
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, key: Hashable):
+        return key in self._tasks
+
+    def add(
+        self,
+        key: Hashable,
+        func: Callable,
+        *args,
+        deps=(),
+        with_dep_results: bool = False,
+        inputs: str = "",
+        artifacts=(),
+        **kwargs,
+    ) -> Hashable:
+        """
+        Add a task running func(*args, **kwargs) once the tasks in deps have completed.
+
+        Parameters
+        ----------
+        key: hashable
+            Unique key of the task, by convention a (kind, fips) tuple.
+        func: callable
+            Picklable function run in a pool worker.
+        deps: sequence
+            Keys of the tasks this task depends on.
+        with_dep_results: bool
+            If True, func is called with the list of the results of deps as its first argument.
+        inputs: str
+            Fingerprint of inputs of the task (e.g. its data) other than its arguments and
+            dependencies, used to decide if the task completed in a journal is still valid.
+        artifacts: sequence
+            Paths the task writes, that must exist for the task to be complete in a journal.
+
+        Returns
+        -------
+        key: hashable
+        """
+        if key in self._tasks:
+            raise ValueError(f"Task {key} was already added")
+        self._tasks[key] = Task(
+            key=key,
+            func=func,
+            args=args,
+            kwargs=kwargs,
+            deps=tuple(deps),
+            with_dep_results=with_dep_results,
+            inputs=inputs,
+            artifacts=tuple(artifacts),
+        )
+        return key
+
+    def _check_graph(self) -> List[Hashable]:
+        for task in self._tasks.values():
+            missing = [dep for dep in task.deps if dep not in self._tasks]
+            if missing:
+                raise ValueError(f"Task {task.key} depends on unknown tasks {missing}")
+
+        remaining = {key: len(task.deps) for key, task in self._tasks.items()}
+        dependents = self._dependents()
+        ready = [key for key, count in remaining.items() if not count]
+        order = []
+        while ready:
+            key = ready.pop()
+            order.append(key)
+            for dependent in dependents[key]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    ready.append(dependent)
+        if len(order) != len(self._tasks):
+            raise ValueError("Task dependencies contain a cycle")
+        return order
+
+    def fingerprints(self) -> Dict[Hashable, str]:
+        """
+        Input fingerprint of each task: a hash of its function, arguments, inputs and the
+        fingerprints of its dependencies, so that changed inputs invalidate all dependent tasks.
+        """
+        fingerprints = {}
+        for key in self._check_graph():
+            task = self._tasks[key]
+            fingerprints[key] = journal_module.fingerprint(
+                key,
+                f"{task.func.__module__}.{task.func.__qualname__}",
+                task.args,
+                task.kwargs,
+                task.inputs,
+                [fingerprints[dep] for dep in task.deps],
+            )
+        return fingerprints
+
+    def _dependents(self) -> Dict[Hashable, List[Hashable]]:
+        dependents = defaultdict(list)
+        for task in self._tasks.values():
+            for dep in task.deps:
+                dependents[dep].append(task.key)
+        return dependents
+
+    def run(
+        self, pool, processes: int, journal: Optional["journal_module.CompletionJournal"] = None,
+    ) -> ScheduleReport:
+        """
+        Run all tasks on pool.
+
+        A task that raises is recorded in ScheduleReport.failed and the tasks depending on it,
+        directly or not, are skipped. Other tasks still run.
+
+        Parameters
+        ----------
+        pool: multiprocessing.Pool
+            Pool running the tasks.
+        processes: int
+            Number of workers of the pool, used to report utilization.
+        journal: CompletionJournal
+            If given, completed tasks are recorded in it. Tasks it has as complete with the same
+            input fingerprint are not run again, unless one of their dependencies ran.
+
+        Returns
+        -------
+        report: ScheduleReport
+        """
+        fingerprints = self.fingerprints()
+        dependents = self._dependents()
+        remaining = {key: set(task.deps) for key, task in self._tasks.items()}
+        # Results are only kept until the tasks that take them were dispatched.
+        results = {}
+        consumers_left = {
+            key: sum(self._tasks[dependent].with_dep_results for dependent in dependents[key])
+            for key in self._tasks
+        }
+        timings = {}
+        failed = {}
+        skipped = set()
+        resumed = []
+        ready = deque(key for key, deps in remaining.items() if not deps)
+        done = queue.Queue()
+
+        def dispatch(key):
+            task = self._tasks[key]
+            args = task.args
+            if task.with_dep_results:
+                args = ([results[dep] for dep in task.deps],) + args
+                for dep in task.deps:
+                    consumers_left[dep] -= 1
+                    if not consumers_left[dep]:
+                        del results[dep]
+            pool.apply_async(
+                _run_task,
+                (task.func, args, task.kwargs),
+                callback=lambda value: done.put((key, value, None)),
+                error_callback=lambda error: done.put((key, None, error)),
+            )
+
+        def complete(key, result):
+            if consumers_left[key]:
+                results[key] = result
+            for dependent in dependents[key]:
+                remaining[dependent].discard(key)
+                if not remaining[dependent] and dependent not in skipped:
+                    ready.append(dependent)
+
+        def skip_dependents(key):
+            stack = list(dependents[key])
+            while stack:
+                dependent = stack.pop()
+                if dependent not in skipped:
+                    skipped.add(dependent)
+                    stack.extend(dependents[dependent])
+
+        start = time.time()
+        running = 0
+        while ready or running:
+            while ready:
+                key = ready.popleft()
+                # Tasks depending on a task that ran again must run again with its new outputs.
+                if (
+                    journal is not None
+                    and not any(dep in timings for dep in self._tasks[key].deps)
+                    and journal.is_complete(key, fingerprints[key])
+                ):
+                    resumed.append(key)
+                    complete(key, journal.result(key))
+                else:
+                    dispatch(key)
+                    running += 1
+            if not running:
+                break
+
+            key, value, error = done.get()
+            running -= 1
+            if error is not None:
+                log.error(f"Task {key} failed", exc_info=error)
+                failed[key] = error
+                skip_dependents(key)
+                continue
+
+            result, timings[key] = value
+            if journal is not None:
+                journal.record(
+                    key,
+                    fingerprints[key],
+                    artifacts=self._tasks[key].artifacts,
+                    result=result if consumers_left[key] else None,
+                )
+            complete(key, result)
+
+        return ScheduleReport(
+            timings=timings,
+            deps={key: task.deps for key, task in self._tasks.items()},
+            failed=failed,
+            skipped=sorted(skipped, key=str),
+            wall_time=time.time() - start,
+            processes=processes,
+            resumed=resumed,
+        )
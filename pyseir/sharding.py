@@ -0,0 +1,139 @@
+"""
+Sharding of build_all across machines.
+
+States are partitioned between shards with their counties, as county fits and outputs depend on
+the state's results, balancing the historical cost of their fips. Every shard computes the same
+partition from the same inputs. Each shard runs with its own output root (PYSEIR_OUTPUT_DIR) and
+merge_shards assembles the shard output roots into a single one.
+"""
+import filecmp
+import heapq
+import json
+import os
+import shutil
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pyseir import OUTPUT_DIR
+from pyseir.journal import JOURNAL_FILENAME
+
+COSTS_FILENAME = "fips_costs.json"
+# Cost of a fips without history, if no fips of the same level has history.
+DEFAULT_FIPS_COST = 1.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as "i/n" (0 <= i < n) into (i, n)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be given as i/n, got {value!r}")
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}), got {index}")
+    return index, count
+
+
+def get_costs_path(output_dir: Optional[str] = None) -> str:
+    """Path of the per fips cost history written by a build_all run."""
+    return os.path.join(output_dir or OUTPUT_DIR, "pyseir", COSTS_FILENAME)
+
+
+def load_costs(path: Optional[str]) -> Dict[str, float]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_costs(costs: Mapping[str, float], path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(dict(sorted(costs.items())), f, indent=1)
+
+
+def costs_from_report(report) -> Dict[str, float]:
+    """Seconds spent on the tasks of each fips in a scheduler.ScheduleReport."""
+    costs = {}
+    for key, timing in report.timings.items():
+        if isinstance(key, tuple) and len(key) == 2:
+            fips = key[1]
+            costs[fips] = costs.get(fips, 0.0) + timing.duration
+    return costs
+
+
+def state_costs(
+    county_fips_by_state: Mapping[str, Sequence[str]],
+    state_fips_by_state: Mapping[str, str],
+    costs: Mapping[str, float],
+) -> Dict[str, float]:
+    """
+    Cost of running each state with its counties.
+
+    Fips without history cost the mean cost of the fips of the same level (state or county)
+    that have history.
+    """
+    state_fips = set(state_fips_by_state.values())
+    default_cost = {}
+    for is_state in (True, False):
+        known = [cost for fips, cost in costs.items() if (fips in state_fips) == is_state]
+        default_cost[is_state] = float(np.mean(known)) if known else DEFAULT_FIPS_COST
+
+    result = {}
+    for state, fips in state_fips_by_state.items():
+        cost = costs.get(fips, default_cost[True])
+        cost += sum(
+            costs.get(county_fips, default_cost[False])
+            for county_fips in county_fips_by_state.get(state, [])
+        )
+        result[state] = cost
+    return result
+
+
+def partition_states(costs: Mapping[str, float], count: int) -> List[List[str]]:
+    """
+    Deterministically partition states into count shards of balanced total cost, assigning the
+    most expensive remaining state to the shard with the least cost so far.
+
+    Returns
+    -------
+    shards: list
+        Sorted states of each shard.
+    """
+    shards = [[] for _ in range(count)]
+    heap = [(0.0, index) for index in range(count)]
+    for state in sorted(costs, key=lambda state: (-costs[state], state)):
+        total, index = heapq.heappop(heap)
+        shards[index].append(state)
+        heapq.heappush(heap, (total + costs[state], index))
+    return [sorted(shard) for shard in shards]
+
+
+def merge_shards(shard_dirs: Iterable[str], output_dir: str):
+    """
+    Copy the output roots of shards into output_dir.
+
+    Files of the shards replace files of a previous run in output_dir. Files present in several
+    shards (e.g. the whitelist) must be identical, except the fips cost histories which are
+    combined and the completion journals which are specific to each shard.
+    """
+    costs = {}
+    copied = set()
+    for shard_dir in shard_dirs:
+        costs.update(load_costs(get_costs_path(shard_dir)))
+        for dirpath, _, filenames in os.walk(shard_dir):
+            relative_dir = os.path.relpath(dirpath, shard_dir)
+            os.makedirs(os.path.join(output_dir, relative_dir), exist_ok=True)
+            for filename in filenames:
+                if relative_dir == "pyseir" and filename in (COSTS_FILENAME, JOURNAL_FILENAME):
+                    continue
+                source = os.path.join(dirpath, filename)
+                target = os.path.join(output_dir, relative_dir, filename)
+                if target in copied:
+                    if not filecmp.cmp(source, target, shallow=False):
+                        raise ValueError(f"{source} conflicts with a file of another shard")
+                    continue
+                shutil.copy2(source, target)
+                copied.add(target)
+    if costs:
+        save_costs(costs, get_costs_path(output_dir))
@@ -2,13 +2,15 @@ import os
 import us
 from datetime import datetime
 from enum import Enum
-from scipy import signal
 from covidactnow.datapublic.common_fields import CommonFields
 
 from pyseir import OUTPUT_DIR
 from pyseir import load_data
 from libs.datasets.dataset_utils import AggregationLevel
-from libs.datasets import combined_datasets
+from libs.lazy_import import lazy_import
+
+combined_datasets = lazy_import("libs.datasets.combined_datasets")
+signal = lazy_import("scipy.signal")
 
 REPORTS_FOLDER = lambda output_dir, state_name: os.path.join(
     output_dir, "pyseir", state_name, "reports"
@@ -38,8 +40,11 @@ class RunMode(Enum):
 
 class RunArtifact(Enum):
     RT_INFERENCE_RESULT = "rt_inference_result"
+    RT_INFERENCE_TABLE = "rt_inference_table"
     RT_INFERENCE_REPORT = "rt_inference_report"
     RT_SMOOTHING_REPORT = "rt_smoothing_report"
+    RT_FILTER_CHECKPOINT = "rt_filter_checkpoint"
+    RT_REPORT_DATA = "rt_report_data"
 
     MLE_FIT_RESULT = "mle_fit_result"
     MLE_FIT_MODEL = "mle_fit_model"
@@ -131,6 +136,38 @@ def get_run_artifact_path(fips, artifact, output_dir=None) -> str:
                 f"Rt_results__{state_obj.name}__{fips}.json",
             )
 
+    elif artifact is RunArtifact.RT_INFERENCE_TABLE:
+        # One table per state, holding the results of the state's counties.
+        path = os.path.join(
+            DATA_FOLDER(output_dir, state_obj.name), f"Rt_results__{state_obj.name}.parquet"
+        )
+
+    elif artifact is RunArtifact.RT_FILTER_CHECKPOINT:
+        if agg_level is AggregationLevel.COUNTY:
+            path = os.path.join(
+                DATA_FOLDER(output_dir, state_obj.name),
+                f"Rt_checkpoint__{state_obj.name}__{county}__{fips}.npz",
+            )
+        else:
+            path = os.path.join(
+                STATE_SUMMARY_FOLDER(output_dir),
+                "data",
+                f"Rt_checkpoint__{state_obj.name}__{fips}.npz",
+            )
+
+    elif artifact is RunArtifact.RT_REPORT_DATA:
+        if agg_level is AggregationLevel.COUNTY:
+            path = os.path.join(
+                DATA_FOLDER(output_dir, state_obj.name),
+                f"Rt_report_data__{state_obj.name}__{county}__{fips}.json",
+            )
+        else:
+            path = os.path.join(
+                STATE_SUMMARY_FOLDER(output_dir),
+                "data",
+                f"Rt_report_data__{state_obj.name}__{fips}.json",
+            )
+
     elif artifact is RunArtifact.MLE_FIT_REPORT:
         if agg_level is AggregationLevel.COUNTY:
             path = os.path.join(
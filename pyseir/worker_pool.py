@@ -0,0 +1,440 @@
+"""
+Persistent, memory bounded process pool for the pyseir pipeline.
+
+multiprocessing.Pool(maxtasksperchild=1) forks a new worker for every task, which then pays
+for copying the pages of the global datasets it touches and for warming up its caches again.
+WorkerPool keeps its forked workers for many tasks and only replaces a worker once its resident
+memory grew by more than a budget or it ran a maximum number of tasks, and it records pool metrics (forks,
+peak RSS of each worker, task run times and latencies).
+
+A task running in a worker can fan out tasks to the same pool with map_from_worker: the tasks
+are sent to the parent process, which runs them on other workers (ahead of queued tasks) and
+sends back their results. While it waits the worker doesn't count against the pool size, the
+workers added for that are stopped once it resumes.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+from multiprocessing.pool import RemoteTraceback
+from multiprocessing.reduction import ForkingPickler
+import os
+import resource
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# Seconds between checks of the workers for results, lost workers and new tasks.
+POLL_INTERVAL = 0.05
+
+
+# Connection to the parent process if the current process is a worker of a WorkerPool.
+_parent_conn = None
+
+
+class WorkerLostError(RuntimeError):
+    """A worker exited (e.g. killed for running out of memory) while running a task."""
+
+
+def in_worker() -> bool:
+    """True in a worker of a WorkerPool."""
+    return _parent_conn is not None
+
+
+def map_from_worker(func: Callable, iterable: Iterable) -> list:
+    """
+    Map func over iterable on the pool running the current task, see WorkerPool.map.
+    Must be called from a task running in a worker of a WorkerPool.
+    """
+    _parent_conn.send(("map", func, list(iterable)))
+    _, results, error = _parent_conn.recv()
+    if error is not None:
+        raise error
+    return results
+
+
+def current_rss() -> int:
+    """Resident set size of the current process in bytes, including shared pages."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _run_callback(callback: Optional[Callable], arg):
+    """Run a task callback, logging its errors so that they don't stop the pool."""
+    if callback is None:
+        return
+    try:
+        callback(arg)
+    except Exception:
+        log.exception(f"Worker pool callback {callback!r} failed")
+
+
+def _worker_loop(conn, max_tasks: Optional[int], max_rss_bytes: Optional[int]):
+    global _parent_conn
+    _parent_conn = conn
+    tasks = 0
+    # The pages shared with the parent at fork count in the RSS, only its growth is bounded.
+    start_rss = current_rss()
+    while True:
+        message = conn.recv()
+        if message is None:
+            return
+        _, func, args, kwargs = message
+        start = time.time()
+        try:
+            value, error = func(*args, **kwargs), None
+        except Exception as e:
+            value, error = None, (e, traceback.format_exc())
+        end = time.time()
+        tasks += 1
+        rss = current_rss()
+        if max_rss_bytes and rss - start_rss > max_rss_bytes:
+            retire = "rss"
+        elif max_tasks and tasks >= max_tasks:
+            retire = "tasks"
+        else:
+            retire = None
+        try:
+            conn.send(("done", value, error, start, end, rss, retire))
+        except Exception as e:
+            # The result or the exception could not be pickled.
+            error = (RuntimeError(f"Could not send the task result: {e!r}"), traceback.format_exc())
+            conn.send(("done", None, error, start, end, rss, retire))
+        if retire:
+            return
+
+
+@dataclass
+class PoolMetrics:
+    forks: int = 0
+    tasks: int = 0
+    failed_tasks: int = 0
+    lost_workers: int = 0
+    recycled_for_rss: int = 0
+    recycled_for_tasks: int = 0
+    # Largest RSS measured after a task, by worker pid.
+    peak_rss_by_worker: Dict[int, int] = field(default_factory=dict)
+    # Seconds spent running each task in a worker.
+    run_times: List[float] = field(default_factory=list)
+    # Seconds from submitting each task to its result being received.
+    latencies: List[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        def percentiles(values):
+            if not values:
+                return dict(p50=None, p95=None, max=None)
+            return dict(
+                p50=float(np.percentile(values, 50)),
+                p95=float(np.percentile(values, 95)),
+                max=float(np.max(values)),
+            )
+
+        peak_rss = list(self.peak_rss_by_worker.values())
+        return dict(
+            forks=self.forks,
+            tasks=self.tasks,
+            failed_tasks=self.failed_tasks,
+            lost_workers=self.lost_workers,
+            recycled_for_rss=self.recycled_for_rss,
+            recycled_for_tasks=self.recycled_for_tasks,
+            max_peak_rss_mb=max(peak_rss) / 2 ** 20 if peak_rss else None,
+            run_time=percentiles(self.run_times),
+            latency=percentiles(self.latencies),
+        )
+
+    def log_summary(self):
+        log.info(f"Worker pool metrics: {self.summary()}")
+
+
+@dataclass
+class _PendingTask:
+    func: Callable
+    args: tuple
+    kwargs: dict
+    callback: Optional[Callable]
+    error_callback: Optional[Callable]
+    submitted: float
+
+
+class _Worker:
+    def __init__(self, max_tasks, max_rss_bytes):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_loop, args=(child_conn, max_tasks, max_rss_bytes), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.task: Optional[_PendingTask] = None
+        # True while the worker's task waits for the tasks it fanned out.
+        self.waiting = False
+
+
+class WorkerPool:
+    """
+    Pool of forked workers that run many tasks each.
+
+    Has the apply_async and map methods of multiprocessing.Pool used by the pipeline. Callbacks
+    run in a thread of the parent process, their errors are logged.
+
+    Parameters
+    ----------
+    processes: int
+        Number of workers, os.cpu_count() by default.
+    max_tasks_per_worker: int
+        Replace a worker after it ran this many tasks. None for no limit.
+    max_rss_mb: float
+        Replace a worker once its resident memory after a task grew by more than this many
+        megabytes since the worker started. None for no limit.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+    ):
+        self.processes = processes or os.cpu_count()
+        self._max_tasks = max_tasks_per_worker
+        self._max_rss_bytes = int(max_rss_mb * 2 ** 20) if max_rss_mb else None
+        self.metrics = PoolMetrics()
+        self._pending = deque()
+        self._idle: List[_Worker] = []
+        self._busy: List[_Worker] = []
+        self._waiting = 0
+        # Tasks whose function or arguments could not be pickled, with the pickling error.
+        self._unsent = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._handler = threading.Thread(target=self._handle_workers, daemon=True)
+        self._handler.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        self.join()
+
+    def apply_async(
+        self,
+        func: Callable,
+        args: tuple = (),
+        kwds: Optional[dict] = None,
+        callback: Optional[Callable] = None,
+        error_callback: Optional[Callable] = None,
+    ):
+        """Run func(*args, **kwds) in a worker, then call callback or error_callback."""
+        task = _PendingTask(func, args, kwds or {}, callback, error_callback, time.time())
+        with self._lock:
+            if self._closed:
+                raise ValueError("Pool is closed")
+            self._pending.append(task)
+            self._dispatch()
+
+    def map(self, func: Callable, iterable: Iterable) -> list:
+        """Like multiprocessing.Pool.map: results in order, raises the first task error."""
+        items = list(iterable)
+        results = [None] * len(items)
+        errors = []
+        done = threading.Semaphore(0)
+
+        def on_result(i, value):
+            results[i] = value
+            done.release()
+
+        def on_error(error):
+            errors.append(error)
+            done.release()
+
+        for i, item in enumerate(items):
+            self.apply_async(
+                func,
+                (item,),
+                callback=lambda value, i=i: on_result(i, value),
+                error_callback=on_error,
+            )
+        for _ in items:
+            done.acquire()
+        if errors:
+            raise errors[0]
+        return results
+
+    @property
+    def workers(self) -> int:
+        """Number of running workers."""
+        with self._lock:
+            return len(self._idle) + len(self._busy)
+
+    def close(self):
+        """Stop accepting tasks, workers exit once all submitted tasks completed."""
+        with self._lock:
+            self._closed = True
+
+    def join(self):
+        self._handler.join()
+
+    def _dispatch(self):
+        # Called with self._lock held.
+        while self._pending and len(self._busy) < self.processes + self._waiting:
+            task = self._pending.popleft()
+            try:
+                message = ForkingPickler.dumps(("task", task.func, task.args, task.kwargs))
+            except Exception as e:
+                # Fails the task from the handler thread, callbacks can't run with the lock held.
+                self._unsent.append((task, e))
+                continue
+            if self._idle:
+                worker = self._idle.pop()
+            else:
+                worker = _Worker(self._max_tasks, self._max_rss_bytes)
+                self.metrics.forks += 1
+            worker.task = task
+            worker.conn.send_bytes(message)
+            self._busy.append(worker)
+        # Stop the workers added while tasks waited for their fan outs once they resumed.
+        while self._idle and len(self._idle) + len(self._busy) > self.processes + self._waiting:
+            worker = self._idle.pop()
+            worker.conn.send(None)
+            worker.process.join()
+
+    def _handle_workers(self):
+        while True:
+            with self._lock:
+                if self._closed and not self._pending and not self._busy and not self._unsent:
+                    for worker in self._idle:
+                        worker.conn.send(None)
+                        worker.process.join()
+                    self._idle = []
+                    return
+                busy = list(self._busy)
+                unsent, self._unsent = self._unsent, deque()
+            for task, error in unsent:
+                self.metrics.failed_tasks += 1
+                _run_callback(task.error_callback, error)
+            ready = wait(
+                [worker.conn for worker in busy] + [worker.process.sentinel for worker in busy],
+                timeout=POLL_INTERVAL,
+            )
+            for worker in busy:
+                if worker.conn in ready:
+                    self._receive(worker)
+                elif worker.process.sentinel in ready:
+                    self._lose(worker)
+
+    def _receive(self, worker: _Worker):
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            self._lose(worker)
+            return
+        if message[0] == "map":
+            self._fan_out(worker, *message[1:])
+            return
+
+        _, value, error, start, end, rss, retire = message
+        task = worker.task
+        pid = worker.process.pid
+        metrics = self.metrics
+        metrics.tasks += 1
+        metrics.run_times.append(end - start)
+        metrics.latencies.append(time.time() - task.submitted)
+        metrics.peak_rss_by_worker[pid] = max(rss, metrics.peak_rss_by_worker.get(pid, 0))
+        if retire == "rss":
+            metrics.recycled_for_rss += 1
+        elif retire == "tasks":
+            metrics.recycled_for_tasks += 1
+
+        with self._lock:
+            self._busy.remove(worker)
+            worker.task = None
+            if retire:
+                worker.process.join()
+            else:
+                self._idle.append(worker)
+
+        # Callbacks run before dispatching other tasks, so that a task that waited for this
+        # one is resumed before its worker's slot is given to another task.
+        if error is None:
+            _run_callback(task.callback, value)
+        else:
+            metrics.failed_tasks += 1
+            exception, remote_traceback = error
+            exception.__cause__ = RemoteTraceback(remote_traceback)
+            _run_callback(task.error_callback, exception)
+        with self._lock:
+            self._dispatch()
+
+    def _fan_out(self, worker: _Worker, func: Callable, items: list):
+        """Run the tasks of map_from_worker in the worker and send their results back."""
+        results = [None] * len(items)
+        errors = []
+        left = [len(items)]
+
+        def finish():
+            with self._lock:
+                if not worker.waiting:
+                    # The worker was lost.
+                    return
+                worker.waiting = False
+                self._waiting -= 1
+                worker.conn.send(("results", results, errors[0] if errors else None))
+
+        def on_result(i, value):
+            results[i] = value
+            left[0] -= 1
+            if not left[0]:
+                finish()
+
+        def on_error(error):
+            errors.append(error)
+            left[0] -= 1
+            if not left[0]:
+                finish()
+
+        with self._lock:
+            worker.waiting = True
+            self._waiting += 1
+            now = time.time()
+            for i in reversed(range(len(items))):
+                self._pending.appendleft(
+                    _PendingTask(
+                        func,
+                        (items[i],),
+                        {},
+                        lambda value, i=i: on_result(i, value),
+                        on_error,
+                        now,
+                    )
+                )
+            self._dispatch()
+        if not items:
+            finish()
+
+    def _lose(self, worker: _Worker):
+        task = worker.task
+        worker.process.join()
+        self.metrics.lost_workers += 1
+        self.metrics.failed_tasks += 1
+        with self._lock:
+            self._busy.remove(worker)
+            if worker.waiting:
+                worker.waiting = False
+                self._waiting -= 1
+        error = WorkerLostError(
+            f"Worker {worker.process.pid} exited with code {worker.process.exitcode} while "
+            f"running {getattr(task.func, '__name__', task.func)}"
+        )
+        _run_callback(task.error_callback, error)
+        with self._lock:
+            self._dispatch()
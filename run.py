@@ -6,7 +6,6 @@ Entry point for covid-data-model CLI.
 import logging
 import click
 from covidactnow.datapublic import common_init
-from pandarallel import pandarallel
 
 from cli import api
 from cli import data
@@ -21,8 +20,6 @@ def entry_point(ctx):  # pylint: disable=no-value-for-parameter
     """Entry point for covid-data-model CLI."""
     common_init.configure_logging(command=ctx.invoked_subcommand)
 
-    pandarallel.initialize(progress_bar=False)
-
 
 # adding the QA command
 entry_point.add_command(compare_snapshots.compare_snapshots)
@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pandas as pd
+from more_itertools import first
+
+from libs.datasets.latest_values_dataset import LatestValuesDataset
+
+
+def _latest_values():
+    return LatestValuesDataset(
+        pd.read_csv(
+            StringIO(
+                "fips,state,county,aggregate_level,population,icu_beds,max_bed_count\n"
+                "97123,ZZ,Smith County,county,1000,10,\n"
+                "97001,ZZ,North County,county,2000,,30\n"
+                "97,ZZ,,state,3000,40,50\n"
+                ",ZZ,Unknown County,county,5,,\n"
+            ),
+            dtype={"fips": str},
+        )
+    )
+
+
+def test_get_record_for_fips_matches_yield_records():
+    latest = _latest_values()
+
+    for fips in ["97123", "97001", "97", "98"]:
+        expected = first(latest.get_subset(fips=fips).yield_records(), default={})
+        assert latest.get_record_for_fips(fips) == expected
+
+    assert latest.get_record_for_fips("97001")["icu_beds"] is None
+
+
+def test_get_record_for_fips_invalidation():
+    latest = _latest_values()
+    record = latest.get_record_for_fips("97123")
+    record["population"] = -1
+    assert latest.get_record_for_fips("97123")["population"] == 1000
+
+    # Replacing data is picked up automatically, modifying it in place needs invalidation.
+    latest.data = latest.data.assign(population=latest.data["population"] * 2)
+    assert latest.get_record_for_fips("97123")["population"] == 2000
+
+    latest.data.loc[latest.data["fips"] == "97123", "population"] = 7
+    latest.invalidate_record_index()
+    assert latest.get_record_for_fips("97123")["population"] == 7
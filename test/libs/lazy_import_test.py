@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+from libs import import_profile
+from libs.lazy_import import is_loaded, lazy_import, preload
+
+
+def test_lazy_import_imports_on_first_attribute_access():
+    # Run in a new interpreter, the module may already be imported in this one.
+    code = (
+        "import sys\n"
+        "from libs.lazy_import import is_loaded, lazy_import, preload\n"
+        "wave = lazy_import('wave')\n"
+        "assert 'wave' not in sys.modules and not is_loaded(wave)\n"
+        "assert wave.Wave_read is sys.modules['wave'].Wave_read\n"
+        "assert is_loaded(wave)\n"
+        "sndhdr = lazy_import('sndhdr')\n"
+        "preload(sndhdr)\n"
+        "assert 'sndhdr' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True)
+
+
+def test_lazy_import_of_imported_module():
+    assert lazy_import("json") is sys.modules["json"]
+    assert is_loaded(lazy_import("json"))
+    preload(sys.modules["json"])
+
+
+def test_parse_importtime():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       182 |        182 |       _json",
+            "import time:       438 |        620 |     json.scanner",
+            "import time:       414 |       1034 |   json.decoder",
+            "import time:       262 |       1296 | json",
+            "import time:       100 |        100 | wave",
+        ]
+    )
+    timings = import_profile.parse_importtime(output)
+
+    assert [(t.module, t.depth) for t in timings] == [
+        ("_json", 3),
+        ("json.scanner", 2),
+        ("json.decoder", 1),
+        ("json", 0),
+        ("wave", 0),
+    ]
+    assert timings[1].self_us == 438
+    assert timings[1].cumulative_us == 620
+    assert import_profile.total_us(timings) == 1396
+    assert import_profile.self_us_by_package(timings) == {"_json": 182, "json": 1114, "wave": 100}
+
+
+def test_profile_imports_excludes_startup_modules():
+    timings = import_profile.profile_imports("json")
+
+    assert "json" in [timing.module for timing in timings]
+    assert "sys" not in [timing.module for timing in timings]
+    assert import_profile.total_us(timings) > 0
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats as sps
+
+from pyseir.rt import bayes_filter, infer_rt, likelihoods, process_matrix
+from pyseir.rt.constants import InferRtConstants
+
+
+def _make_process_matrix(scale):
+    sigma = process_matrix.process_sigma(scale)
+    return sigma, process_matrix.get_process_matrix(InferRtConstants.R_BUCKETS, sigma)
+
+
+def _initial_prior():
+    prior = sps.gamma(a=2.5).pdf(InferRtConstants.R_BUCKETS)
+    return prior / prior.sum()
+
+
+def _synthetic_counts(length, scale, growth):
+    counts = scale * np.exp(growth * np.arange(length))
+    counts[length // 2 : length // 2 + 2] = 0.0  # Forces a re-initialization.
+    return counts
+
+
+def _dataframe_forward_filter(timeseries, likelihoods_df, prior0, reinit_prior, monitor):
+    # Loop of RtInferenceEngine.get_posteriors before run_forward_filter.
+    posteriors = pd.DataFrame(
+        index=InferRtConstants.R_BUCKETS,
+        columns=timeseries.index,
+        data={timeseries.index[0]: prior0},
+    )
+    log_likelihood = 0.0
+    scale = timeseries.head(1).item()
+    loop_idx = 0
+    for previous_day, current_day in zip(timeseries.index[:-1], timeseries.index[1:]):
+        scale = 0.9 * scale + 0.1 * timeseries[current_day]
+        (current_sigma, matrix) = _make_process_matrix(scale)
+        current_prior = matrix @ posteriors[previous_day]
+        numerator = likelihoods_df[current_day] * current_prior
+        denominator = np.sum(numerator)
+        if denominator == 0:
+            posteriors[current_day] = reinit_prior
+        else:
+            posteriors[current_day] = numerator / denominator
+        monitor.evaluate_lag_using_argmaxes(
+            current_day=loop_idx,
+            current_sigma=current_sigma,
+            prev_post_am=posteriors[previous_day].argmax(),
+            prior_am=current_prior.argmax(),
+            like_am=likelihoods_df[current_day].argmax(),
+            post_am=numerator.argmax(),
+        )
+        log_likelihood += np.log(denominator)
+        loop_idx += 1
+    return posteriors, log_likelihood
+
+
+def test_forward_filter_matches_dataframe_loop(monkeypatch):
+    r_list = InferRtConstants.R_BUCKETS
+    timeseries = pd.Series(
+        _synthetic_counts(60, 40.0, 0.04), index=pd.date_range("2020-04-01", periods=60)
+    )
+    lam = timeseries[:-1].values * np.exp((r_list[:, None] - 1) / InferRtConstants.SERIAL_PERIOD)
+    likelihoods_df = pd.DataFrame(
+        data=sps.poisson.pmf(np.round(timeseries[1:].values), lam),
+        index=r_list,
+        columns=timeseries.index[1:],
+    )
+    reinit_prior = sps.gamma(a=2).pdf(r_list)
+    reinit_prior /= reinit_prior.sum()
+
+    calls = []
+
+    class RecordingLagMonitor:
+        def __init__(self, **kwargs):
+            pass
+
+        def evaluate_lag_using_argmaxes(self, **kwargs):
+            calls.append(kwargs)
+
+    monkeypatch.setattr(infer_rt.utils, "LagMonitor", RecordingLagMonitor)
+
+    with np.errstate(divide="ignore"):
+        expected, expected_log_likelihood = _dataframe_forward_filter(
+            timeseries, likelihoods_df, _initial_prior(), reinit_prior, RecordingLagMonitor()
+        )
+
+        daily = np.ones((len(r_list), len(timeseries)))
+        daily[:, 1:] = likelihoods_df.values
+        result = bayes_filter.run_forward_filter(
+            daily, timeseries.values, _initial_prior(), reinit_prior, _make_process_matrix
+        )
+    expected_calls = list(calls)
+    calls.clear()
+    infer_rt.RtInferenceEngine._monitor_lag(result, daily)
+
+    np.testing.assert_allclose(result.posteriors, expected.values.astype(float), rtol=1e-12)
+    # The zero counts in the middle of the series re-initialize the filter.
+    reinit_days = np.flatnonzero((expected.values == reinit_prior[:, None]).all(axis=0))
+    assert len(reinit_days)
+    np.testing.assert_array_equal(
+        result.posteriors[:, reinit_days], expected.values[:, reinit_days]
+    )
+    assert result.log_likelihood == expected_log_likelihood == -np.inf
+    assert len(expected_calls) == len(timeseries) - 1
+    assert calls == expected_calls
+
+
+def test_batched_forward_filter_matches_single():
+    series = [
+        _synthetic_counts(80, 30.0, 0.05),
+        _synthetic_counts(60, 2000.0, -0.02),
+        _synthetic_counts(25, 5.0, 0.1),
+    ]
+    lengths = np.array([len(counts) for counts in series])
+    n_r = len(InferRtConstants.R_BUCKETS)
+    all_likelihoods = np.zeros((len(series), n_r, lengths.max()))
+    all_log_normalizers = np.zeros((len(series), lengths.max()))
+    all_counts = np.zeros((len(series), lengths.max()))
+    expected = []
+    for i, counts in enumerate(series):
+        daily, log_normalizers = likelihoods.normalize_log_likelihoods(
+            likelihoods.poisson_log_likelihoods(counts)
+        )
+        all_likelihoods[i, :, : len(counts)] = daily
+        all_log_normalizers[i, : len(counts)] = log_normalizers
+        all_counts[i, : len(counts)] = counts
+        expected.append(
+            bayes_filter.run_forward_filter(
+                daily,
+                counts,
+                _initial_prior(),
+                _initial_prior(),
+                _make_process_matrix,
+                log_normalizers=log_normalizers,
+            )
+        )
+
+    results = bayes_filter.run_batched_forward_filter(
+        all_likelihoods,
+        all_counts,
+        lengths,
+        _initial_prior(),
+        _initial_prior(),
+        _make_process_matrix,
+        log_normalizers=all_log_normalizers,
+    )
+
+    assert len(results) == len(series)
+    for result, single in zip(results, expected):
+        assert result.posteriors.shape == single.posteriors.shape
+        np.testing.assert_allclose(result.posteriors, single.posteriors, atol=1e-12)
+        np.testing.assert_allclose(result.priors, single.priors, atol=1e-12)
+        np.testing.assert_array_equal(result.numerator_argmax, single.numerator_argmax)
+        np.testing.assert_array_equal(result.sigmas, single.sigmas)
+        assert result.log_likelihood == pytest.approx(single.log_likelihood)
+
+
+def test_adaptive_forward_filter_matches_fixed_grid():
+    r_list = InferRtConstants.R_BUCKETS
+    counts = _synthetic_counts(120, 200.0, 0.03)
+    daily, log_normalizers = likelihoods.normalize_log_likelihoods(
+        likelihoods.poisson_log_likelihoods(counts)
+    )
+
+    fixed = bayes_filter.run_forward_filter(
+        daily,
+        counts,
+        _initial_prior(),
+        _initial_prior(),
+        _make_process_matrix,
+        log_normalizers=log_normalizers,
+    )
+    adaptive = bayes_filter.run_adaptive_forward_filter(
+        daily,
+        counts,
+        _initial_prior(),
+        _initial_prior(),
+        r_list,
+        lambda scale: _make_process_matrix(scale)[0],
+        log_normalizers=log_normalizers,
+    )
+
+    assert adaptive.posteriors.shape == fixed.posteriors.shape
+    np.testing.assert_allclose(adaptive.posteriors, fixed.posteriors, atol=1e-6)
+    np.testing.assert_array_equal(
+        adaptive.posteriors.argmax(axis=0), fixed.posteriors.argmax(axis=0)
+    )
+    for ci in (0.05, 0.95):
+        fixed_idx = np.argmin(np.abs(fixed.posteriors.cumsum(axis=0) - ci), axis=0)
+        adaptive_idx = np.argmin(np.abs(adaptive.posteriors.cumsum(axis=0) - ci), axis=0)
+        assert np.abs(fixed_idx - adaptive_idx).max() <= 1
+    # Most days only update a narrow range of the grid.
+    assert np.median((adaptive.posteriors > 0).sum(axis=0)) < len(r_list) / 2
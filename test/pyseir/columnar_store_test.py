@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyseir.columnar_store import ColumnarTable, write_columnar_table
+
+
+def _mobility_data():
+    rng = np.random.RandomState(4)
+    frames = [
+        pd.DataFrame(
+            {
+                "fips": fips,
+                "date": pd.date_range("2020-03-01", periods=n),
+                "m50": rng.uniform(0, 20, n),
+                "m50_index": rng.randint(0, 100, n),
+            }
+        )
+        for fips, n in [("36061", 20), ("06037", 30), ("06075", 1)]
+    ]
+    # Interleave the rows of the counties, they are grouped when written.
+    return pd.concat(frames, ignore_index=True).sort_values("date", kind="mergesort")
+
+
+def test_rows_by_key(tmp_path):
+    df = _mobility_data()
+    write_columnar_table(str(tmp_path / "mobility"), df)
+    table = ColumnarTable(str(tmp_path / "mobility"))
+
+    assert len(table) == 3
+    assert sorted(table.keys()) == ["06037", "06075", "36061"]
+    assert "01001" not in table
+    assert table.get("01001") is None
+    assert table.columns == ["date", "m50", "m50_index"]
+    for fips, expected in df.groupby("fips"):
+        rows = table.get(fips)
+        assert isinstance(rows["m50"], np.memmap)
+        for column in table.columns:
+            np.testing.assert_array_equal(rows[column], expected[column].values)
+
+
+def test_rows_are_read_only(tmp_path):
+    write_columnar_table(str(tmp_path / "mobility"), _mobility_data())
+    rows = ColumnarTable(str(tmp_path / "mobility")).get("06037")
+    with pytest.raises(ValueError):
+        rows["m50"][0] = 0
+
+
+def test_rewrite_and_round_trip(tmp_path):
+    path = str(tmp_path / "policies")
+    write_columnar_table(path, _mobility_data())
+    policies = pd.DataFrame(
+        {
+            "fips": ["06037", "36061"],
+            "stay_at_home": pd.to_datetime(["2020-03-19", None]),
+            "area_name": ["Los Angeles County", None],
+        }
+    )
+    write_columnar_table(path, policies)
+    table = ColumnarTable(path, mmap_mode=None)
+
+    assert table.columns == ["stay_at_home", "area_name"]
+    expected = policies.assign(area_name=["Los Angeles County", ""])
+    pd.testing.assert_frame_equal(table.to_frame(), expected)
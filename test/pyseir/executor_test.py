@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+from pyseir import executor
+
+
+def _square(x):
+    return x * x
+
+
+def _state(n):
+    # A state level task fanning out its counties.
+    return executor.parallel_map(_square, range(n))
+
+
+@pytest.fixture
+def small_executor():
+    executor.configure(processes=2)
+    yield
+    executor.shutdown()
+
+
+def test_parallel_map_shares_one_pool(small_executor):
+    assert executor.parallel_map(_state, [1, 3]) == [[0], [0, 1, 4]]
+    pool = executor.get_executor()
+    assert executor.parallel_map(os.getpid, []) == []
+    assert executor.get_executor() is pool
+    assert pool.metrics.tasks == 6
+
+
+def test_configure_replaces_the_executor(small_executor):
+    pool = executor.get_executor()
+    executor.configure(processes=1)
+    assert executor.get_executor() is not pool
+    assert executor.get_executor().processes == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from scipy import stats as sps
+
+from pyseir.rt import bayes_filter, incremental, likelihoods, process_matrix
+from pyseir.rt.constants import InferRtConstants
+
+
+def _make_process_matrix(scale):
+    sigma = process_matrix.process_sigma(scale)
+    return sigma, process_matrix.get_process_matrix(InferRtConstants.R_BUCKETS, sigma)
+
+
+def _run(counts, initial_posterior=None, initial_scale=None):
+    prior = sps.gamma(a=2.5).pdf(InferRtConstants.R_BUCKETS)
+    prior /= prior.sum()
+    daily, log_normalizers = likelihoods.normalize_log_likelihoods(
+        likelihoods.poisson_log_likelihoods(counts)
+    )
+    return bayes_filter.run_forward_filter(
+        daily,
+        counts,
+        prior if initial_posterior is None else initial_posterior,
+        prior,
+        _make_process_matrix,
+        initial_scale=initial_scale,
+        log_normalizers=log_normalizers,
+    )
+
+
+def _summary(dates, result):
+    return pd.DataFrame(
+        {"Rt_MAP__new_cases": InferRtConstants.R_BUCKETS[result.posteriors.argmax(axis=0)]},
+        index=pd.DatetimeIndex(dates, name="date"),
+    )
+
+
+def test_resume_from_checkpoint_matches_full_run(tmp_path):
+    dates = pd.date_range("2020-03-01", periods=90)
+    counts = 40 * np.exp(0.03 * np.arange(90))
+
+    # First run on the first 80 days.
+    first = _run(counts[:80])
+    checkpoint = incremental.make_checkpoint(
+        dates[:80], counts[:80], first, 0, _summary(dates[:80], first)
+    )
+    path = str(tmp_path / "checkpoint.npz")
+    incremental.save_checkpoints(path, {"new_cases": checkpoint})
+    checkpoint = incremental.load_checkpoints(path)["new_cases"]
+
+    # Second run with 10 more days resumes from the checkpoint.
+    start = checkpoint.resume_index(dates, counts)
+    assert start == 80 - 1 - InferRtConstants.INCREMENTAL_CHECKPOINT_LAG
+    resumed = _run(counts[start:], checkpoint.posterior, checkpoint.scale)
+
+    full = _run(counts)
+    np.testing.assert_allclose(resumed.posteriors, full.posteriors[:, start:], atol=1e-12)
+    expected_summary = _summary(dates, full).iloc[: start + 1]
+    assert list(checkpoint.summary.index) == list(expected_summary.index)
+    np.testing.assert_array_equal(checkpoint.summary.values, expected_summary.values)
+
+
+def test_revised_history_is_not_resumed():
+    dates = pd.date_range("2020-03-01", periods=60)
+    counts = 40 * np.exp(0.03 * np.arange(60))
+    result = _run(counts[:50])
+    checkpoint = incremental.make_checkpoint(
+        dates[:50], counts[:50], result, 0, _summary(dates[:50], result)
+    )
+
+    assert checkpoint.resume_index(dates, counts) is not None
+    # Same or fewer days than the checkpoint.
+    assert checkpoint.resume_index(dates[:30], counts[:30]) is None
+    # A historical value was revised.
+    revised = counts.copy()
+    revised[10] += 1
+    assert checkpoint.resume_index(dates, revised) is None
+    # Dates were shifted.
+    assert checkpoint.resume_index(dates + pd.Timedelta(days=1), counts) is None
+
+
+def test_load_checkpoints_missing_file(tmp_path):
+    assert incremental.load_checkpoints(str(tmp_path / "missing.npz")) == {}
@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyseir import utils
+from pyseir.rt import infer_rt, reports
+from pyseir.rt.reports import ReportMode
+from pyseir.utils import RunArtifact, get_run_artifact_path
+
+
+@pytest.fixture
+def synthetic_state(tmp_path, monkeypatch):
+    """Runs infer_rt for state 06 on synthetic cases, with outputs under tmp_path."""
+    monkeypatch.setattr(utils, "OUTPUT_DIR", str(tmp_path))
+    cases = {"counts": 50 * np.exp(0.03 * np.arange(100))}
+
+    def load_new_case_data_by_fips(fips, t0, include_testing_correction=False):
+        counts = cases["counts"]
+        return np.arange(len(counts)), counts, np.full(len(counts), np.nan)
+
+    monkeypatch.setattr(
+        infer_rt.load_data, "load_new_case_data_by_fips", load_new_case_data_by_fips
+    )
+    return cases
+
+
+def test_deferred_reports_are_reset_by_each_run(synthetic_state):
+    data_path = get_run_artifact_path("06", RunArtifact.RT_REPORT_DATA)
+    smoothing_path = get_run_artifact_path("06", RunArtifact.RT_SMOOTHING_REPORT)
+    inference_path = get_run_artifact_path("06", RunArtifact.RT_INFERENCE_REPORT)
+
+    infer_rt.run_rt_for_fips("06", report_mode=ReportMode.DEFER)
+    assert set(reports.load(data_path)) == {reports.SMOOTHING, reports.INFERENCE}
+
+    # Cases that no longer pass the smoothing requirements leave no stale smoothing figure.
+    synthetic_state["counts"] = np.zeros(100)
+    infer_rt.run_rt_for_fips("06", report_mode=ReportMode.DEFER)
+    assert reports.load(data_path) == {}
+
+    synthetic_state["counts"] = 50 * np.exp(0.03 * np.arange(100))
+    infer_rt.run_rt_for_fips("06", report_mode=ReportMode.DEFER)
+    infer_rt.run_rt_for_fips("06", report_mode=ReportMode.RENDER)
+    assert not os.path.exists(data_path)
+    rendered = {path: os.stat(path).st_mtime_ns for path in (smoothing_path, inference_path)}
+
+    # The fresh figures of the RENDER run are not replaced by the earlier deferred data.
+    assert reports.render_deferred_reports(["06"]) == 0
+    assert {path: os.stat(path).st_mtime_ns for path in rendered} == rendered
+
+    infer_rt.run_rt_for_fips("06", report_mode=ReportMode.DEFER)
+    assert reports.render_deferred_reports(["06"]) == 1
+    assert not os.path.exists(data_path)
+    assert all(os.stat(path).st_mtime_ns > mtime for path, mtime in rendered.items())
@@ -0,0 +1,54 @@
+import numpy as np
+
+from pyseir import journal
+
+
+def test_fingerprint():
+    values = np.arange(5.0)
+    assert journal.fingerprint(values, {"a": 1, "b": 2}) == journal.fingerprint(
+        values.copy(), {"b": 2, "a": 1}
+    )
+    assert journal.fingerprint(values) != journal.fingerprint(values + 1)
+    assert journal.fingerprint("a", "b") != journal.fingerprint("ab")
+
+
+def test_record_and_resume(tmp_path):
+    path = str(tmp_path / "pyseir" / journal.JOURNAL_FILENAME)
+    artifact = tmp_path / "fit.pkl"
+    artifact.write_text("model")
+
+    completion_journal = journal.CompletionJournal(path)
+    completion_journal.record(("fit", "06037"), "abc", artifacts=[str(artifact)], result={"R0": 3})
+    completion_journal.record(("fit", "06"), "def")
+    assert completion_journal.is_complete(("fit", "06037"), "abc")
+
+    resumed = journal.CompletionJournal(path, resume=True)
+    assert len(resumed) == 2
+    assert resumed.is_complete(("fit", "06037"), "abc")
+    assert resumed.result(("fit", "06037")) == {"R0": 3}
+    assert not resumed.is_complete(("fit", "06037"), "changed inputs")
+    assert not resumed.is_complete(("fit", "06075"), "abc")
+
+    artifact.unlink()
+    assert not resumed.is_complete(("fit", "06037"), "abc")
+    assert resumed.is_complete(("fit", "06"), "def")
+
+    assert len(journal.CompletionJournal(path)) == 0
+    assert len(journal.CompletionJournal(path, resume=True)) == 0
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / journal.JOURNAL_FILENAME)
+    journal.CompletionJournal(path).record("rt", "abc")
+    with open(path, "a") as f:
+        f.write('{"key": "fit", "fingerpr')
+
+    resumed = journal.CompletionJournal(path, resume=True)
+    assert resumed.is_complete("rt", "abc")
+    assert not resumed.is_complete("fit", "abc")
+
+    # The torn line is truncated, entries recorded after resuming are read back.
+    resumed.record("fit", "def")
+    resumed_again = journal.CompletionJournal(path, resume=True)
+    assert len(resumed_again) == 2
+    assert resumed_again.is_complete("fit", "def")
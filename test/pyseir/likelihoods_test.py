@@ -0,0 +1,44 @@
+import numpy as np
+from scipy import stats as sps
+
+from pyseir.rt import likelihoods
+from pyseir.rt.constants import InferRtConstants
+
+
+def test_poisson_log_likelihoods_match_interpolated_pmf():
+    r_list = InferRtConstants.R_BUCKETS
+    counts = np.array([10.0, 12.4, 13.0, 15.7, 0.0, 3.2])
+    lam = counts[:-1] * np.exp((r_list[:, None] - 1) / InferRtConstants.SERIAL_PERIOD)
+    floor = np.floor(counts[1:])
+    frac = counts[1:] - floor
+    expected = frac * sps.poisson.pmf(floor + 1, lam) + (1 - frac) * sps.poisson.pmf(floor, lam)
+
+    log_likelihoods = likelihoods.poisson_log_likelihoods(counts)
+
+    assert log_likelihoods.shape == (len(r_list), len(counts))
+    np.testing.assert_array_equal(log_likelihoods[:, 0], 0.0)
+    np.testing.assert_allclose(np.exp(log_likelihoods[:, 1:]), expected, rtol=1e-9, atol=1e-300)
+
+
+def test_normalize_log_likelihoods_large_counts():
+    # A jump this large is far in the tail for every R, scipy's pmf underflows to 0.
+    counts = np.array([100.0, 5000.0])
+    lam = 100 * np.exp((InferRtConstants.R_BUCKETS - 1) / InferRtConstants.SERIAL_PERIOD)
+    assert sps.poisson.pmf(5000, lam).max() == 0
+
+    normalized, log_normalizers = likelihoods.normalize_log_likelihoods(
+        likelihoods.poisson_log_likelihoods(counts)
+    )
+
+    np.testing.assert_allclose(normalized.sum(axis=0), 1.0)
+    assert np.isfinite(log_normalizers).all()
+    assert normalized[:, 1].argmax() == len(InferRtConstants.R_BUCKETS) - 1
+
+
+def test_normalize_log_likelihoods_impossible_day():
+    # Growth from a zero count has zero likelihood for every R.
+    normalized, log_normalizers = likelihoods.normalize_log_likelihoods(
+        likelihoods.poisson_log_likelihoods(np.array([0.0, 5.0]))
+    )
+    np.testing.assert_array_equal(normalized[:, 1], 0.0)
+    assert log_normalizers[1] == -np.inf
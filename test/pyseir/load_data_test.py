@@ -0,0 +1,230 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyseir import columnar_store, load_data
+from pyseir.load_data import HospitalizationCategory, HospitalizationDataType
+
+
+def _reference_select(data, fips, t0, category):
+    """Row filtering implementation that the hospitalization index must match."""
+    data = data[data["fips"] == fips]
+    if len(data) == 0:
+        return None, None, None
+    for prefix, data_type in (
+        ("current", HospitalizationDataType.CURRENT_HOSPITALIZATIONS),
+        ("cumulative", HospitalizationDataType.CUMULATIVE_HOSPITALIZATIONS),
+    ):
+        column = f"{prefix}_{category}"
+        if (data[column] > 0).any():
+            data = data[data[column].notnull()]
+            relative_days = (data["date"].dt.date - t0.date()).dt.days.values
+            values = data[column].values.clip(min=0)
+            if prefix == "cumulative":
+                for i, val in enumerate(values[1:]):
+                    if values[i] > values[i + 1]:
+                        values[i] = values[i + 1]
+            return relative_days, values, data_type
+    return None, None, None
+
+
+def _hospitalization_data():
+    rng = np.random.RandomState(0)
+    frames = []
+    for i, fips in enumerate(["06", "06037", "06075", "36"]):
+        dates = pd.date_range("2020-03-15", periods=40)
+        frame = pd.DataFrame(
+            {
+                "fips": fips,
+                "date": dates,
+                "current_hospitalized": rng.poisson(50, len(dates)).astype(float),
+                "cumulative_hospitalized": np.cumsum(rng.poisson(5, len(dates))).astype(float),
+                "current_icu": rng.poisson(10, len(dates)).astype(float),
+                "cumulative_icu": np.cumsum(rng.poisson(2, len(dates))).astype(float),
+            }
+        )
+        frame.iloc[::7, 2:] = np.nan
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True)
+    # Only cumulative values (with a glitch) for one county, nothing for ICU in another.
+    county = data.fips == "06037"
+    data.loc[county, "current_hospitalized"] = np.nan
+    data.loc[county, "cumulative_hospitalized"] -= 3 * (data.index[county] % 5 == 0)
+    data.loc[data.fips == "06075", ["current_icu", "cumulative_icu"]] = 0.0
+    # Rows of different fips are interleaved in the combined dataset.
+    return data.sample(frac=1, random_state=1).sort_values("date", kind="mergesort")
+
+
+@pytest.mark.parametrize("category", list(HospitalizationCategory))
+@pytest.mark.parametrize("fips", ["06", "06037", "06075", "36", "48"])
+def test_hospitalization_index_matches_row_filtering(fips, category):
+    data = _hospitalization_data()
+    t0 = datetime(2020, 3, 1)
+
+    index = load_data.build_hospitalization_index(data)
+    results = load_data.select_hospitalization_data(index.get(fips), t0, category)
+    expected = _reference_select(data, fips, t0, category)
+
+    assert results[2] == expected[2]
+    if expected[0] is None:
+        assert results[0] is None and results[1] is None
+    else:
+        np.testing.assert_array_equal(results[0], expected[0])
+        np.testing.assert_array_equal(results[1], expected[1])
+
+
+def _timeseries_data():
+    rng = np.random.RandomState(2)
+    frames = []
+    for fips in ["06", "06037", "06075", "36"]:
+        dates = pd.date_range("2020-03-01", periods=50)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "fips": fips,
+                    "date": dates,
+                    "cases": np.cumsum(rng.poisson(20, len(dates))).astype(float),
+                    "deaths": np.cumsum(rng.poisson(2, len(dates))).astype(float),
+                    "positive_tests": np.cumsum(rng.poisson(20, len(dates))).astype(float),
+                    "negative_tests": np.cumsum(rng.poisson(200, len(dates))).astype(float),
+                }
+            )
+        )
+    data = pd.concat(frames, ignore_index=True)
+    # Padding before and after reported counts, and a gap in the middle.
+    county = data.fips == "06037"
+    data.loc[county & (data.date < "2020-03-10"), ["cases", "deaths"]] = np.nan
+    data.loc[county & (data.date > "2020-04-15"), ["cases", "deaths"]] = np.nan
+    data.loc[county & (data.date == "2020-03-20"), "cases"] = np.nan
+    data.loc[data.fips == "06075", ["positive_tests", "negative_tests"]] = np.nan
+    data.loc[(data.fips == "36") & (data.date < "2020-03-05"), "negative_tests"] = 0
+    return data.sort_values("date", kind="mergesort")
+
+
+def _reference_new_cases(data, fips):
+    """Per fips implementation that the new case index must match."""
+    df = data.loc[data.fips == fips].reset_index(drop=True)
+    columns = ["cases", "deaths"]
+    first_valid = min(df[column].first_valid_index() for column in columns)
+    last_valid = max(df[column].last_valid_index() for column in columns)
+    df = df.iloc[first_valid : last_valid + 1].reset_index(drop=True)
+    return (
+        df["date"].values[1:],
+        df["cases"].values[1:] - df["cases"].values[:-1],
+        df["deaths"].values[1:] - df["deaths"].values[:-1],
+    )
+
+
+def _reference_new_tests(data, fips):
+    """Per fips implementation that the new test index must match."""
+    df = data.loc[data.fips == fips].copy()
+    df = df.loc[
+        df.positive_tests.notnull()
+        & df.negative_tests.notnull()
+        & (df.negative_tests > 0)
+        & (df.positive_tests > 0)
+    ]
+    df["positivity_rate"] = df.positive_tests / (df.positive_tests + df.negative_tests)
+    df["new_positive"] = np.append([0], np.diff(df.positive_tests))
+    df["new_tests"] = np.append([0], np.diff(df.positive_tests + df.negative_tests))
+    df["increase_in_new_tests"] = np.append([0], np.diff(df["new_tests"]))
+    df["expected_positives_from_test_increase"] = (
+        df["increase_in_new_tests"] * 0.65 * df["positivity_rate"]
+    )
+    return df[load_data.NEW_TEST_COLUMNS]
+
+
+def test_new_case_index_matches_per_fips_diff():
+    data = _timeseries_data()
+    index = load_data.build_new_case_index(data)
+
+    assert set(index) == {"06", "06037", "06075", "36"}
+    for fips, entry in index.items():
+        dates, new_cases, new_deaths = _reference_new_cases(data, fips)
+        np.testing.assert_array_equal(entry["date"], dates)
+        np.testing.assert_array_equal(entry["new_cases"], new_cases)
+        np.testing.assert_array_equal(entry["new_deaths"], new_deaths)
+    assert len(index["06037"]["date"]) == 36
+
+
+def test_new_case_totals_match_per_fips_sums():
+    data = _timeseries_data()
+    totals = load_data.build_new_case_totals(data)
+
+    assert set(totals.index) == {"06", "06037", "06075", "36"}
+    for fips, row in totals.iterrows():
+        # The per fips whitelist computation.
+        _, new_cases, new_deaths = _reference_new_cases(data, fips)
+        new_cases, new_deaths = new_cases.clip(min=0), new_deaths.clip(min=0)
+        np.testing.assert_equal(row.total_cases, new_cases.sum())
+        np.testing.assert_equal(row.total_deaths, new_deaths.sum())
+        assert row.nonzero_case_datapoints == np.sum(new_cases > 0)
+        assert row.nonzero_death_datapoints == np.sum(new_deaths > 0)
+    assert np.isnan(totals.loc["06037", "total_cases"])
+
+
+def test_new_test_index_matches_per_fips_diff():
+    data = _timeseries_data()
+    index = load_data.build_new_test_index(data)
+
+    assert "06075" not in index
+    for fips, entry in index.items():
+        expected = _reference_new_tests(data, fips)
+        for column in load_data.NEW_TEST_COLUMNS:
+            np.testing.assert_array_equal(entry[column], expected[column].values)
+
+
+def test_contact_matrix_store_matches_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_data, "CONTACT_MATRIX_DIR", str(tmp_path))
+    rng = np.random.RandomState(3)
+    contact_matrix_data = {
+        fips: {
+            "age_bin_edges": list(range(0, 80, 5)),
+            "age_distribution": rng.uniform(1000, 5000, 16).tolist(),
+            "contact_matrix": rng.uniform(0, 3, (16, 16)).tolist(),
+        }
+        for fips in ["06", "06037", "06075"]
+    }
+    (tmp_path / "contact_matrix_fips_CA.json").write_text(json.dumps(contact_matrix_data))
+
+    load_data.load_contact_matrix_store.cache_clear()
+    from_json = load_data.load_contact_matrix_data_by_fips(["06037", "06"])
+    load_data.cache_contact_matrix_data()
+    load_data.load_contact_matrix_store.cache_clear()
+    from_store = load_data.load_contact_matrix_data_by_fips(["06037", "06"])
+    load_data.load_contact_matrix_store.cache_clear()
+
+    assert (tmp_path / "contact_matrix_fips_CA.npz").exists()
+    expected = {fips: contact_matrix_data[fips] for fips in ["06037", "06"]}
+    assert from_json == expected
+    assert from_store == expected
+    assert load_data.load_contact_matrix_data_by_fips("06075") == {
+        "06075": contact_matrix_data["06075"]
+    }
+
+
+def test_public_implementations_by_fips(tmp_path, monkeypatch):
+    path = str(tmp_path / "public_implementations_data")
+    monkeypatch.setattr(load_data, "PUBLIC_IMPLEMENTATIONS_DATA_PATH", path)
+    policies = pd.DataFrame(
+        {
+            "fips": ["06037", "36061"],
+            "stay_at_home": pd.to_datetime(["2020-03-19", None]),
+            "public_schools": pd.to_datetime(["2020-03-16", "2020-03-16"]),
+        }
+    )
+    columnar_store.write_columnar_table(path, policies)
+    load_data.load_public_implementations_table.cache_clear()
+    load_data.load_public_implementations_data.cache_clear()
+
+    expected = policies.set_index("fips")
+    assert load_data.load_public_implementations_by_fips("01001") is None
+    for fips in ["06037", "36061"]:
+        assert load_data.load_public_implementations_by_fips(fips) == expected.loc[fips].to_dict()
+    pd.testing.assert_frame_equal(load_data.load_public_implementations_data(), expected)
+
+    load_data.load_public_implementations_table.cache_clear()
+    load_data.load_public_implementations_data.cache_clear()
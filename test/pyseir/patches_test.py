@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from pyseir.rt import patches
+
+
+def _reference_aggregate(rt_results, populations):
+    """groupby-apply implementation that aggregate_rt_results must match."""
+    frames = []
+    for fips, df in rt_results.items():
+        df = df.copy()
+        df["population"] = populations[fips]
+        frames.append(df)
+    combined_df = pd.concat(frames)
+
+    def f(x):
+        return pd.Series(
+            dict(
+                Rt_MAP_composite=np.average(x["Rt_MAP_composite"], weights=x["population"]),
+                Rt_ci95_composite=np.average(x["Rt_ci95_composite"], weights=x["population"]),
+            ),
+            index=["Rt_MAP_composite", "Rt_ci95_composite"],
+        )
+
+    return combined_df.groupby(combined_df.index).apply(f)
+
+
+def test_aggregate_rt_results_matches_reference():
+    rng = np.random.RandomState(0)
+    rt_results = {}
+    for i, fips in enumerate(["22051", "22071", "22075"]):
+        # Results start on different dates and one has a missing value.
+        dates = pd.date_range("2020-03-01", periods=60) + pd.Timedelta(days=3 * i)
+        rt_results[fips] = pd.DataFrame(
+            dict(
+                Rt_MAP_composite=rng.uniform(0.5, 1.5, len(dates)),
+                Rt_ci95_composite=rng.uniform(1.5, 2.0, len(dates)),
+                Rt_MAP__new_cases=rng.uniform(0.5, 1.5, len(dates)),
+            ),
+            index=dates,
+        )
+    rt_results["22071"].iloc[10, 0] = np.nan
+    populations = {"22051": 432_000, "22071": 390_000, "22075": 23_000}
+
+    expected = _reference_aggregate(rt_results, populations)
+    results = patches.aggregate_rt_results(rt_results, populations)
+
+    pd.testing.assert_frame_equal(results, expected, check_exact=False)
+    assert results["Rt_MAP_composite"].isna().sum() == 1
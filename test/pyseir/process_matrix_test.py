@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from scipy import stats as sps
+
+from pyseir.rt import bayes_filter, process_matrix
+from pyseir.rt.constants import InferRtConstants
+
+
+def _reference_process_matrix(r_list, sigma):
+    # Row-by-row construction used before matrices were cached.
+    matrix = sps.norm(loc=r_list, scale=sigma).pdf(r_list[:, None])
+    sz = len(r_list)
+    for row in range(0, sz):
+        if row < (sz - 1) / 2:
+            matrix[row, 2 * row + 1 : sz] = 0.0
+        elif row > (sz - 1) / 2:
+            matrix[row, 0 : sz - 2 * (sz - row)] = 0.0
+    return matrix / matrix.sum(axis=1)[:, None]
+
+
+@pytest.mark.parametrize("sigma", [0.03, 0.2, 0.9])
+def test_build_process_matrix_matches_reference(sigma):
+    r_list = InferRtConstants.R_BUCKETS
+    expected = _reference_process_matrix(r_list, sigma)
+    np.testing.assert_allclose(process_matrix.build_process_matrix(r_list, sigma), expected)
+
+
+def test_get_process_matrix_is_cached_and_read_only():
+    process_matrix.clear_cache()
+    r_list = InferRtConstants.R_BUCKETS
+    sigma = process_matrix.quantize_sigma(0.05)
+
+    first = process_matrix.get_process_matrix(r_list, sigma)
+    second = process_matrix.get_process_matrix(r_list.copy(), sigma)
+
+    assert first is second
+    assert not first.flags.writeable
+    assert process_matrix.get_process_matrix(r_list[:101], sigma).shape == (101, 101)
+
+
+def test_quantize_sigma():
+    default = InferRtConstants.DEFAULT_PROCESS_SIGMA
+    assert process_matrix.quantize_sigma(default) == default
+    assert process_matrix.quantize_sigma(0.1234, step=0) == 0.1234
+    assert process_matrix.quantize_sigma(0.1234) == pytest.approx(0.1234, rel=0.01)
+    assert process_matrix.quantize_sigma(0.1234) == process_matrix.quantize_sigma(0.12341)
+
+
+def test_process_sigma():
+    default = InferRtConstants.DEFAULT_PROCESS_SIGMA
+    max_sigma = InferRtConstants.MAX_SCALING_OF_SIGMA * default
+    assert process_matrix.process_sigma(0) == default
+    assert process_matrix.process_sigma(InferRtConstants.SCALE_SIGMA_FROM_COUNT) == default
+    assert process_matrix.process_sigma(1e-3) == pytest.approx(max_sigma, rel=0.01)
+    assert process_matrix.process_sigma(
+        InferRtConstants.SCALE_SIGMA_FROM_COUNT / 4
+    ) == pytest.approx(2 * default, rel=0.01)
+
+
+@pytest.mark.parametrize("sigma", [0.03, 0.2, 0.9])
+def test_banded_process_matrix_matches_dense(sigma):
+    r_list = InferRtConstants.R_BUCKETS
+    tolerance = 1e-12
+    dense = process_matrix.build_process_matrix(r_list, sigma)
+    banded = process_matrix.build_banded_process_matrix(r_list, sigma, tolerance)
+
+    np.testing.assert_allclose(banded.toarray(), dense, atol=10 * tolerance)
+
+    posterior = sps.gamma(a=2.5).pdf(r_list)
+    posterior /= posterior.sum()
+    np.testing.assert_allclose(banded @ posterior, dense @ posterior, atol=10 * tolerance)
+    both = np.stack([posterior, posterior[::-1]], axis=1)
+    np.testing.assert_allclose(banded @ both, dense @ both, atol=10 * tolerance)
+
+
+def test_banded_forward_filter_matches_dense():
+    r_list = InferRtConstants.R_BUCKETS
+    tolerance = InferRtConstants.BANDED_PRIOR_TOLERANCE
+    counts = 50 * np.exp(0.04 * np.arange(60))
+    lam = counts[:-1] * np.exp((r_list[:, None] - 1) / InferRtConstants.SERIAL_PERIOD)
+    likelihoods = np.ones((len(r_list), len(counts)))
+    likelihoods[:, 1:] = sps.poisson.pmf(np.round(counts[1:]), lam)
+    prior0 = sps.gamma(a=2.5).pdf(r_list)
+    prior0 /= prior0.sum()
+
+    def run(get_matrix):
+        def make_process_matrix(scale):
+            sigma = process_matrix.process_sigma(scale)
+            return sigma, get_matrix(sigma)
+
+        return bayes_filter.run_forward_filter(
+            likelihoods, counts, prior0, prior0, make_process_matrix
+        )
+
+    dense = run(lambda sigma: process_matrix.get_process_matrix(r_list, sigma))
+    banded = run(lambda sigma: process_matrix.get_banded_process_matrix(r_list, sigma, tolerance))
+
+    np.testing.assert_allclose(banded.posteriors, dense.posteriors, atol=1e-8)
+    np.testing.assert_array_equal(banded.posteriors.argmax(axis=0), dense.posteriors.argmax(axis=0))
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from pyseir.rt import reports
+
+
+def _series(values):
+    return pd.Series(values, index=pd.date_range("2020-03-01", periods=len(values)))
+
+
+def test_record_round_trip(tmp_path):
+    path = str(tmp_path / "Rt_report_data__XX__99.json")
+    original = _series([1.0, 5.0, 12.0, 30.0])
+    smoothed = _series([np.nan, 6.0, 14.0, 28.0])
+    rt = pd.DataFrame(
+        {"Rt_MAP_composite": [0.9, 1.1, np.nan], "Rt_ci95_composite": [1.2, 1.4, 1.5]},
+        index=pd.date_range("2020-03-02", periods=3),
+    )
+
+    reports.record(
+        path, reports.SMOOTHING, reports.smoothing_payload(original.index, original, smoothed, "c")
+    )
+    reports.record(path, reports.INFERENCE, reports.inference_payload(rt, False, 0, "99"))
+
+    data = reports.load(path)
+    assert data[reports.SMOOTHING]["column"] == "c"
+    restored = reports._series_from_dict(data[reports.SMOOTHING]["smoothed"])
+    np.testing.assert_array_equal(restored.values, smoothed.values)
+    assert (restored.index == smoothed.index).all()
+    assert set(data[reports.INFERENCE]["columns"]) == set(rt.columns)
+
+
+def test_render_writes_figures(tmp_path):
+    original = _series(np.arange(1.0, 40.0))
+    rt_columns = {column: np.linspace(0.8, 1.2, 39) for column in reports.RT_REPORT_COLUMNS}
+    rt = pd.DataFrame(rt_columns, index=original.index)
+    data = {
+        reports.SMOOTHING: reports.smoothing_payload(original.index, original, original, "cases"),
+        reports.INFERENCE: reports.inference_payload(rt, True, 0, "99"),
+    }
+
+    smoothing_path = tmp_path / "smoothing.pdf"
+    inference_path = tmp_path / "inference.pdf"
+    reports.render(data, str(smoothing_path), str(inference_path))
+
+    assert smoothing_path.stat().st_size > 0
+    assert inference_path.stat().st_size > 0
@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pyseir.rt import results_table
+from pyseir.utils import RunArtifact
+
+
+def _rt_result(rng, start, periods, include_deaths):
+    index = pd.date_range(start, periods=periods)
+    columns = ["Rt_MAP__new_cases", "Rt_MAP_composite", "Rt_ci95_composite"]
+    if include_deaths:
+        columns.append("Rt_MAP__new_deaths")
+    return pd.DataFrame(
+        rng.uniform(0.5, 2.0, (periods, len(columns))), index=index, columns=columns
+    )
+
+
+def test_rt_table_round_trip(tmp_path):
+    rng = np.random.RandomState(0)
+    results = {
+        "36061": _rt_result(rng, "2020-03-01", 90, include_deaths=True),
+        "36047": _rt_result(rng, "2020-03-10", 80, include_deaths=False),
+        "36005": _rt_result(rng, "2020-03-05", 85, include_deaths=True),
+    }
+    path = str(tmp_path / "Rt_results__New York.parquet")
+
+    results_table.write_rt_table(path, results)
+
+    table = results_table.read_rt_table(path)
+    assert len(table) == sum(len(df) for df in results.values())
+    assert list(table.columns[:2]) == ["fips", "date"]
+
+    for fips, expected in results.items():
+        loaded = results_table.table_to_results(results_table.read_rt_table(path, fips=fips))
+        assert list(loaded) == [fips]
+        assert list(loaded[fips].columns) == list(expected.columns)
+        assert (loaded[fips].index == expected.index).all()
+        np.testing.assert_array_equal(loaded[fips].values, expected.values)
+
+
+def test_read_rt_table_missing_fips(tmp_path):
+    rng = np.random.RandomState(1)
+    path = str(tmp_path / "table.parquet")
+    results_table.write_rt_table(path, {"36061": _rt_result(rng, "2020-03-01", 30, False)})
+
+    assert results_table.read_rt_table(path, fips="36047").empty
+
+
+def test_load_rt_result_uses_the_newer_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        results_table,
+        "get_run_artifact_path",
+        lambda fips, artifact, output_dir=None: str(tmp_path / f"{artifact.value}__{fips[:2]}"),
+    )
+    rng = np.random.RandomState(2)
+    table_result = _rt_result(rng, "2020-03-01", 30, False)
+    json_result = _rt_result(rng, "2020-03-01", 31, False)
+    table_path = results_table.get_rt_table_path("36061")
+    json_path = results_table.get_run_artifact_path("36061", RunArtifact.RT_INFERENCE_RESULT)
+
+    assert results_table.load_rt_result("36061") is None
+
+    results_table.write_rt_table(table_path, {"36061": table_result})
+    assert len(results_table.load_rt_result("36061")) == 30
+
+    # A later single fips run only writes the JSON.
+    json_result.to_json(json_path)
+    os.utime(table_path, (1.5e9, 1.5e9))
+    os.utime(json_path, (1.6e9, 1.6e9))
+    assert len(results_table.load_rt_result("36061")) == 31
+
+    results_table.write_rt_table(table_path, {"36061": table_result})
+    assert len(results_table.load_rt_result("36061")) == 30
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+import structlog
+from scipy import signal
+
+from pyseir.rt import utils
+from pyseir.rt.constants import InferRtConstants
+
+
+def _reference_replace_outliers(
+    x,
+    local_lookback_window=InferRtConstants.LOCAL_LOOKBACK_WINDOW,
+    z_threshold=InferRtConstants.Z_THRESHOLD,
+    min_mean_to_consider=InferRtConstants.MIN_MEAN_TO_CONSIDER,
+):
+    """Row by row implementation that replace_outliers must match."""
+    r = x.rolling(window=local_lookback_window, min_periods=local_lookback_window, center=False)
+    m = r.mean().shift(1)
+    s = r.std(ddof=0).shift(1)
+    z_score = (x - m) / (s + 1e-8)
+    for idx in np.flatnonzero(z_score > z_threshold):
+        if m.iloc[idx] > min_mean_to_consider:
+            if idx + 1 < len(x):
+                x.iloc[idx] = np.mean([x.iloc[idx - 1], x.iloc[idx + 1]])
+            else:
+                x.iloc[idx] = x.iloc[idx - 1]
+    return x
+
+
+def _reference_align_time_series(series_a, series_b):
+    """One cross correlation per shift implementation that align_time_series must match."""
+    valid_shifts = []
+    xcor = []
+    _series_a = np.diff(series_a)
+    for i in InferRtConstants.XCOR_DAY_RANGE:
+        series_b_shifted = np.diff(series_b.shift(i))
+        valid = ~np.isnan(_series_a) & ~np.isnan(series_b_shifted)
+        if len(series_b_shifted[valid]) > 0:
+            xcor.append(signal.correlate(_series_a[valid], series_b_shifted[valid]).mean())
+            valid_shifts.append(i)
+    if len(valid_shifts) > 0:
+        return valid_shifts[np.argmax(xcor)]
+    return 0
+
+
+def _noisy_counts(rng, n=120):
+    counts = rng.poisson(50 * np.exp(np.linspace(0, 2, n))).astype(float)
+    # An isolated spike, consecutive (growing) spikes and a spike on the newest day.
+    counts[[40, 70, n - 1]] *= 30
+    counts[71] *= 1000
+    return pd.Series(counts, index=pd.date_range("2020-03-01", periods=n))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_replace_outliers_matches_reference(seed):
+    x = _noisy_counts(np.random.RandomState(seed))
+
+    expected = _reference_replace_outliers(x.copy())
+    results = utils.replace_outliers(x.copy(), structlog.getLogger())
+
+    np.testing.assert_allclose(results.values, expected.values, rtol=1e-12)
+    assert (results.values != x.values).sum() == 4
+
+
+def test_replace_outliers_with_missing_values():
+    x = _noisy_counts(np.random.RandomState(0))
+    x.iloc[[10, 55]] = np.nan
+
+    expected = _reference_replace_outliers(x.copy())
+    results = utils.replace_outliers(x.copy(), structlog.getLogger())
+
+    np.testing.assert_allclose(results.values, expected.values, rtol=1e-12)
+
+
+def test_replace_outliers_short_series():
+    x = pd.Series([10.0, 12.0, 500.0])
+    results = utils.replace_outliers(x.copy(), structlog.getLogger())
+    pd.testing.assert_series_equal(results, x)
+
+
+@pytest.mark.parametrize("lag", [-15, -7, 0, 3])
+def test_align_time_series_matches_reference(lag):
+    rng = np.random.RandomState(abs(lag))
+    n = 150
+    signal_values = np.cumsum(rng.normal(size=n + 40))
+    index = pd.date_range("2020-03-01", periods=n)
+    series_a = pd.Series(signal_values[20 : 20 + n], index=index)
+    series_b = pd.Series(signal_values[20 + lag : 20 + lag + n], index=index)
+    # Leading missing values, as for deaths starting later than cases.
+    series_b.iloc[:12] = np.nan
+
+    assert utils.align_time_series(series_a, series_b) == _reference_align_time_series(
+        series_a, series_b
+    )
+
+
+def test_align_time_series_without_overlap():
+    series_a = pd.Series([np.nan] * 10)
+    series_b = pd.Series(np.arange(10.0))
+    assert utils.align_time_series(series_a, series_b) == 0
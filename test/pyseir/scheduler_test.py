@@ -0,0 +1,168 @@
+from multiprocessing import Pool
+import os
+import time
+
+import pytest
+
+from pyseir.journal import CompletionJournal
+from pyseir.scheduler import DagScheduler
+from pyseir.worker_pool import WorkerPool
+
+
+def _sleep(seconds, value=None):
+    time.sleep(seconds)
+    return value
+
+
+def _total(values, offset=0):
+    return sum(values) + offset
+
+
+def _expect(values, expected):
+    if values != expected:
+        raise ValueError(f"Got {values}, expected {expected}")
+
+
+def _fail():
+    raise RuntimeError("Fit failed")
+
+
+def test_dispatches_tasks_when_dependencies_complete():
+    dag = DagScheduler()
+    dag.add(("fit", "06"), _sleep, 0.05, 1)
+    dag.add(("fit", "06037"), _sleep, 0.3, 2, deps=[("fit", "06")])
+    dag.add(("fit", "06075"), _sleep, 0.01, 3, deps=[("fit", "06")])
+    dag.add(("ensemble", "06075"), _sleep, 0.01, deps=[("fit", "06075")])
+    dag.add(
+        ("fit_results", "06"),
+        _total,
+        deps=[("fit", "06037"), ("fit", "06075")],
+        with_dep_results=True,
+        offset=10,
+    )
+
+    with Pool(2) as pool:
+        report = dag.run(pool, processes=2)
+
+    assert not report.failed and not report.skipped
+    assert len(report.timings) == 5
+    timings = report.timings
+    # The fast county's ensemble doesn't wait for the slow county fit.
+    assert timings[("ensemble", "06075")].end < timings[("fit", "06037")].end
+    assert timings[("fit_results", "06")].start >= timings[("fit", "06037")].end
+
+    path, duration = report.critical_path()
+    assert path == [("fit", "06"), ("fit", "06037"), ("fit_results", "06")]
+    assert duration == pytest.approx(sum(timings[key].duration for key in path))
+    assert 0 < report.utilization <= 1
+    assert set(report.busy_time_by_kind()) == {"fit", "ensemble", "fit_results"}
+
+
+def test_dependency_results_are_passed():
+    dag = DagScheduler()
+    dag.add("a", _sleep, 0, 1)
+    dag.add("b", _sleep, 0, 2)
+    dag.add("total", _total, deps=["a", "b"], with_dep_results=True)
+    dag.add("check", _expect, deps=["total", "b"], with_dep_results=True, expected=[3, 2])
+
+    with Pool(2) as pool:
+        report = dag.run(pool, processes=2)
+
+    assert not report.failed
+    assert report.critical_path()[0][-1] == "check"
+
+
+def test_failures_skip_dependents():
+    dag = DagScheduler()
+    dag.add("fit", _fail)
+    dag.add("ensemble", _sleep, 0, deps=["fit"])
+    dag.add("output", _sleep, 0, deps=["ensemble"])
+    dag.add("other", _sleep, 0)
+
+    with Pool(2) as pool:
+        report = dag.run(pool, processes=2)
+
+    assert list(report.failed) == ["fit"]
+    assert report.skipped == ["ensemble", "output"]
+    assert list(report.timings) == ["other"]
+
+
+def test_invalid_graphs():
+    dag = DagScheduler()
+    dag.add("a", _sleep, 0)
+    with pytest.raises(ValueError):
+        dag.add("a", _sleep, 0)
+
+    dag.add("b", _sleep, 0, deps=["missing"])
+    with pytest.raises(ValueError, match="unknown"):
+        dag.run(None, processes=1)
+
+    dag = DagScheduler()
+    dag.add("a", _sleep, 0, deps=["b"])
+    dag.add("b", _sleep, 0, deps=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        dag.run(None, processes=1)
+
+
+def _write(path, value):
+    with open(path, "w") as f:
+        f.write(str(value))
+    return value
+
+
+def _build_dag(tmp_path, state_inputs="v1"):
+    dag = DagScheduler()
+    paths = {name: str(tmp_path / name) for name in ["state", "06037", "06075", "results"]}
+    dag.add("state", _write, paths["state"], 1, inputs=state_inputs, artifacts=[paths["state"]])
+    for fips in ["06037", "06075"]:
+        dag.add(fips, _write, paths[fips], 2, deps=["state"], artifacts=[paths[fips]])
+    dag.add(
+        "results",
+        _expect,
+        deps=["06037", "06075"],
+        with_dep_results=True,
+        expected=[2, 2],
+        artifacts=[paths["results"]],
+    )
+    dag.add("write_results", _write, paths["results"], 0, deps=["results"])
+    return dag, paths
+
+
+def test_resume_from_journal(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    with Pool(2) as pool:
+        dag, paths = _build_dag(tmp_path)
+        report = dag.run(pool, processes=2, journal=CompletionJournal(journal_path))
+        assert len(report.timings) == 5 and not report.resumed
+
+        # Everything completed, dependency results come from the journal.
+        dag, paths = _build_dag(tmp_path)
+        report = dag.run(pool, processes=2, journal=CompletionJournal(journal_path, resume=True))
+        assert not report.timings and not report.failed
+        assert len(report.resumed) == 5
+
+        # A missing artifact re-runs its task and the tasks depending on it.
+        os.remove(paths["06075"])
+        dag, paths = _build_dag(tmp_path)
+        report = dag.run(pool, processes=2, journal=CompletionJournal(journal_path, resume=True))
+        assert sorted(report.timings) == ["06075", "results", "write_results"]
+        assert not report.failed
+
+        # Changed inputs invalidate the task and all tasks depending on it.
+        dag, paths = _build_dag(tmp_path, state_inputs="v2")
+        report = dag.run(pool, processes=2, journal=CompletionJournal(journal_path, resume=True))
+        assert len(report.timings) == 5 and not report.resumed
+
+
+def test_run_on_worker_pool():
+    dag = DagScheduler()
+    dag.add("a", _sleep, 0, 1)
+    dag.add("b", _sleep, 0, 2, deps=["a"])
+    dag.add("check", _expect, deps=["a", "b"], with_dep_results=True, expected=[1, 2])
+
+    with WorkerPool(processes=2) as pool:
+        report = dag.run(pool, processes=pool.processes)
+
+    assert not report.failed
+    assert len(report.timings) == 3
+    assert pool.metrics.tasks == 3
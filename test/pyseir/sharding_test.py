@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pyseir import sharding
+
+STATE_FIPS = {"CA": "06", "TX": "48", "ID": "16", "RI": "44", "NY": "36"}
+COUNTY_FIPS = {
+    "CA": ["06037", "06075", "06001"],
+    "TX": ["48201", "48113", "48029", "48453"],
+    "ID": ["16001"],
+    "NY": ["36061", "36047"],
+}
+
+
+def test_parse_shard():
+    assert sharding.parse_shard("0/3") == (0, 3)
+    assert sharding.parse_shard("2/3") == (2, 3)
+    for value in ["3/3", "-1/3", "1", "a/b", "1/2/3"]:
+        with pytest.raises(ValueError):
+            sharding.parse_shard(value)
+
+
+def test_state_costs_default_to_mean_cost_of_level():
+    costs = {"06": 10.0, "48": 20.0, "06037": 4.0, "06075": 2.0}
+    state_costs = sharding.state_costs(COUNTY_FIPS, STATE_FIPS, costs)
+
+    assert state_costs["CA"] == 10.0 + 4.0 + 2.0 + 3.0
+    assert state_costs["TX"] == 20.0 + 4 * 3.0
+    assert state_costs["RI"] == 15.0
+
+    without_history = sharding.state_costs(COUNTY_FIPS, STATE_FIPS, {})
+    assert without_history == {"CA": 4.0, "TX": 5.0, "ID": 2.0, "RI": 1.0, "NY": 3.0}
+
+
+def test_partition_states_is_balanced_and_complete():
+    costs = {"TX": 10.0, "CA": 9.0, "NY": 5.0, "ID": 4.0, "RI": 1.0}
+    shards = sharding.partition_states(costs, 2)
+
+    # Largest first: TX, CA, NY (to CA's shard), ID and RI (to TX's shard).
+    assert shards == [["ID", "RI", "TX"], ["CA", "NY"]]
+    assert sorted(sum(shards, [])) == sorted(costs)
+    assert sharding.partition_states(costs, 7)[5:] == [[], []]
+
+
+def test_partition_is_the_same_in_separate_processes():
+    costs = {state: float(len(fips)) for state, fips in COUNTY_FIPS.items()}
+    costs.update({"RI": 1.0, "AK": 1.0, "DE": 1.0})
+    code = (
+        "import json, sys; from pyseir import sharding; "
+        "print(json.dumps(sharding.partition_states(json.loads(sys.argv[1]), 3)))"
+    )
+    partitions = []
+    for seed in ["1", "2"]:
+        output = subprocess.run(
+            [sys.executable, "-c", code, json.dumps(costs)],
+            env=dict(os.environ, PYTHONHASHSEED=seed),
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        partitions.append(json.loads(output))
+    assert partitions[0] == partitions[1] == sharding.partition_states(costs, 3)
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_merge_shards(tmp_path):
+    shard_0, shard_1, output = tmp_path / "shard_0", tmp_path / "shard_1", tmp_path / "output"
+    _write(shard_0 / "pyseir" / "California" / "data" / "result.json", "ca")
+    _write(shard_1 / "pyseir" / "Texas" / "data" / "result.json", "tx")
+    for shard in [shard_0, shard_1]:
+        _write(shard / "pyseir" / "data" / "whitelist.json", "whitelist")
+    _write(output / "web_ui" / "previous_run.json", "old")
+    _write(output / "pyseir" / "Texas" / "data" / "result.json", "old tx")
+    sharding.save_costs({"06": 1.0}, sharding.get_costs_path(str(shard_0)))
+    sharding.save_costs({"48": 2.0}, sharding.get_costs_path(str(shard_1)))
+
+    sharding.merge_shards([str(shard_0), str(shard_1)], str(output))
+
+    assert (output / "pyseir" / "California" / "data" / "result.json").read_text() == "ca"
+    assert (output / "pyseir" / "Texas" / "data" / "result.json").read_text() == "tx"
+    assert (output / "pyseir" / "data" / "whitelist.json").read_text() == "whitelist"
+    assert (output / "web_ui" / "previous_run.json").exists()
+    assert sharding.load_costs(sharding.get_costs_path(str(output))) == {"06": 1.0, "48": 2.0}
+
+    _write(shard_1 / "pyseir" / "data" / "whitelist.json", "other whitelist")
+    with pytest.raises(ValueError, match="conflicts"):
+        sharding.merge_shards([str(shard_0), str(shard_1)], str(tmp_path / "other_output"))
@@ -0,0 +1,148 @@
+import os
+import threading
+
+import pytest
+
+from pyseir.worker_pool import WorkerLostError, WorkerPool, map_from_worker
+
+
+def _pid(_):
+    return os.getpid()
+
+
+_retained = []
+
+
+def _grow_and_pid(mb):
+    # Filled so that the pages are resident.
+    _retained.append(b"x" * (mb * 2 ** 20))
+    return os.getpid()
+
+
+def _square(x):
+    return x * x
+
+
+def _fail(_):
+    raise ValueError("Bad fips")
+
+
+def _exit(_):
+    os._exit(3)
+
+
+def test_workers_are_reused():
+    with WorkerPool(processes=2) as pool:
+        assert pool.map(_square, range(10)) == [x * x for x in range(10)]
+        pids = pool.map(_pid, range(10))
+
+    assert len(set(pids)) <= 2
+    assert pool.metrics.forks == 2
+    assert pool.metrics.tasks == 20
+    assert len(pool.metrics.latencies) == len(pool.metrics.run_times) == 20
+
+
+def test_workers_are_recycled_after_max_tasks():
+    with WorkerPool(processes=1, max_tasks_per_worker=2) as pool:
+        pids = pool.map(_pid, range(6))
+
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4] == pids[5]
+    assert pool.metrics.forks == 3
+    assert pool.metrics.recycled_for_tasks == 3
+
+
+def test_workers_are_recycled_over_rss_growth_budget():
+    with WorkerPool(processes=1, max_rss_mb=8) as pool:
+        # The worker shares more than 8MB with the parent, which doesn't count.
+        assert len(set(pool.map(_pid, range(3)))) == 1
+        assert pool.metrics.recycled_for_rss == 0
+        pids = pool.map(_grow_and_pid, [16] * 3)
+
+    assert len(set(pids)) == 3
+    assert pool.metrics.recycled_for_rss == 3
+    summary = pool.metrics.summary()
+    assert summary["max_peak_rss_mb"] > 16
+    assert summary["forks"] == 3
+
+
+def test_task_errors():
+    errors = []
+    done = threading.Event()
+
+    def on_error(error):
+        errors.append(error)
+        done.set()
+
+    with WorkerPool(processes=1) as pool:
+        pool.apply_async(_fail, (1,), error_callback=on_error)
+        done.wait(10)
+        with pytest.raises(ValueError, match="Bad fips"):
+            pool.map(_fail, [1])
+        # The worker survives task errors.
+        assert pool.map(_square, [3]) == [9]
+
+    assert isinstance(errors[0], ValueError)
+    assert "Bad fips" in str(errors[0].__cause__)
+    assert pool.metrics.forks == 1
+    assert pool.metrics.failed_tasks == 2
+
+
+def test_unpicklable_task_fails_without_stopping_the_pool():
+    with WorkerPool(processes=1) as pool:
+        with pytest.raises(TypeError, match="pickle"):
+            pool.map(_square, [1, threading.Lock(), 3])
+        assert pool.map(_square, [2, 3]) == [4, 9]
+
+    assert pool.metrics.forks == 1
+    assert pool.metrics.failed_tasks == 1
+
+
+def test_callback_errors_do_not_stop_the_pool():
+    def bad_callback(_):
+        raise RuntimeError("Bad callback")
+
+    with WorkerPool(processes=1) as pool:
+        pool.apply_async(_square, (2,), callback=bad_callback)
+        pool.apply_async(_fail, (2,), error_callback=bad_callback)
+        assert pool.map(_square, [3]) == [9]
+
+    assert pool.metrics.tasks == 3
+
+
+def test_lost_worker_fails_its_task_and_is_replaced():
+    with WorkerPool(processes=1) as pool:
+        with pytest.raises(WorkerLostError):
+            pool.map(_exit, [1])
+        assert pool.map(_square, [2, 3]) == [4, 9]
+
+    assert pool.metrics.lost_workers == 1
+    assert pool.metrics.forks == 2
+
+
+def _fan_out(n):
+    return sum(map_from_worker(_square, range(n)))
+
+
+def _fan_out_failing(_):
+    return map_from_worker(_fail, [1, 2])
+
+
+def test_tasks_fan_out_on_the_same_pool():
+    # With one worker the fanned out tasks run on a worker added while the task waits for them.
+    with WorkerPool(processes=1) as pool:
+        assert pool.map(_fan_out, [2, 3, 0]) == [1, 5, 0]
+        with pytest.raises(ValueError, match="Bad fips"):
+            pool.map(_fan_out_failing, [1])
+
+    # The added worker stops once the waiting task resumes, so each fan out forks one.
+    assert pool.metrics.forks == 4
+    assert pool.metrics.tasks == 11
+
+
+def test_workers_added_for_fan_outs_are_stopped():
+    with WorkerPool(processes=2) as pool:
+        assert pool.map(_fan_out, [3] * 6) == [5] * 6
+        assert pool.metrics.forks > 2
+        assert pool.workers <= 2
+        assert pool.map(_square, range(4)) == [0, 1, 4, 9]
+        assert pool.workers <= 2
@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 import pathlib
 import json
 import pandas as pd
@@ -42,3 +44,63 @@ def test_filters_counties_properly(fips, expected_results):
 
     if not expected_results:
         assert results == {}
+
+
+@pytest.mark.slow
+def test_pyseir_end_to_end_fit_summaries():
+    cli._build_all_for_states(states=["ID"], fips="16001", fit_summaries=True)
+    assert pathlib.Path(get_run_artifact_path("16001", RunArtifact.MLE_FIT_MODEL)).exists()
+    fit_results = pd.read_json(
+        get_run_artifact_path("16001", RunArtifact.MLE_FIT_RESULT), dtype={"fips": str}
+    )
+    assert "16001" in fit_results.fips.values
+    assert "mle_model" not in fit_results
+
+
+@pytest.mark.slow
+def test_pyseir_end_to_end_dag_scheduler():
+    cli._build_all_for_states(states=["ID"], fips="16001", dag_scheduler=True)
+    for fips in ["16", "16001"]:
+        path = get_run_artifact_path(fips, RunArtifact.WEB_UI_RESULT).replace(
+            "__INTERVENTION_IDX__", "2"
+        )
+        assert pathlib.Path(path).exists()
+
+
+@pytest.mark.slow
+def test_pyseir_end_to_end_shards(tmp_path):
+    shard_dirs = [str(tmp_path / f"shard_{i}") for i in range(2)]
+    for i, shard_dir in enumerate(shard_dirs):
+        command = ["build-all", "--states", "ID", "--states", "RI", "--shard", f"{i}/2"]
+        subprocess.run(
+            [sys.executable, "-m", "pyseir.cli", *command, "--dag-scheduler"],
+            env=dict(os.environ, PYSEIR_OUTPUT_DIR=shard_dir),
+            check=True,
+        )
+    output_dir = tmp_path / "output"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pyseir.cli",
+            "merge-shards",
+            *shard_dirs,
+            "--output-dir",
+            output_dir,
+        ],
+        check=True,
+    )
+
+    web_ui_results = list((output_dir / "web_ui").glob("**/*.json"))
+    assert {path.name.split(".")[0] for path in web_ui_results} >= {"16", "44"}
+    assert (output_dir / "pyseir" / "fips_costs.json").exists()
+
+
+@pytest.mark.slow
+def test_pyseir_end_to_end_resume():
+    cli._build_all_for_states(states=["ID"], fips="16001", dag_scheduler=True)
+    model_path = pathlib.Path(get_run_artifact_path("16001", RunArtifact.MLE_FIT_MODEL))
+    model_path.unlink()
+    # Only the county fit and the tasks depending on it run again.
+    cli._build_all_for_states(states=["ID"], fips="16001", resume=True, skip_whitelist=True)
+    assert model_path.exists()
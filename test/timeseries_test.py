@@ -1,12 +1,15 @@
 from io import StringIO
+import time
 
 import structlog
 
 from libs.datasets.combined_datasets import provenance_wide_metrics_to_series
+from libs.datasets import dataset_utils
 from libs.datasets.dataset_utils import AggregationLevel
 from libs.datasets.sources import cds_dataset
 from libs.datasets.timeseries import TimeseriesDataset
 from test.dataset_utils_test import to_dict, read_csv_and_index_fips_date
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -55,6 +58,76 @@ def test_get_subset_and_get_data():
     assert set(ts.get_data(None, states=["ZZ"], before="2020-03-23")["metric"]) == {"march22-nyc"}
 
 
+def _county_timeseries_df(num_counties: int, num_days: int) -> pd.DataFrame:
+    """Synthetic county level timeseries sorted by date, like the combined dataset."""
+    fips = [f"{97000 + i:05d}" for i in range(num_counties)]
+    dates = pd.date_range("2020-03-01", periods=num_days)
+    df = pd.DataFrame(
+        {
+            "fips": np.repeat(fips, num_days),
+            "date": np.tile(dates, num_counties),
+            "state": "ZZ",
+            "country": "USA",
+            "aggregate_level": AggregationLevel.COUNTY.value,
+            "cases": np.arange(num_counties * num_days, dtype=float),
+        }
+    )
+    return df.sort_values("date", kind="mergesort").reset_index(drop=True)
+
+
+def test_get_data_for_fips_matches_query():
+    ts = TimeseriesDataset(_county_timeseries_df(20, 30))
+
+    for fips in ["97000", "97013", "97019", "99999"]:
+        expected = ts.data.loc[ts.data["fips"] == fips]
+        pd.testing.assert_frame_equal(ts.get_data(fips=fips), expected)
+        pd.testing.assert_frame_equal(ts.get_subset(None, fips=fips).data, expected)
+
+    after = ts.get_data(AggregationLevel.COUNTY, fips="97005", after="2020-03-20")
+    assert list(after["date"]) == list(pd.date_range("2020-03-21", "2020-03-30"))
+    assert ts.get_data(AggregationLevel.STATE, fips="97005").empty
+    assert list(ts.get_data(fips="97001", columns_slice=["cases"]).columns) == ["cases"]
+
+
+@pytest.mark.slow
+def test_get_data_for_fips_all_counties_matches_query():
+    # Roughly all US counties over several months.
+    ts = TimeseriesDataset(_county_timeseries_df(3200, 120))
+    all_fips = ts.data["fips"].unique()
+    sample = all_fips[:: len(all_fips) // 50]
+
+    indexed = {fips: ts.get_data(fips=fips) for fips in all_fips}
+
+    for fips in sample:
+        expected = ts.data.loc[ts.data.eval("fips == @fips")]
+        pd.testing.assert_frame_equal(indexed[fips], expected)
+
+
+@pytest.mark.slow
+def test_get_data_for_fips_benchmark_all_counties():
+    # Roughly all US counties over several months. Only logs the timings, they vary by machine.
+    ts = TimeseriesDataset(_county_timeseries_df(3200, 120))
+    all_fips = ts.data["fips"].unique()
+    sample = all_fips[:: len(all_fips) // 50]
+
+    start = time.perf_counter()
+    for fips in all_fips:
+        ts.get_data(fips=fips)
+    indexed_seconds = (time.perf_counter() - start) / len(all_fips)
+
+    start = time.perf_counter()
+    for fips in sample:
+        ts.data.loc[dataset_utils.make_binary_array(ts.data, fips=fips)]
+    query_seconds = (time.perf_counter() - start) / len(sample)
+
+    structlog.get_logger().info(
+        "get_data per fips",
+        counties=len(all_fips),
+        indexed_ms=round(indexed_seconds * 1e3, 3),
+        query_ms=round(query_seconds * 1e3, 3),
+    )
+
+
 def test_wide_dates():
     input_df = read_csv_and_index_fips_date(
         "fips,county,aggregate_level,date,m1,m2\n"